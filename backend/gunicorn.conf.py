@@ -1,8 +1,25 @@
-"""gunicorn configuration."""
+"""
+gunicorn configuration.
+
+By default the master preloads the application and warms its caches, then forks
+workers that share its memory copy-on-write (see project.core.prefork). The number
+of workers follows from the memory budget, and every worker logs its memory use
+once it is ready and when it exits. Set GUNICORN_PRELOAD=0 to load the
+application in each worker instead. Background threads, like cache invalidation
+listeners, only start in the workers.
+
+Every worker serves GUNICORN_THREADS requests at once, so that a worker busy
+hashing passwords (see project.accounts.hashing) can still serve other requests.
+Threaded workers share a database connection pool per process (DATABASE_POOL,
+see project.core.postgres) rather than keeping a connection per thread. Set
+GUNICORN_THREADS=1 for sync workers, which keep the per-process hashing limit
+from having any effect.
+"""
 
-import multiprocessing
 import os
 
+from project.core import prefork
+
 try:  # pragma: no cover
     from rich import traceback
 
@@ -15,6 +32,35 @@ bind = [f"0.0.0.0:{os.environ.get('PORT', 8000)}"]
 max_requests = 1000
 max_requests_jitter = 50
 reload = os.environ.get("GUNICORN_RELOAD") == "1"
+# Reloading needs every worker to import the application itself.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1" and not reload
+# More than one thread switches to gunicorn's gthread worker.
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+if threads > 1:
+    # Read by the settings, which the application loads after this file.
+    os.environ.setdefault("DATABASE_POOL", "1")
 timeout = 0
-workers = os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+workers = prefork.worker_count()
 wsgi_app = "project.wsgi"
+
+
+def when_ready(server):
+    if preload_app:
+        prefork.warm_caches()
+        prefork.freeze_heap()
+    server.log.info("Starting %s workers", server.num_workers)
+
+
+def pre_fork(server, worker):
+    # Also freeze what the master allocated since, before replacing a worker.
+    if preload_app:
+        prefork.freeze_heap()
+
+
+def post_worker_init(worker):
+    prefork.start_listeners()
+    worker.log.info("Worker ready, %s", prefork.memory(worker.pid))
+
+
+def worker_exit(server, worker):
+    worker.log.info("Worker exiting, %s", prefork.memory(worker.pid))
@@ -0,0 +1,31 @@
+"""
+gunicorn configuration for serving the ASGI application.
+
+Each worker runs an event loop, so a single process can hold many long-lived or
+I/O-bound connections at once. Usage:
+
+    gunicorn -c gunicorn_asgi.conf.py
+"""
+
+import multiprocessing
+import os
+
+try:  # pragma: no cover
+    from rich import traceback
+
+    traceback.install(show_locals=True)
+except ImportError:  # pragma: no cover
+    pass
+
+accesslog = "-"
+bind = [f"0.0.0.0:{os.environ.get('PORT', 8000)}"]
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+max_requests = 1000
+max_requests_jitter = 50
+reload = os.environ.get("GUNICORN_RELOAD") == "1"
+# Async workers must keep notifying the master, a silent worker is a stuck event loop.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+worker_class = "project.workers.UvicornWorker"
+# One event loop per core is enough, requests waiting on I/O don't block a worker.
+workers = os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() + 1)
+wsgi_app = "project.asgi:application"
@@ -1,10 +1,20 @@
 from allauth.account.adapter import DefaultAccountAdapter
 from django.conf import settings
 
+from project.accounts.emails import queue_email
 from project.core.utils.frontend import get_frontend_base_url
 
 
 class CustomAccountAdapter(DefaultAccountAdapter):
+    def send_mail(self, template_prefix, email, context):
+        """
+        Sends emails from a Celery worker after the transaction commits, see
+        project.accounts.emails.
+        """
+        if not settings.ACCOUNT_EMAIL_ASYNC:
+            return super().send_mail(template_prefix, email, context)
+        queue_email(template_prefix, email, context)
+
     def get_email_confirmation_url(self, request, emailconfirmation):
         """
         Constructs the email confirmation (activation) url.
@@ -9,6 +9,8 @@ from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from project.core.paginators import EstimatedCountPaginator
+
 from .models import User
 
 
@@ -168,7 +170,9 @@ class EmailAuthenticationForm(AuthenticationForm):
                 site = request.site
 
             # Use our custom authentication method
-            user_cache = User.objects.authenticate_user(email, site, password)
+            user_cache = User.objects.authenticate_user(
+                email, site, password, request=request
+            )
 
             if user_cache is None:
                 raise forms.ValidationError(
@@ -253,8 +257,13 @@ class UserAdmin(BaseUserAdmin):
 
     list_display = ("email", "name", "site", "is_staff", "is_active", "date_joined")
     list_filter = ("is_staff", "is_active", "site", "date_joined")
+    list_select_related = ("site",)
+    # Served by the trigram indexes on UPPER(email) and UPPER(name).
     search_fields = ("email", "name")
     ordering = ("email",)
+    # Avoid exact counts of the users table, see EstimatedCountPaginator.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {"fields": ("email", "password")}),
@@ -6,6 +6,21 @@ class AccountsConfig(AppConfig):
     name = "project.accounts"
 
     def ready(self):
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+
+        from project.accounts.authentication import (
+            invalidate_cached_user,
+            invalidate_cached_user_m2m,
+        )
+        from project.accounts.models import User
+
         # import KnoxTokenScheme so it's loaded for drf-spectacular
         # https://github.com/tfranzel/drf-spectacular/issues/264#issuecomment-1317781295
         from project.core.docs.schemas import JWTSchema  # noqa: F401  # type: ignore
+
+        post_save.connect(invalidate_cached_user, sender=User)
+        post_delete.connect(invalidate_cached_user, sender=User)
+        m2m_changed.connect(invalidate_cached_user_m2m, sender=User.groups.through)
+        m2m_changed.connect(
+            invalidate_cached_user_m2m, sender=User.user_permissions.through
+        )
@@ -0,0 +1,186 @@
+"""
+JWT authentication that resolves users from a shared cache.
+
+JWTCookieAuthentication loads the user row on every authenticated request. Users
+change rarely, so CachedJWTCookieAuthentication keeps them in the shared cache for
+a short while. Every user has a version stamp next to their cache entry, and an
+entry only counts when it was stored under the current stamp. The stamp is bumped
+whenever the user is saved (which includes password changes and deactivation),
+deleted, or their groups and permissions change, so revocation takes effect on the
+next request in every worker.
+
+Changes that bypass model signals, like QuerySet.update(), don't bump the stamp;
+call bump_user_version() after those.
+
+Settings:
+- JWT_USER_CACHE_TTL: seconds a user is cached (0 disables the cache).
+- JWT_USER_CACHE: the cache alias, which must be shared by all workers.
+
+Entries hold the user's field values, but not the password hash: only a digest of
+it, for the revocation check (CHECK_REVOKE_TOKEN). Cached users load the password
+from the database if something reads it.
+
+Version stamps expire after the access token lifetime (or JWT_USER_CACHE_TTL, if
+longer), by which time every entry stored under them has expired too.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import NamedTuple
+
+import redis
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from project.core.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+def _entry_key(user_id) -> str:
+    return f"jwt-user:{user_id}"
+
+
+def _version_key(user_id) -> str:
+    return f"jwt-user-version:{user_id}"
+
+
+def _version_timeout() -> int:
+    lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    return math.ceil(max(lifetime, settings.JWT_USER_CACHE_TTL))
+
+
+def _new_version() -> int:
+    # Unique across evictions of the version key, unlike a counter that restarts.
+    return time.time_ns()
+
+
+class CachedUser(NamedTuple):
+    user: AbstractBaseUser
+    # get_md5_hash_password() of the password hash, for the revocation check.
+    password_digest: str
+
+
+def _cached_fields(model) -> list[str]:
+    return [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname != "password"
+    ]
+
+
+def get_cached_user(user_id) -> tuple[CachedUser | None, int | None]:
+    """Return (cached user or None, current version stamp or None)."""
+    cache = caches[settings.JWT_USER_CACHE]
+    values = cache.get_many([_entry_key(user_id), _version_key(user_id)])
+    version = values.get(_version_key(user_id))
+    entry = values.get(_entry_key(user_id))
+    if version is None or entry is None or entry[0] != version:
+        return None, version
+    _, fields, password_digest = entry
+    model = get_user_model()
+    # The password is left deferred: it's loaded if something reads it, and saving
+    # the user doesn't write it.
+    user = model.from_db(model.objects.db, list(fields), list(fields.values()))
+    return CachedUser(user, password_digest), version
+
+
+def cache_user(user, version: int | None) -> None:
+    """
+    Cache a user under the version stamp read *before* the user was loaded.
+
+    If the stamp was bumped in the meantime, the entry never matches and the user
+    is loaded again, so a stale row can't be cached under a newer stamp. Only the
+    field values are cached, without the password hash.
+    """
+    cache = caches[settings.JWT_USER_CACHE]
+    if version is None:
+        version = _new_version()
+        if not cache.add(_version_key(user.pk), version, _version_timeout()):
+            return
+    fields = {name: getattr(user, name) for name in _cached_fields(type(user))}
+    entry = (version, fields, get_md5_hash_password(user.password))
+    cache.set(_entry_key(user.pk), entry, settings.JWT_USER_CACHE_TTL)
+
+
+def bump_user_version(user_id) -> None:
+    """Invalidate the cached user in every worker."""
+    try:
+        caches[settings.JWT_USER_CACHE].set(
+            _version_key(user_id), _new_version(), _version_timeout()
+        )
+    except redis.RedisError:
+        logger.error("Could not invalidate cached user %s", user_id, exc_info=True)
+
+
+def invalidate_cached_user(instance, **kwargs) -> None:
+    """Signal receiver for User saves and deletes."""
+    if settings.JWT_USER_CACHE_TTL <= 0:
+        return
+    # Deleting a user clears its pk before the transaction commits.
+    user_id = instance.pk
+    bump_user_version(user_id)
+    # Again after commit, as requests may have re-cached the uncommitted old row.
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+def invalidate_cached_user_m2m(instance, action, reverse, model, pk_set, **kwargs):
+    """Signal receiver for changes to the groups and permissions of users."""
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_cached_user(instance)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_cached_user(model(pk=user_id))
+
+
+class CachedJWTCookieAuthentication(JWTCookieAuthentication):
+    """JWTCookieAuthentication that resolves users from the shared cache."""
+
+    def get_user(self, validated_token):
+        if settings.JWT_USER_CACHE_TTL <= 0:
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)  # Raises InvalidToken.
+
+        try:
+            cached, version = get_cached_user(user_id)
+        except redis.RedisError:
+            logger.warning("Could not read cached user", exc_info=True)
+            return super().get_user(validated_token)
+        record_cache_lookup(cached is not None)
+
+        if cached is None:
+            user = super().get_user(validated_token)
+            try:
+                cache_user(user, version)
+            except redis.RedisError:
+                logger.warning("Could not cache user", exc_info=True)
+            return user
+
+        # The same checks JWTAuthentication.get_user makes after loading the user.
+        user = cached.user
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != cached.password_digest
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
@@ -0,0 +1,108 @@
+"""
+Transactional emails sent from a Celery worker.
+
+allauth and dj-rest-auth send their emails (email confirmations, password resets)
+through the account adapter, inline in the request, so the request waited on the
+email provider. CustomAccountAdapter.send_mail() queues them instead: the context is
+reduced to JSON (model instances become references, the request is dropped) and
+project.accounts.tasks.send_account_emails renders and sends them in the worker,
+after the transaction commits.
+
+Emails queued inside email_batch() are sent by one task over one connection.
+
+Settings:
+- ACCOUNT_EMAIL_ASYNC: queue emails instead of sending them inline.
+- ACCOUNT_EMAIL_MAX_RETRIES, ACCOUNT_EMAIL_RETRY_BACKOFF and
+  ACCOUNT_EMAIL_RETRY_BACKOFF_MAX: how failed sends are retried.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from allauth.account.adapter import get_adapter
+from django.apps import apps
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage
+from django.db import models, transaction
+
+from project.core.tenant import get_current_site, tenant_context
+
+# The context the adapter adds itself, which is rebuilt in the worker.
+_REBUILT_KEYS = {"request", "email", "current_site"}
+
+_batch: ContextVar[list[dict] | None] = ContextVar("email_batch", default=None)
+
+
+def serialize_context(context: dict) -> dict:
+    """Make a template context JSON serializable, keeping references to models."""
+    serialized: dict[str, Any] = {}
+    for key, value in context.items():
+        if key in _REBUILT_KEYS:
+            continue
+        if isinstance(value, models.Model):
+            value = {"__model__": value._meta.label_lower, "pk": value.pk}
+        serialized[key] = value
+    return serialized
+
+
+def deserialize_context(context: dict) -> dict:
+    deserialized = {}
+    for key, value in context.items():
+        if isinstance(value, dict) and "__model__" in value:
+            model = apps.get_model(value["__model__"])
+            value = model._default_manager.get(pk=value["pk"])
+        deserialized[key] = value
+    return deserialized
+
+
+def queue_email(template_prefix: str, email: str, context: dict) -> None:
+    """Send an email from the worker once the current transaction commits."""
+    site = get_current_site() or Site.objects.get_current()
+    message = {
+        "template_prefix": template_prefix,
+        "email": email,
+        "site_id": site.pk,
+        "context": serialize_context(context),
+    }
+    batch = _batch.get()
+    if batch is not None:
+        batch.append(message)
+    else:
+        _enqueue([message])
+
+
+@contextmanager
+def email_batch() -> Iterator[None]:
+    """Send the emails queued in the block together, over one connection."""
+    token = _batch.set([])
+    try:
+        yield
+        messages = _batch.get()
+    finally:
+        _batch.reset(token)
+    if messages:
+        _enqueue(messages)
+
+
+def _enqueue(messages: list[dict]) -> None:
+    from project.accounts.tasks import send_account_emails
+
+    transaction.on_commit(lambda: send_account_emails.delay(messages))
+
+
+def render_email(message: dict) -> EmailMessage:
+    """Render a queued email like the adapter would have in the request."""
+    site = Site.objects.get(pk=message["site_id"])
+    with tenant_context(site):
+        context = {
+            "request": None,
+            "email": message["email"],
+            "current_site": site,
+            **deserialize_context(message["context"]),
+        }
+        return get_adapter().render_mail(
+            message["template_prefix"], message["email"], context
+        )
@@ -0,0 +1,133 @@
+"""
+Bounded password hashing.
+
+Argon2 is deliberately slow and CPU-bound. When a card starts and thousands of
+users log in at once, every worker thread ends up hashing and nothing is left for
+other requests, such as healthchecks. Password hashing and verification in the API
+therefore go through a per-process pool with a limited number of slots. Requests
+that can't get a slot within the queue timeout fail fast with a 503 and a
+Retry-After header instead of piling up.
+
+The slots are per process, so they only limit anything when a worker serves more
+requests at once than it has slots: gunicorn runs GUNICORN_THREADS threads per
+worker (see gunicorn.conf.py), more than the default concurrency.
+
+Settings:
+- PASSWORD_HASHING_CONCURRENCY: hashing slots per worker process (0 disables the limit).
+- PASSWORD_HASHING_QUEUE_TIMEOUT: seconds a request may wait for a slot.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from typing import Callable, TypeVar
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from project.core.metrics import DURATION_BUCKETS, Histogram, registry
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins at the moment, please try again shortly."
+    default_code = "password_hashing_busy"
+
+    def __init__(self, wait: float):
+        super().__init__()
+        # Sent as the Retry-After header by DRF's exception handler.
+        self.wait = max(1, math.ceil(wait))
+
+
+class PasswordHashingPool:
+    def __init__(self):
+        self._semaphore: threading.BoundedSemaphore | None = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.queue_wait = Histogram(DURATION_BUCKETS)
+        self.durations: dict[str, Histogram] = {}
+
+    def _get_semaphore(self) -> threading.BoundedSemaphore | None:
+        size = settings.PASSWORD_HASHING_CONCURRENCY
+        if size <= 0:
+            return None
+        if self._semaphore is None or self._size != size:
+            with self._lock:
+                if self._semaphore is None or self._size != size:
+                    self._semaphore = threading.BoundedSemaphore(size)
+                    self._size = size
+        return self._semaphore
+
+    def run(self, operation: str, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call func, which hashes or verifies a password, in a hashing slot.
+
+        Raises PasswordHashingBusy when no slot frees up within the queue timeout.
+        """
+        semaphore = self._get_semaphore()
+        timeout = settings.PASSWORD_HASHING_QUEUE_TIMEOUT
+        start = time.perf_counter()
+        if semaphore is not None and not semaphore.acquire(timeout=timeout):
+            with self._lock:
+                self.rejected += 1
+                self.queue_wait.observe(time.perf_counter() - start)
+            raise PasswordHashingBusy(wait=timeout)
+
+        acquired = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+            self.queue_wait.observe(acquired - start)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                if operation not in self.durations:
+                    self.durations[operation] = Histogram(DURATION_BUCKETS)
+                self.durations[operation].observe(time.perf_counter() - acquired)
+            if semaphore is not None:
+                semaphore.release()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.rejected = 0
+            self.queue_wait = Histogram(DURATION_BUCKETS)
+            self.durations = {}
+
+    def render_metrics(self) -> list[str]:
+        """Prometheus metrics for the metrics registry."""
+        labels = f'pid="{os.getpid()}"'
+        with self._lock:
+            lines = [
+                "# HELP password_hashing_queue_wait_seconds Time spent waiting for a hashing slot.",
+                "# TYPE password_hashing_queue_wait_seconds histogram",
+                *self.queue_wait.render("password_hashing_queue_wait_seconds", labels),
+                "# HELP password_hashing_duration_seconds Time spent hashing or verifying passwords.",
+                "# TYPE password_hashing_duration_seconds histogram",
+            ]
+            for operation, histogram in sorted(self.durations.items()):
+                lines += histogram.render(
+                    "password_hashing_duration_seconds",
+                    f'{labels},operation="{operation}"',
+                )
+            lines += [
+                "# HELP password_hashing_rejected_total Requests rejected because all slots were busy.",
+                "# TYPE password_hashing_rejected_total counter",
+                f"password_hashing_rejected_total{{{labels}}} {self.rejected}",
+                "# HELP password_hashing_in_flight Passwords being hashed right now.",
+                "# TYPE password_hashing_in_flight gauge",
+                f"password_hashing_in_flight{{{labels}}} {self.in_flight}",
+            ]
+        return lines
+
+
+password_hashing = PasswordHashingPool()
+registry.register(password_hashing.render_metrics)
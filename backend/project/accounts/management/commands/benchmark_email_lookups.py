@@ -0,0 +1,151 @@
+import json
+import time
+from textwrap import dedent
+from typing import Any, Callable
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from project.accounts.models import User
+
+INDEX = "user_email_upper_site_idx"
+
+# The email lookups of the accounts app, as they query. Each takes an email, a site
+# and the pk of another user.
+LOOKUPS: dict[str, Callable[[str, Site, int], Any]] = {
+    "RegisterSerializer.validate_email": lambda email, site, pk: (
+        User.objects.filter(email__iexact=email, site=site).exists()
+    ),
+    "EmailChangeSerializer.validate": lambda email, site, pk: (
+        User.objects.filter(email__iexact=email, site=site).exists()
+    ),
+    "ChangeEmailView": lambda email, site, pk: (
+        User.objects.filter(email__iexact=email, site=site).exists()
+    ),
+    "UserCreationForm.clean_email": lambda email, site, pk: (
+        User.objects.filter(email__iexact=email, site=site).exists()
+    ),
+    "UserChangeForm.clean_email": lambda email, site, pk: (
+        User.objects.filter(email__iexact=email, site=site).exclude(pk=pk).exists()
+    ),
+    "EmailAuthenticationForm.clean": lambda email, site, pk: (
+        User.objects.filter(email__iexact=email).first()
+    ),
+    "get_by_email_and_site": lambda email, site, pk: (
+        list(User.objects.filter(email__iexact=email, site=site)[:21])
+    ),
+}
+
+
+def scans(plan: dict) -> list[str]:
+    """The scan nodes of an EXPLAIN (FORMAT JSON) plan, e.g. "Index Scan using x"."""
+    found = []
+    if "Scan" in plan["Node Type"]:
+        node = plan["Node Type"]
+        if "Index Name" in plan:
+            node += f" using {plan['Index Name']}"
+        found.append(node)
+    for child in plan.get("Plans", []):
+        found.extend(scans(child))
+    return found
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Benchmarks the case-insensitive email lookups on a large users table, with
+        and without the user_email_upper_site_idx index, and shows the scans their
+        plans use. Inserts the users into temporary sites and deletes them
+        afterwards. The run without the index drops it in a transaction that is
+        rolled back, which locks the users table meanwhile, so don't run this
+        against a database in use.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rows", type=int, default=2_000_000)
+        parser.add_argument("--sites", type=int, default=10)
+        parser.add_argument("--lookups", type=int, default=20)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        sites = [
+            Site.objects.create(
+                domain=f"benchmark-email-{i}.invalid", name="Email lookup benchmark"
+            )
+            for i in range(options["sites"])
+        ]
+        try:
+            self.populate(sites, options["rows"])
+            with_index = self.run(sites, options["lookups"])
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP INDEX "{INDEX}"')
+                without_index = self.run(sites, options["lookups"])
+                transaction.set_rollback(True)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "DELETE FROM users WHERE site_id = ANY(%s)",
+                    [[site.pk for site in sites]],
+                )
+            Site.objects.filter(pk__in=[site.pk for site in sites]).delete()
+
+        self.stdout.write(f"{'lookup':<36} {'indexed':>10} {'unindexed':>10}  scans")
+        for label, (duration, plan) in with_index.items():
+            self.stdout.write(
+                f"{label:<36} {duration * 1000:>8.2f}ms "
+                f"{without_index[label][0] * 1000:>8.2f}ms  {plan}"
+            )
+        missing = [
+            label for label, (_, plan) in with_index.items() if INDEX not in plan
+        ]
+        if missing:
+            self.stdout.write(self.style.ERROR(f"Not using {INDEX}: {missing}"))
+
+    def populate(self, sites: list[Site], rows: int) -> None:
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            # Mixed case, as users type them, although save() lowercases emails.
+            cursor.execute(
+                """
+                INSERT INTO users (
+                    password, is_superuser, site_id, username, email, is_staff,
+                    is_active, date_joined
+                )
+                SELECT
+                    '!', false, site_id, site_id || '-user-' || i || '@example.com',
+                    CASE WHEN i %% 2 = 0 THEN 'User-' ELSE 'user-' END
+                        || i || '@Example.com',
+                    false, true, now()
+                FROM generate_series(0, %s - 1) AS i,
+                    LATERAL (SELECT (%s::bigint[])[i %% %s + 1] AS site_id) AS s
+                """,
+                [rows, [site.pk for site in sites], len(sites)],
+            )
+            cursor.execute("ANALYZE users")
+        self.stdout.write(
+            f"Inserted {rows:,} users into {len(sites)} sites in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+
+    def run(self, sites: list[Site], lookups: int) -> dict[str, tuple[float, str]]:
+        """The mean duration and the scans of every lookup."""
+        results = {}
+        for label, lookup in LOOKUPS.items():
+            start = time.perf_counter()
+            for i in range(lookups):
+                row = i * 7919
+                lookup(f"USER-{row}@example.COM", sites[row % len(sites)], 0)
+            duration = (time.perf_counter() - start) / lookups
+
+            with CaptureQueriesContext(connection) as queries:
+                lookup("user-1@example.com", sites[1 % len(sites)], 0)
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {queries[-1]['sql']}")
+                (plan,) = cursor.fetchone()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            results[label] = (duration, ", ".join(scans(plan[0]["Plan"])))
+        return results
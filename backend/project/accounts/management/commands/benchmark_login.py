@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from textwrap import dedent
+from typing import Any
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from project.accounts.models import User
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def legacy_authenticate_user(email: str, site: Site, password: str) -> User | None:
+    """The previous implementation: fetch by email, then again by username."""
+    try:
+        user = User.objects.get_by_email_and_site(email, site)
+    except User.DoesNotExist:
+        return None
+    return authenticate(username=user.username, password=password)
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Benchmarks a burst of logins through User.objects.authenticate_user against
+        the previous two-query implementation. Creates a temporary site with users
+        and deletes it afterwards.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--logins", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--argon2",
+            action="store_true",
+            help="Keep the Argon2 hasher, which makes hashing dominate the results.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        hashers = None if options["argon2"] else FAST_HASHERS
+        with override_settings(**({"PASSWORD_HASHERS": hashers} if hashers else {})):
+            site = Site.objects.create(
+                domain="benchmark-login.invalid", name="Login benchmark"
+            )
+            try:
+                self.run(site, options)
+            finally:
+                site.delete()
+
+    def run(self, site: Site, options: dict) -> None:
+        password = "benchmark-password"
+        encoded = make_password(password)
+        emails = [f"user-{i}@example.com" for i in range(options["users"])]
+        User.objects.bulk_create(
+            User(
+                username=f"{site.pk}-{email}", email=email, site=site, password=encoded
+            )
+            for email in emails
+        )
+        credentials = [
+            (emails[i % len(emails)], password if i % 10 else "wrong-password")
+            for i in range(options["logins"])
+        ]
+
+        for label, authenticate_user in (
+            ("two queries", legacy_authenticate_user),
+            ("one query", User.objects.authenticate_user),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                for email, secret in credentials[:10]:
+                    authenticate_user(email, site, secret)
+
+            def login_burst(chunk):
+                try:
+                    for email, secret in chunk:
+                        authenticate_user(email, site, secret)
+                finally:
+                    connection.close()
+
+            threads = options["threads"]
+            chunks = [credentials[i::threads] for i in range(threads)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(threads) as executor:
+                list(executor.map(login_burst, chunks))
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{label:<12} {len(queries) / 10:.1f} queries per login, "
+                f"{len(credentials) / elapsed:,.0f} logins/s "
+                f"({elapsed / len(credentials) * 1000:.2f} ms per login, "
+                f"{options['threads']} threads)"
+            )
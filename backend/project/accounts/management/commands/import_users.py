@@ -0,0 +1,236 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from textwrap import dedent
+from typing import Any, Iterable, Iterator
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.sites.models import Site
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core.validators import validate_email
+from django.db import transaction
+
+from project.accounts.models import User
+
+# The lengths the users table's check constraints allow.
+EMAIL_LENGTH = (3, 254)
+NAME_MAX_LENGTH = 500
+
+
+def read_rows(stream: io.TextIOBase, format: str) -> Iterator[dict | None]:
+    """The rows of a file, with None in place of lines that aren't JSON objects."""
+    if format == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield row if isinstance(row, dict) else None
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Imports users into a site from a CSV or NDJSON file (or "-" for stdin).
+
+        Rows have an "email" and optionally a "name" and a "password". Passwords are
+        hashed in a process pool, or taken as they are with --prehashed. Rows
+        without a password get an unusable one. Emails that already exist in the
+        site are skipped, and so are rows that can't be read or aren't valid.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path")
+        parser.add_argument("--site", required=True, help="Domain or id of the site.")
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Hashing processes (defaults to the number of CPUs, 0 hashes inline).",
+        )
+        parser.add_argument(
+            "--prehashed",
+            action="store_true",
+            help="Passwords are already hashed, e.g. exported from another Django site.",
+        )
+        parser.add_argument(
+            "--verified",
+            action="store_true",
+            help="Mark the imported email addresses as verified.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        site = self.get_site(options["site"])
+        path: str = options["path"]
+        format = options["format"] or (
+            "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        )
+        self.prehashed: bool = options["prehashed"]
+        self.verified: bool = options["verified"]
+        self.stats = {
+            "read": 0,
+            "created": 0,
+            "existing": 0,
+            "invalid": 0,
+            "without_address": 0,
+        }
+
+        stream = (
+            sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        )
+        self.workers: int = (
+            os.cpu_count() or 1 if options["workers"] is None else options["workers"]
+        )
+        executor = None
+        if self.workers and not self.prehashed:
+            executor = ProcessPoolExecutor(self.workers)
+        start = time.perf_counter()
+        try:
+            for batch in batched(read_rows(stream, format), options["batch_size"]):
+                self.import_batch(site, batch, executor)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{self.stats['read']:,} rows, {self.stats['created']:,} created, "
+                    f"{self.stats['read'] / elapsed:,.0f} rows/s"
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {self.stats['created']:,} users into {site.domain} in "
+                f"{elapsed:.1f}s ({self.stats['read'] / max(elapsed, 1e-9):,.0f} rows/s). "
+                f"Skipped {self.stats['existing']:,} existing and "
+                f"{self.stats['invalid']:,} invalid rows."
+            )
+        )
+        if self.stats["without_address"]:
+            self.stderr.write(
+                f"{self.stats['without_address']:,} imported users have no email "
+                "address record, because the address is already verified by "
+                "another user."
+            )
+
+    def get_site(self, value: str) -> Site:
+        lookup = {"pk": int(value)} if value.isdigit() else {"domain": value}
+        try:
+            return Site.objects.get(**lookup)
+        except Site.DoesNotExist:
+            raise CommandError(f"Site {value} does not exist.")
+
+    def clean_batch(self, site: Site, batch: list[dict | None]) -> dict[str, dict]:
+        """Valid rows by username, without duplicates and existing users."""
+        rows: dict[str, dict] = {}
+        for row in batch:
+            self.stats["read"] += 1
+            try:
+                if row is None:
+                    raise ValueError("Unreadable row")
+                email = row.get("email") or ""
+                name = row.get("name") or ""
+                password = row.get("password") or None
+                if not all(isinstance(value, str) for value in (email, name)) or (
+                    password is not None and not isinstance(password, str)
+                ):
+                    raise ValueError("Not a string")
+                email = User.objects.normalize_email(email.strip()).lower()
+                min_length, max_length = EMAIL_LENGTH
+                if not min_length <= len(email) <= max_length:
+                    raise ValueError("Email length")
+                if len(name) > NAME_MAX_LENGTH:
+                    raise ValueError("Name length")
+                validate_email(email)
+                if self.prehashed and password:
+                    identify_hasher(password)
+            except (ValidationError, ValueError):
+                self.stats["invalid"] += 1
+                continue
+            username = User.objects.username_for(email, site)
+            if username in rows:
+                self.stats["existing"] += 1
+                continue
+            rows[username] = {
+                "email": email,
+                "name": name,
+                "password": password,
+            }
+
+        existing = set(
+            User.objects.filter(username__in=rows).values_list("username", flat=True)
+        )
+        self.stats["existing"] += len(existing)
+        return {
+            username: row for username, row in rows.items() if username not in existing
+        }
+
+    def hash_passwords(
+        self, passwords: list[str | None], executor: Executor | None
+    ) -> list[str]:
+        if self.prehashed:
+            return [password or make_password(None) for password in passwords]
+        if executor is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+    def import_batch(
+        self, site: Site, batch: list[dict], executor: Executor | None
+    ) -> None:
+        rows = self.clean_batch(site, batch)
+        if not rows:
+            return
+        passwords = self.hash_passwords(
+            [row["password"] for row in rows.values()], executor
+        )
+        users = [
+            User(
+                username=username,
+                email=row["email"],
+                name=row["name"],
+                password=password,
+                site=site,
+            )
+            for (username, row), password in zip(rows.items(), passwords)
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            # Verified addresses are unique across sites, so skip those conflicts.
+            EmailAddress.objects.bulk_create(
+                [
+                    EmailAddress(
+                        user=user,
+                        email=user.email,
+                        primary=True,
+                        verified=self.verified,
+                    )
+                    for user in users
+                ],
+                ignore_conflicts=True,
+            )
+            with_address = EmailAddress.objects.filter(user__in=users).count()
+        self.stats["created"] += len(users)
+        self.stats["without_address"] += len(users) - with_address
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:19
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking the users table against writes.
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                models.F("site"),
+                name="user_email_upper_site_idx",
+            ),
+        ),
+    ]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -12,9 +15,14 @@ from django.db.models import Q
 from django.db.models.functions import Upper
 from django.utils import timezone
 
+from project.accounts.hashing import password_hashing
 from project.core.fields import EmailField, StringField
 
 
+def _run_unlimited(operation: str, func, *args):
+    return func(*args)
+
+
 class UserManager(BaseUserManager):
     """
     Site-aware user manager that works cleanly with email for public API
@@ -29,9 +37,14 @@ class UserManager(BaseUserManager):
         site: Site,
         password: str | None = None,
         name: str = "",
+        hashed_password: str | None = None,
         **extra_fields,
     ) -> User:
-        """Internal helper to create users with proper site-scoped username."""
+        """
+        Internal helper to create users with proper site-scoped username.
+
+        Takes a hashed_password instead of a password to store one hashed already.
+        """
         if not email:
             raise ValueError("Email is required")
         if not site:
@@ -45,7 +58,10 @@ class UserManager(BaseUserManager):
         user: User = self.model(
             username=username, email=email, site=site, name=name, **extra_fields
         )  # type: ignore[assignment]
-        user.set_password(password)
+        if hashed_password is None:
+            user.set_password(password)
+        else:
+            user.password = hashed_password
         user.save(using=self._db)
         return user
 
@@ -81,22 +97,67 @@ class UserManager(BaseUserManager):
 
         return self._create_user(email, site, password, name, **extra_fields)
 
+    def bulk_create(self, objs, *args, **kwargs) -> list[User]:
+        """
+        Like QuerySet.bulk_create, but normalizes emails and derives usernames like
+        User.save() does. Doesn't run full_clean(), so the database constraints are
+        the only validation.
+        """
+        objs = list(objs)
+        for user in objs:
+            user.normalize()
+        return super().bulk_create(objs, *args, **kwargs)
+
     def get_by_email_and_site(self, email: str, site: Site) -> User:
         """Public method to get user by email within a site context."""
         return self.get(email__iexact=email, site=site)  # type: ignore[return-value]
 
-    def authenticate_user(self, email: str, site: Site, password: str) -> User | None:
-        """Authenticate user with email + site context, using internal username."""
+    def username_for(self, email: str, site: Site) -> str:
+        """The internal username for an email within a site: "site_id-email"."""
+        return f"{site.pk}-{self.normalize_email(email).lower()}"
+
+    def authenticate_user(
+        self,
+        email: str,
+        site: Site,
+        password: str,
+        request=None,
+        limit_hashing: bool = False,
+    ) -> User | None:
+        """
+        Authenticate user with email + site context.
+
+        Does what django.contrib.auth.authenticate does with the ModelBackend, but
+        fetches the user once, by the unique internal username, instead of by email
+        and then again by username. Sends user_login_failed on failure; the
+        user_logged_in signal is sent by login() as usual.
+
+        With limit_hashing, the password check runs in a slot of the API's hashing
+        pool (see project.accounts.hashing) and raises PasswordHashingBusy when no
+        slot frees up. The query for the user runs outside the slot.
+        """
+        run = password_hashing.run if limit_hashing else _run_unlimited
         try:
-            user = self.get_by_email_and_site(email, site)
-            # Use internal username for Django's authenticate
-            from django.contrib.auth import authenticate
-
-            authenticated = authenticate(username=user.username, password=password)
-            # Ensure we return a User instance, not AbstractUser
-            return authenticated if isinstance(authenticated, User) else None
-        except User.DoesNotExist:
+            user = self.get(username=self.username_for(email, site))
+        except self.model.DoesNotExist:
+            # Run the hasher anyway, so missing users can't be told apart by timing.
+            run("verify", make_password, password)
+            user = None
+        else:
+            verified = run("verify", user.check_password, password)
+            if not (verified and user.is_active):
+                user = None
+
+        if user is None:
+            user_login_failed.send(
+                sender=__name__,
+                credentials={"email": email, "password": "********"},
+                request=request,
+            )
             return None
+        # Needed by login() when more than one backend is configured.
+        user.backend = "django.contrib.auth.backends.ModelBackend"
+        return user
 
 
 class SiteAwareQuerySet(models.QuerySet):
@@ -178,28 +239,73 @@ class User(AbstractBaseUser, PermissionsMixin):
             ),
             models.UniqueConstraint(Upper("username"), name="user_username_key"),  # type: ignore
         ]
+        indexes = [
+            # Matches the email__iexact and site lookups (UPPER(email) = UPPER(%s)),
+            # which the unique_email_per_site index can't serve.
+            models.Index(Upper("email"), "site", name="user_email_upper_site_idx"),
+            # Trigram indexes for the admin search, which filters with icontains
+            # (UPPER(field) LIKE UPPER('%...%')).
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="user_email_upper_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="user_name_upper_trgm_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.email} ({self.site.name})"
 
+    # Fields that no constraint, uniqueness check or clean() depends on. Saves that
+    # only update these skip full_clean()'s validation queries (see save()).
+    UNCONSTRAINED_FIELDS = frozenset(
+        {
+            "last_login",
+            "name",
+            "is_active",
+            "is_staff",
+            "is_superuser",
+            "password",
+            "date_joined",
+        }
+    )
+
     def clean(self):
         """Validate that username matches expected format."""
-        if self.username and self.site and self.email:
-            expected_username = f"{self.site.pk}-{self.email}"
+        if self.username and self.site_id and self.email:
+            expected_username = f"{self.site_id}-{self.email}"
             if self.username != expected_username:
                 raise ValidationError(
                     f"Username must be in format 'site_id-email', got '{self.username}'"
                 )
 
-    def save(self, *args, **kwargs):
-        # Normalize email consistently
+    def normalize(self):
+        """Normalize the email and derive the username, as save() does."""
         if self.email:
-            from django.contrib.auth.models import BaseUserManager
-
-            self.email = BaseUserManager.normalize_email(self.email).lower()
+            self.email = User.objects.normalize_email(self.email).lower()
 
         # Auto-generate username if not set
-        if not self.username and self.site and self.email:
-            self.username = f"{self.site.pk}-{self.email}"
-        self.full_clean()
+        if not self.username and self.site_id and self.email:
+            self.username = f"{self.site_id}-{self.email}"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and self.UNCONSTRAINED_FIELDS.issuperset(
+            update_fields
+        ):
+            # E.g. last_login on every login: validate just these fields, which
+            # doesn't need any queries. (The name length check constraint is
+            # covered by the field's max_length.)
+            self.clean_fields(
+                exclude=[
+                    field.name
+                    for field in self._meta.fields
+                    if field.name not in update_fields
+                ]
+            )
+        else:
+            self.normalize()
+            self.full_clean()
         super().save(*args, **kwargs)
@@ -6,8 +6,10 @@ from dj_rest_auth.serializers import (
     PasswordResetSerializer as RestAuthPasswordResetSerializer,
 )
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from rest_framework import serializers
 
+from .hashing import password_hashing
 from .models import User
 
 
@@ -54,9 +56,12 @@ class RegisterSerializer(BaseRegisterSerializer):
         password = self.validated_data.get("password1")
         name = self.validated_data.get("name", "")
 
-        # Create user with site context
+        # Hash in a slot of the pool, then create the user outside it.
         user = User.objects.create_user(
-            email=email, site=site, name=name, password=password
+            email=email,
+            site=site,
+            name=name,
+            hashed_password=password_hashing.run("hash", make_password, password),
         )
 
         return user
@@ -93,7 +98,9 @@ class LoginSerializer(RestAuthLoginSerializer):
             site = request.site
 
             # Use our custom authentication method
-            return User.objects.authenticate_user(email, site, password)
+            return User.objects.authenticate_user(
+                email, site, password, request=request, limit_hashing=True
+            )
 
         return None
 
@@ -125,7 +132,7 @@ class EmailChangeSerializer(serializers.Serializer):
         new_email = attrs["new_email"]
 
         # Verify password
-        if not user.check_password(password):
+        if not password_hashing.run("verify", user.check_password, password):
             raise serializers.ValidationError({"password": "Invalid password."})
 
         # Check if email already exists in this site
@@ -0,0 +1,73 @@
+import logging
+
+from anymail.exceptions import AnymailAPIError
+from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.mail import get_connection
+
+from project.accounts.emails import render_email
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: connection problems (SMTPException is an OSError too) and
+# provider API errors such as rate limits and outages.
+TRANSIENT_ERRORS = (OSError, AnymailAPIError)
+
+
+@shared_task(bind=True, ignore_result=True)
+def send_account_emails(self, messages: list[dict]) -> None:
+    """
+    Render and send emails queued by project.accounts.emails over one connection.
+
+    Messages that fail with a transient error are retried with exponential backoff,
+    the ones that were sent aren't sent again.
+    """
+    failed = []
+    error: Exception | None = None
+    connection = get_connection()
+    try:
+        connection.open()
+    except TRANSIENT_ERRORS as exc:
+        failed, error = messages, exc
+    else:
+        try:
+            for message in messages:
+                try:
+                    email = render_email(message)
+                except ObjectDoesNotExist:
+                    # E.g. the user was deleted in the meantime.
+                    logger.warning(
+                        "Dropping %s email to %s",
+                        message["template_prefix"],
+                        message["email"],
+                        exc_info=True,
+                    )
+                    continue
+                email.connection = connection
+                try:
+                    email.send()
+                except TRANSIENT_ERRORS as exc:
+                    failed.append(message)
+                    error = exc
+        finally:
+            connection.close()
+
+    if not failed:
+        return
+    if self.request.retries >= settings.ACCOUNT_EMAIL_MAX_RETRIES:
+        logger.error("Giving up on %s emails", len(failed), exc_info=error)
+        return
+    logger.warning("Retrying %s emails", len(failed), exc_info=error)
+    raise self.retry(
+        args=[failed],
+        exc=error,
+        countdown=get_exponential_backoff_interval(
+            factor=settings.ACCOUNT_EMAIL_RETRY_BACKOFF,
+            retries=self.request.retries,
+            maximum=settings.ACCOUNT_EMAIL_RETRY_BACKOFF_MAX,
+            full_jitter=True,
+        ),
+        max_retries=settings.ACCOUNT_EMAIL_MAX_RETRIES,
+    )
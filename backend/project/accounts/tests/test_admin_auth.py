@@ -3,6 +3,10 @@ from unittest.mock import Mock
 import pytest
 from django.contrib.admin.sites import AdminSite
 from django.contrib.sites.models import Site
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 from ..admin import EmailAuthenticationForm, UserAdmin, UserChangeForm, UserCreationForm
 from ..models import User
@@ -293,3 +297,46 @@ class TestAdminUserForms:
         assert "site" in fields  # Critical for multi-tenancy
         assert "password1" in fields
         assert "password2" in fields
+
+
+@pytest.mark.django_db
+class TestUserChangelist:
+    @pytest.fixture
+    def admin_client(self, client, site):
+        admin = User.objects.create_superuser(
+            email="admin@example.com", site=site, password="admin-password-123!"
+        )
+        client.force_login(admin)
+        return client
+
+    def get_changelist(self, client, site, **params):
+        return client.get(
+            reverse("admin:accounts_user_changelist"), params, HTTP_HOST=site.domain
+        )
+
+    def test_sites_are_joined(
+        self, admin_client, site, other_site, django_assert_num_queries
+    ):
+        self.get_changelist(admin_client, site)
+        with CaptureQueriesContext(connection) as before:
+            self.get_changelist(admin_client, site)
+        for i in range(5):
+            User.objects.create_user(email=f"user-{i}@example.com", site=other_site)
+        with django_assert_num_queries(len(before)):
+            response = self.get_changelist(admin_client, site)
+        assert response.status_code == 200
+        assert other_site.domain in response.content.decode()
+
+    def test_search(self, admin_client, site, user):
+        response = self.get_changelist(admin_client, site, q="TEST@")
+        assert response.status_code == 200
+        assert list(response.context["cl"].result_list) == [user]
+
+    def test_search_is_indexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = User.objects.filter(
+            Q(email__icontains="exam") | Q(name__icontains="exam")
+        ).explain()
+        assert "user_email_upper_trgm_idx" in plan
+        assert "user_name_upper_trgm_idx" in plan
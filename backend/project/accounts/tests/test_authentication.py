@@ -0,0 +1,134 @@
+import time
+
+import pytest
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from project.accounts.authentication import cache_user, get_cached_user
+from project.accounts.models import User
+from project.core.sites import site_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    caches["shared"].clear()
+
+
+@pytest.mark.django_db
+class TestCachedJWTCookieAuthentication:
+    @pytest.fixture
+    def client(self, api_client: APIClient, user: User) -> APIClient:
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        site_cache.warm()
+        return api_client
+
+    def authcheck(self, client: APIClient, user: User):
+        return client.get(reverse("authcheck"), HTTP_HOST=user.site.domain)
+
+    def test_cached_user_needs_no_queries(
+        self, client, user, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            assert self.authcheck(client, user).status_code == 204
+        with django_assert_num_queries(0):
+            assert self.authcheck(client, user).status_code == 204
+
+    def test_save_invalidates(self, client, user, django_capture_on_commit_callbacks):
+        self.authcheck(client, user)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.name = "Renamed"
+            user.save()
+        assert get_cached_user(user.pk)[0] is None
+
+    def test_delete_invalidates(self, client, user, django_capture_on_commit_callbacks):
+        self.authcheck(client, user)
+        user_id = user.pk
+        row = User.objects.get(pk=user_id)
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                user.delete()
+                # A request re-caches the row before the delete is committed.
+                cache_user(row, get_cached_user(user_id)[1])
+                assert get_cached_user(user_id)[0] is not None
+        assert get_cached_user(user_id)[0] is None
+
+    def test_versions_outlive_access_tokens(self, client, user):
+        self.authcheck(client, user)
+        cache = caches["shared"]
+        expires_at = cache._expire_info[cache.make_key(f"jwt-user-version:{user.pk}")]
+        lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        assert lifetime - 5 < expires_at - time.time() <= lifetime
+
+    def test_deactivation_takes_effect_immediately(self, client, user):
+        self.authcheck(client, user)
+        user.is_active = False
+        user.save()
+        assert self.authcheck(client, user).status_code == 401
+
+    def test_deactivated_cached_user_is_rejected(self, client, user):
+        self.authcheck(client, user)
+        # As if the cache still held an inactive user.
+        version, fields, digest = caches["shared"].get(f"jwt-user:{user.pk}")
+        entry = (version, {**fields, "is_active": False}, digest)
+        caches["shared"].set(f"jwt-user:{user.pk}", entry)
+        assert self.authcheck(client, user).status_code == 401
+
+    def test_password_hashes_are_not_cached(self, client, user):
+        self.authcheck(client, user)
+        _, fields, digest = caches["shared"].get(f"jwt-user:{user.pk}")
+        assert "password" not in fields
+        assert user.password not in digest
+
+        cached = get_cached_user(user.pk)[0].user
+        assert cached == user
+        assert cached.get_deferred_fields() == {"password"}
+        # Saving the cached user leaves the password alone.
+        cached.name = "Renamed"
+        cached.save()
+        user.refresh_from_db()
+        assert user.name == "Renamed"
+        assert user.check_password("a-super-strong-password-145338-@!#&")
+
+    def test_revocation_is_checked_against_the_cached_digest(
+        self, api_client, user, monkeypatch, django_assert_num_queries
+    ):
+        monkeypatch.setattr(api_settings, "CHECK_REVOKE_TOKEN", True)
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        site_cache.warm()
+        self.authcheck(api_client, user)
+        with django_assert_num_queries(0):
+            assert self.authcheck(api_client, user).status_code == 204
+
+        # As if the password changed since the token was issued.
+        version, fields, _ = caches["shared"].get(f"jwt-user:{user.pk}")
+        caches["shared"].set(f"jwt-user:{user.pk}", (version, fields, "changed"))
+        assert self.authcheck(api_client, user).status_code == 401
+
+    def test_group_change_invalidates(self, client, user):
+        self.authcheck(client, user)
+        user.groups.add(Group.objects.create(name="Editors"))
+        assert get_cached_user(user.pk)[0] is None
+
+    def test_stale_row_is_not_cached_under_new_version(self, client, user):
+        # A request read the version, then the user changed before it cached.
+        _, version = get_cached_user(user.pk)
+        user.save()
+        cache_user(user, version)
+        assert get_cached_user(user.pk)[0] is None
+
+    def test_cache_can_be_disabled(
+        self, client, user, settings, django_assert_num_queries
+    ):
+        settings.JWT_USER_CACHE_TTL = 0
+        self.authcheck(client, user)
+        with django_assert_num_queries(1):
+            assert self.authcheck(client, user).status_code == 204
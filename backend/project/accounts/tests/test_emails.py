@@ -0,0 +1,142 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project.accounts.models import User
+from project.accounts.tasks import send_account_emails
+
+
+@pytest.fixture(autouse=True)
+def async_emails(settings):
+    settings.ACCOUNT_EMAIL_ASYNC = True
+
+
+@pytest.fixture
+def delay():
+    with patch.object(send_account_emails, "delay") as delay:
+        yield delay
+
+
+def message(user: User, prefix: str = "account/email/password_reset_key") -> dict:
+    return {
+        "template_prefix": prefix,
+        "email": user.email,
+        "site_id": user.site_id,
+        "context": {
+            "user": {"__model__": "accounts.user", "pk": user.pk},
+            "password_reset_url": "https://example.com/reset",
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestQueuedEmails:
+    def reset_password(self, api_client: APIClient, user: User):
+        return api_client.post(
+            reverse("rest_password_reset"),
+            {"email": user.email},
+            HTTP_HOST=user.site.domain,
+        )
+
+    def test_password_reset_is_sent_by_the_worker(
+        self, api_client, user, delay, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            assert self.reset_password(api_client, user).status_code == 200
+        assert len(mail.outbox) == 0
+
+        ((messages,), _) = delay.call_args
+        assert messages == [
+            {
+                "template_prefix": "account/email/password_reset_key",
+                "email": user.email,
+                "site_id": user.site_id,
+                "context": {
+                    "user": {"__model__": "accounts.user", "pk": user.pk},
+                    "password_reset_url": messages[0]["context"]["password_reset_url"],
+                },
+            }
+        ]
+
+        send_account_emails.apply(args=[messages])
+        (email,) = mail.outbox
+        assert email.to == [user.email]
+        assert f"Hello from {user.site.name}!" in email.body
+        assert messages[0]["context"]["password_reset_url"] in email.body
+
+    def test_nothing_is_queued_before_commit(
+        self, api_client, user, delay, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            self.reset_password(api_client, user)
+        assert len(callbacks) == 1
+        delay.assert_not_called()
+
+    def test_email_confirmation(
+        self, api_client, user, delay, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                reverse("change-email"),
+                {
+                    "new_email": "new@example.com",
+                    "password": "a-super-strong-password-145338-@!#&",
+                },
+                HTTP_HOST=user.site.domain,
+            )
+        assert response.status_code == 200
+        ((messages,), _) = delay.call_args
+        send_account_emails.apply(args=[messages])
+        (email,) = mail.outbox
+        assert email.to == ["new@example.com"]
+        assert "?key=" in email.body
+
+
+@pytest.mark.django_db
+class TestSendAccountEmails:
+    @pytest.fixture
+    def connection(self):
+        connection = Mock()
+        with patch("project.accounts.tasks.get_connection", return_value=connection):
+            yield connection
+
+    def recipients(self, connection: Mock) -> list[str]:
+        return [
+            call.args[0][0].to[0] for call in connection.send_messages.call_args_list
+        ]
+
+    def test_one_connection_per_batch(self, user, same_site_user, connection):
+        send_account_emails.apply(args=[[message(user), message(same_site_user)]])
+        connection.open.assert_called_once()
+        connection.close.assert_called_once()
+        assert self.recipients(connection) == [user.email, same_site_user.email]
+
+    def test_only_failed_emails_are_retried(self, user, same_site_user, connection):
+        connection.send_messages.side_effect = [ConnectionError, 1, 1]
+        send_account_emails.apply(args=[[message(user), message(same_site_user)]])
+        assert self.recipients(connection) == [
+            user.email,
+            same_site_user.email,
+            user.email,
+        ]
+
+    def test_connection_errors_retry_everything(self, user, connection):
+        connection.open.side_effect = [OSError, None]
+        send_account_emails.apply(args=[[message(user)]])
+        assert self.recipients(connection) == [user.email]
+
+    def test_gives_up_after_max_retries(self, user, connection, settings):
+        settings.ACCOUNT_EMAIL_MAX_RETRIES = 2
+        connection.send_messages.side_effect = ConnectionError
+        send_account_emails.apply(args=[[message(user)]])
+        assert connection.send_messages.call_count == 3
+
+    def test_deleted_users_are_skipped(self, user, same_site_user, connection):
+        messages = [message(user), message(same_site_user)]
+        user.delete()
+        send_account_emails.apply(args=[messages])
+        assert self.recipients(connection) == [same_site_user.email]
@@ -0,0 +1,157 @@
+import os
+import runpy
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project.accounts.hashing import PasswordHashingBusy, password_hashing
+from project.accounts.models import User
+from project.core.metrics import registry
+
+PASSWORD = "a-super-strong-password-145338-@!#&"
+
+
+@pytest.fixture(autouse=True)
+def hashing_settings(settings):
+    settings.PASSWORD_HASHING_CONCURRENCY = 1
+    settings.PASSWORD_HASHING_QUEUE_TIMEOUT = 0.01
+    password_hashing.reset_stats()
+
+
+@pytest.fixture
+def busy():
+    """Take the only hashing slot for the duration of the test."""
+    semaphore = password_hashing._get_semaphore()
+    semaphore.acquire()
+    yield
+    semaphore.release()
+
+
+class TestPasswordHashingPool:
+    def test_run_records_durations(self):
+        assert password_hashing.run("verify", lambda: True)
+        assert password_hashing.durations["verify"].count == 1
+        assert password_hashing.queue_wait.count == 1
+        assert password_hashing.in_flight == 0
+
+    def test_busy_pool_fails_fast(self, busy):
+        with pytest.raises(PasswordHashingBusy) as excinfo:
+            password_hashing.run("verify", lambda: True)
+        assert excinfo.value.wait == 1
+        assert password_hashing.rejected == 1
+
+    def test_slot_is_released_on_error(self):
+        with pytest.raises(ValueError):
+            password_hashing.run("hash", lambda: int("x"))
+        assert password_hashing.run("hash", lambda: True)
+
+    def test_limit_can_be_disabled(self, settings, busy):
+        settings.PASSWORD_HASHING_CONCURRENCY = 0
+        assert password_hashing.run("verify", lambda: True)
+
+    def test_shipped_worker_config_is_limited(self, settings):
+        with patch.dict(os.environ):
+            config = runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+        settings.PASSWORD_HASHING_CONCURRENCY = 2
+        requests = config["threads"]
+        assert requests > settings.PASSWORD_HASHING_CONCURRENCY
+
+        release = threading.Event()
+        results = []
+
+        def request():
+            try:
+                results.append(password_hashing.run("verify", release.wait))
+            except PasswordHashingBusy:
+                results.append("busy")
+
+        threads = [threading.Thread(target=request) for _ in range(requests)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while password_hashing.rejected < requests - 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert password_hashing.in_flight == 2
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert results.count("busy") == requests - 2
+        assert results.count(True) == 2
+
+    def test_metrics(self):
+        password_hashing.run("verify", lambda: True)
+        output = registry.render()
+        assert "password_hashing_queue_wait_seconds_count" in output
+        assert 'operation="verify"' in output
+        assert "password_hashing_rejected_total" in output
+
+
+@pytest.mark.django_db
+class TestSlotsOnlyCoverHashing:
+    @pytest.fixture
+    def slots_held_by_queries(self):
+        """The number of slots in use during every query."""
+        held = []
+
+        def record(execute, sql, params, many, context):
+            held.append(password_hashing.in_flight)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            yield held
+
+    def test_login(self, api_client: APIClient, user: User, slots_held_by_queries):
+        response = api_client.post(
+            reverse("rest_login"),
+            {"email": user.email, "password": PASSWORD},
+            HTTP_HOST=user.site.domain,
+        )
+        assert response.status_code == 200
+        assert password_hashing.durations["verify"].count == 1
+        assert slots_held_by_queries and not any(slots_held_by_queries)
+
+    def test_signup(self, api_client: APIClient, site, slots_held_by_queries):
+        response = api_client.post(
+            reverse("custom-signup"),
+            {"email": "new@example.com", "password1": PASSWORD, "password2": PASSWORD},
+            HTTP_HOST=site.domain,
+        )
+        assert response.status_code == 201
+        assert User.objects.get(email="new@example.com").check_password(PASSWORD)
+        assert password_hashing.durations["hash"].count == 1
+        assert slots_held_by_queries and not any(slots_held_by_queries)
+
+
+@pytest.mark.django_db
+class TestBusyResponses:
+    def test_login(self, api_client: APIClient, user: User, busy):
+        response = api_client.post(
+            reverse("rest_login"),
+            {"email": user.email, "password": PASSWORD},
+            HTTP_HOST=user.site.domain,
+        )
+        assert response.status_code == 503
+        assert response["Retry-After"] == "1"
+
+    def test_signup(self, api_client: APIClient, site, busy):
+        response = api_client.post(
+            reverse("custom-signup"),
+            {"email": "new@example.com", "password1": PASSWORD, "password2": PASSWORD},
+            HTTP_HOST=site.domain,
+        )
+        assert response.status_code == 503
+        assert not User.objects.filter(email="new@example.com").exists()
+
+    def test_change_email(self, api_client: APIClient, user: User, busy):
+        api_client.force_authenticate(user=user)
+        response = api_client.post(
+            reverse("change-email"),
+            {"new_email": "new@example.com", "password": PASSWORD},
+            HTTP_HOST=user.site.domain,
+        )
+        assert response.status_code == 503
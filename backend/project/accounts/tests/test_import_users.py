@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.contrib.sites.models import Site
+from django.core.management import CommandError, call_command
+
+from project.accounts.models import User
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "email,name,password\n"
+        "Piet@Example.com,Piet,secret-1\n"
+        "piet@example.com,Duplicate,secret-2\n"
+        "not-an-email,Invalid,secret-3\n"
+        "anna@example.com,,\n"
+    )
+    return path
+
+
+@pytest.mark.django_db
+class TestImportUsers:
+    def test_csv(self, site, csv_file, capsys):
+        call_command(
+            "import_users", str(csv_file), "--site", site.domain, "--workers", "0"
+        )
+
+        piet = User.objects.get(username=f"{site.pk}-piet@example.com")
+        assert piet.email == "piet@example.com"
+        assert piet.name == "Piet"
+        assert piet.check_password("secret-1")
+        assert not User.objects.get(email="anna@example.com").has_usable_password()
+
+        address = EmailAddress.objects.get(user=piet)
+        assert address.primary and not address.verified
+
+        output = capsys.readouterr().out
+        assert "Imported 2 users" in output
+        assert "Skipped 1 existing and 1 invalid rows" in output
+        assert "rows/s" in output
+
+    def test_existing_users_are_skipped(self, user, csv_file, capsys):
+        (csv_file.parent / "again.csv").write_text(
+            "email,name,password\ntest@example.com,Again,secret\n"
+        )
+        call_command(
+            "import_users",
+            str(csv_file.parent / "again.csv"),
+            "--site",
+            str(user.site.pk),
+            "--workers",
+            "0",
+        )
+        user.refresh_from_db()
+        assert user.name == "Test User"
+        assert "Skipped 1 existing" in capsys.readouterr().out
+
+    def test_process_pool(self, site, csv_file):
+        call_command(
+            "import_users", str(csv_file), "--site", site.domain, "--workers", "2"
+        )
+        assert User.objects.get(email="piet@example.com").check_password("secret-1")
+
+    def test_prehashed_ndjson(self, site, tmp_path):
+        path = tmp_path / "users.ndjson"
+        path.write_text(
+            json.dumps({"email": "a@example.com", "password": make_password("pw")})
+            + "\n"
+            + json.dumps({"email": "b@example.com", "password": "plain-text"})
+            + "\n"
+        )
+        call_command(
+            "import_users",
+            str(path),
+            "--site",
+            site.domain,
+            "--prehashed",
+            "--verified",
+        )
+        user = User.objects.get(email="a@example.com")
+        assert user.check_password("pw")
+        assert EmailAddress.objects.get(user=user).verified
+        # Unhashed passwords aren't accepted as hashes.
+        assert not User.objects.filter(email="b@example.com").exists()
+
+    def test_rows_over_the_length_limits_are_skipped(self, site, tmp_path, capsys):
+        path = tmp_path / "users.csv"
+        path.write_text(
+            "email,name\n"
+            f"{'a' * 250}@example.com,Long email\n"
+            f"long@example.com,{'n' * 501}\n"
+            "ok@example.com,OK\n"
+        )
+        call_command("import_users", str(path), "--site", site.domain)
+        assert list(User.objects.values_list("email", flat=True)) == ["ok@example.com"]
+        assert "Skipped 0 existing and 2 invalid rows" in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        "line",
+        ['{"email": "broken@example.com",', '{"email": 5}', '["a@example.com"]'],
+    )
+    def test_unreadable_rows_are_skipped(self, site, tmp_path, capsys, line):
+        path = tmp_path / "users.ndjson"
+        path.write_text(f'{line}\n{json.dumps({"email": "ok@example.com"})}\n')
+        call_command("import_users", str(path), "--site", site.domain)
+        assert list(User.objects.values_list("email", flat=True)) == ["ok@example.com"]
+        assert "Skipped 0 existing and 1 invalid rows" in capsys.readouterr().out
+
+    def test_users_without_email_address_are_reported(self, user, tmp_path, capsys):
+        EmailAddress.objects.create(
+            user=user, email="shared@example.com", primary=False, verified=True
+        )
+        other = Site.objects.create(domain="other.example.com", name="Other")
+        path = tmp_path / "users.csv"
+        path.write_text("email\nshared@example.com\n")
+        call_command("import_users", str(path), "--site", other.domain, "--verified")
+
+        imported = User.objects.get(site=other, email="shared@example.com")
+        assert not EmailAddress.objects.filter(user=imported).exists()
+        assert "1 imported users have no email address" in capsys.readouterr().err
+
+    def test_unknown_site(self, csv_file):
+        with pytest.raises(CommandError):
+            call_command("import_users", str(csv_file), "--site", "missing.example.com")
@@ -1,7 +1,9 @@
 import pytest
+from django.contrib.auth.signals import user_login_failed
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
 
 from ..models import User
 
@@ -158,3 +160,78 @@ class TestUser:
             "auth@example.com", other_site, "authpassword"
         )
         assert not_authenticated is None
+
+    def test_authenticate_user_makes_one_query(self, site, django_assert_num_queries):
+        user = User.objects.create_user(
+            email="auth@example.com", site=site, password="authpassword"
+        )
+        with django_assert_num_queries(1):
+            assert (
+                User.objects.authenticate_user("Auth@Example.com", site, "authpassword")
+                == user
+            )
+
+    def test_authenticate_user_rejects_inactive_users(self, site):
+        User.objects.create_user(
+            email="auth@example.com",
+            site=site,
+            password="authpassword",
+            is_active=False,
+        )
+        assert (
+            User.objects.authenticate_user("auth@example.com", site, "authpassword")
+            is None
+        )
+
+    def test_authenticate_user_sends_login_failed(self, site):
+        failures = []
+
+        def receiver(credentials, **kwargs):
+            failures.append(credentials)
+
+        user_login_failed.connect(receiver)
+        try:
+            User.objects.authenticate_user("missing@example.com", site, "secret")
+        finally:
+            user_login_failed.disconnect(receiver)
+        assert failures == [{"email": "missing@example.com", "password": "********"}]
+
+
+@pytest.mark.django_db
+class TestUserSave:
+    def test_unconstrained_update_makes_no_validation_queries(
+        self, user, django_assert_num_queries
+    ):
+        user = User.objects.get(pk=user.pk)  # Without the site loaded.
+        user.last_login = timezone.now()
+        with django_assert_num_queries(1):
+            user.save(update_fields=["last_login"])
+
+    def test_unconstrained_update_validates_fields(self, user):
+        user.name = "x" * 501
+        with pytest.raises(ValidationError):
+            user.save(update_fields=["name"])
+
+    def test_constrained_update_runs_full_clean(self, user, same_site_user):
+        user.email = same_site_user.email
+        user.username = same_site_user.username
+        with pytest.raises(ValidationError):
+            user.save(update_fields=["email", "username"])
+
+    def test_bulk_create_normalizes(self, site):
+        (user,) = User.objects.bulk_create([User(email="Bulk@Example.COM", site=site)])
+        user.refresh_from_db()
+        assert user.email == "bulk@example.com"
+        assert user.username == f"{site.pk}-bulk@example.com"
+
+
+@pytest.mark.django_db
+def test_email_lookups_are_indexed(site):
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    lookups = [
+        User.objects.filter(email__iexact="Test@Example.com", site=site),
+        User.objects.filter(email__iexact="Test@Example.com"),
+    ]
+    for queryset in lookups:
+        assert "user_email_upper_site_idx" in queryset.explain()
@@ -0,0 +1,79 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import redis
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project.accounts.models import User
+from project.accounts.throttling import parse_rate, token_buckets
+
+PASSWORD = "a-super-strong-password-145338-@!#&"
+
+
+@pytest.fixture(autouse=True)
+def throttling(settings):
+    settings.AUTH_THROTTLE_ENABLED = True
+
+
+@pytest.fixture
+def script():
+    script = Mock(return_value=[b"1", b"0"])
+    with patch.object(token_buckets, "_get_script", return_value=script):
+        yield script
+
+
+def test_parse_rate():
+    assert parse_rate("60/min") == 1
+    assert parse_rate("10/hour") == 10 / 3600
+
+
+@pytest.mark.django_db
+class TestAuthThrottle:
+    def login(self, api_client: APIClient, user: User, **extra):
+        return api_client.post(
+            reverse("rest_login"),
+            {"email": user.email.upper(), "password": PASSWORD},
+            HTTP_HOST=user.site.domain,
+            **extra,
+        )
+
+    def test_buckets_per_email_and_ip(self, api_client, user, script):
+        response = self.login(api_client, user, REMOTE_ADDR="10.0.0.1")
+        assert response.status_code == 200
+        keys = script.call_args.kwargs["keys"]
+        assert keys == [
+            "auth-throttle:login:ip:10.0.0.1",
+            f"auth-throttle:login:email:{user.site.pk}:test@example.com",
+        ]
+        assert script.call_args.kwargs["args"] == [60, 1.0, 10, 10 / 3600]
+
+    def test_throttled_before_hashing(self, api_client, user, script):
+        script.return_value = [b"0", b"12.5"]
+        with patch.object(User.objects, "authenticate_user") as authenticate_user:
+            response = self.login(api_client, user)
+        assert response.status_code == 429
+        assert response["Retry-After"] == "13"
+        authenticate_user.assert_not_called()
+
+    def test_signup_is_throttled(self, api_client, site, script):
+        script.return_value = [b"0", b"1"]
+        response = api_client.post(
+            reverse("custom-signup"),
+            {"email": "new@example.com", "password1": PASSWORD, "password2": PASSWORD},
+            HTTP_HOST=site.domain,
+        )
+        assert response.status_code == 429
+        assert script.call_args.kwargs["keys"][0].startswith("auth-throttle:signup:")
+        assert not User.objects.filter(email="new@example.com").exists()
+
+    def test_redis_errors_let_requests_through(self, api_client, user):
+        with patch.object(
+            token_buckets, "_get_script", side_effect=redis.ConnectionError
+        ):
+            assert self.login(api_client, user).status_code == 200
+
+    def test_can_be_disabled(self, api_client, user, script, settings):
+        settings.AUTH_THROTTLE_ENABLED = False
+        assert self.login(api_client, user).status_code == 200
+        script.assert_not_called()
@@ -11,6 +11,7 @@ from model_bakery import baker
 from rest_framework.test import APIClient
 
 from project.accounts.models import User
+from project.core.sites import site_cache
 
 
 class SiteMiddlewareMixin:
@@ -120,6 +121,28 @@ class TestAuth(SiteMiddlewareMixin):
         )
         assert response.status_code == HTTPStatus.NO_CONTENT
 
+    def test_login_queries(
+        self, api_client: APIClient, user: User, django_assert_max_num_queries
+    ):
+        site_cache.warm()
+        # The user, its last_login and the session (with savepoints), but no
+        # validation queries for the last_login update.
+        with django_assert_max_num_queries(9) as captured:
+            response = api_client.post(
+                reverse("rest_login"),
+                {
+                    "email": user.email,
+                    "password": "a-super-strong-password-145338-@!#&",
+                },
+                HTTP_HOST=user.site.domain,
+            )
+        assert response.status_code == HTTPStatus.OK
+        # One lookup by the unique username, and the last_login update.
+        users = [query["sql"] for query in captured if 'FROM "users"' in query["sql"]]
+        assert len(users) == 1
+        assert 'WHERE "users"."username" = ' in users[0]
+        assert sum(query["sql"].startswith('UPDATE "users"') for query in captured) == 1
+
 
 @pytest.mark.django_db
 class TestEmailChangeView(SiteMiddlewareMixin):
@@ -0,0 +1,148 @@
+"""
+Token-bucket throttling of logins and signups, shared by all workers through Redis.
+
+Every login and signup attempt costs a full Argon2 hash, which makes credential
+stuffing very expensive for us. These DRF throttles run before the serializer, so
+before any hashing or database work, and take a token from two buckets: one per
+(site, email) and one per client IP. A request is only let through when both
+buckets have a token left.
+
+Each check is a single Lua script call, so it's atomic and O(1) across workers.
+When Redis is unavailable, requests are let through rather than locking everyone
+out.
+
+Settings:
+- AUTH_THROTTLE_ENABLED: whether to throttle at all.
+- AUTH_THROTTLE_BUCKETS: capacity (burst size) and refill rate of the "email" and
+  "ip" buckets. Rates use DRF's "number/period" format.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import redis
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one bucket per key. ARGV: capacity and refill rate (tokens per second) for
+# each key, in the same order. Returns {allowed, seconds to wait} as strings.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local allowed = 1
+local wait = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local available = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - updated) * rate)
+    if available < 1 then
+        allowed = 0
+        wait = math.max(wait, (1 - available) / rate)
+    end
+    tokens[i] = available
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local available = tokens[i]
+    if allowed == 1 then
+        available = available - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(available), 'updated', tostring(now))
+    -- A bucket that refilled completely is the same as no bucket.
+    redis.call('PEXPIRE', key, math.ceil((capacity - available) / rate * 1000) + 1000)
+end
+return {tostring(allowed), tostring(wait)}
+"""
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> float:
+    """Tokens per second for a rate like "10/min", as in DRF's SimpleRateThrottle."""
+    number, period = rate.split("/")
+    return int(number) / PERIODS[period[0]]
+
+
+class TokenBuckets:
+    def __init__(self):
+        self._client: redis.Redis | None = None
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+            self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def consume(self, buckets: dict[str, tuple[int, float]]) -> tuple[bool, float]:
+        """
+        Take a token from every bucket, given as {key: (capacity, rate)}.
+
+        Returns whether the request is allowed and, if not, the seconds until it
+        would be. Takes nothing when any of the buckets is empty.
+        """
+        args: list[float] = []
+        for capacity, rate in buckets.values():
+            args += [capacity, rate]
+        try:
+            allowed, wait = self._get_script()(keys=list(buckets), args=args)
+        except redis.RedisError:
+            logger.warning("Could not check the auth throttle", exc_info=True)
+            return True, 0.0
+        return allowed in (b"1", "1"), float(wait)
+
+
+token_buckets = TokenBuckets()
+
+
+class AuthThrottle(BaseThrottle):
+    """Throttles requests per (site, email) from the request body and per client IP."""
+
+    scope: str
+
+    def __init__(self):
+        self._wait: float | None = None
+
+    def get_buckets(self, request) -> dict[str, tuple[int, float]]:
+        config = settings.AUTH_THROTTLE_BUCKETS
+        prefix = f"auth-throttle:{self.scope}"
+        buckets = {
+            f"{prefix}:ip:{self.get_ident(request)}": (
+                config["ip"]["capacity"],
+                parse_rate(config["ip"]["rate"]),
+            )
+        }
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        site = getattr(request, "site", None)
+        if isinstance(email, str) and email and site is not None:
+            key = f"{prefix}:email:{site.pk}:{email.strip().lower()}"
+            buckets[key] = (
+                config["email"]["capacity"],
+                parse_rate(config["email"]["rate"]),
+            )
+        return buckets
+
+    def allow_request(self, request, view) -> bool:
+        if not settings.AUTH_THROTTLE_ENABLED:
+            return True
+        allowed, self._wait = token_buckets.consume(self.get_buckets(request))
+        return allowed
+
+    def wait(self) -> float | None:
+        return self._wait
+
+
+class LoginThrottle(AuthThrottle):
+    scope = "login"
+
+
+class SignupThrottle(AuthThrottle):
+    scope = "signup"
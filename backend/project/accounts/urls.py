@@ -6,11 +6,17 @@ from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 from rest_framework.authtoken.models import TokenProxy
 
-from project.accounts.views import ChangeEmailView, CustomRegisterView
+from project.accounts.views import (
+    ChangeEmailView,
+    CustomLoginView,
+    CustomRegisterView,
+)
 
 urlpatterns = [
     # Custom signup view (overrides the default)
     path("signup/", CustomRegisterView.as_view(), name="custom-signup"),
+    # Throttled login view (overrides the default)
+    re_path(r"login/?$", CustomLoginView.as_view(), name="rest_login"),
     # Email verification URLs from dj_rest_auth.registration
     re_path(r"verify-email/?$", VerifyEmailView.as_view(), name="rest_verify_email"),
     re_path(
@@ -1,5 +1,6 @@
 from allauth.account.models import EmailAddress
 from dj_rest_auth.registration.views import RegisterView
+from dj_rest_auth.views import LoginView
 from django.db import transaction
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
@@ -7,6 +8,7 @@ from rest_framework.response import Response
 
 from .models import User
 from .serializers import EmailChangeSerializer, RegisterSerializer
+from .throttling import LoginThrottle, SignupThrottle
 
 
 class CustomRegisterView(RegisterView):
@@ -16,6 +18,7 @@ class CustomRegisterView(RegisterView):
     """
 
     serializer_class = RegisterSerializer
+    throttle_classes = [SignupThrottle]
 
     def get_serializer_context(self):
         """Add site context from request."""
@@ -29,6 +32,14 @@ class CustomRegisterView(RegisterView):
         return context
 
 
+class CustomLoginView(LoginView):
+    """
+    Login view that throttles attempts before the password is checked.
+    """
+
+    throttle_classes = [LoginThrottle]
+
+
 class ChangeEmailView(generics.GenericAPIView):
     serializer_class = EmailChangeSerializer
     permission_classes = [IsAuthenticated]
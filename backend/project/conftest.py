@@ -10,6 +10,7 @@ from rest_framework.test import APIClient
 
 from project.accounts.models import User
 from project.core import fields
+from project.core.sites import site_cache
 
 
 def _gen_slug(max_length: int = 500) -> str:  # pragma: no cover
@@ -31,7 +32,13 @@ def for_slug(field):
 
 
 TEST_SETTINGS = {
-    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "CACHES": {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shared",
+        },
+    },
     "PASSWORD_HASHERS": ["django.contrib.auth.hashers.MD5PasswordHasher"],
     "STORAGES": {
         "default": {
@@ -42,6 +49,9 @@ TEST_SETTINGS = {
         },
     },
     "WHITENOISE_AUTOREFRESH": True,
+    "SITE_CACHE_BROADCAST": False,
+    "AUTH_THROTTLE_ENABLED": False,
+    "ACCOUNT_EMAIL_ASYNC": False,
 }
 
 
@@ -71,6 +81,14 @@ def setup_test_site(django_db_setup, django_db_blocker):
         )
 
 
+@pytest.fixture(autouse=True)
+def clear_site_cache():
+    """Don't leak cached sites between tests (rows are rolled back, the cache isn't)."""
+    site_cache.clear()
+    site_cache.unknown_hosts.clear(clients=True)
+    site_cache.reset_stats()
+
+
 @pytest.fixture
 def api_client() -> APIClient:
     """Return a DRF API client instance."""
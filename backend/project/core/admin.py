@@ -1,29 +1,36 @@
 from django.contrib import admin
 from django.urls import path
-from drf_spectacular.views import SpectacularRedocView
 
-from project.core.docs.utils import get_docs_title
+from project.core.docs.views import TenantSpectacularRedocView
+from project.core.tenant import get_current_site
 from project.core.utils.frontend import get_frontend_base_url
 
-# We try to get the site name from the database, but this won't work
-# on a fresh project that hasn't done any migrations yet.
-try:
-    from django.contrib.sites.models import Site
+# Used outside of a request. Titles never query the database, so importing the
+# admin (and the URLconf) doesn't either.
+DEFAULT_SITE_NAME = "Project Backend"
 
-    site_name = Site.objects.get_current().name
-except Exception:  # pragma: no cover
-    site_name = "Project Backend"
+
+def get_tenant_name() -> str:
+    """Name of the tenant of the current request, if there is one."""
+    site = get_current_site()
+    return site.name if site is not None else DEFAULT_SITE_NAME
 
 
 class CustomAdminSite(admin.AdminSite):
     # Text to put at the end of each page's <title>.
-    site_title = f"{site_name} admin"
+    @property
+    def site_title(self):
+        return f"{get_tenant_name()} admin"
 
     # Text to put in each page's <h1> (and above login form).
-    site_header = f"{site_name} administration"
+    @property
+    def site_header(self):
+        return f"{get_tenant_name()} administration"
 
     # Text to put at the top of the admin index page.
-    index_title = f"{site_name} administration"
+    @property
+    def index_title(self):
+        return f"{get_tenant_name()} administration"
 
     # The URL for the “View site” link at the top of each admin page.
     site_url = get_frontend_base_url()
@@ -35,9 +42,8 @@ class CustomAdminSite(admin.AdminSite):
             path(
                 "docs/",
                 self.admin_view(
-                    SpectacularRedocView.as_view(
-                        url_name="schema", title=get_docs_title()
-                    )
+                    # Titled per request, after the tenant.
+                    TenantSpectacularRedocView.as_view(url_name="schema")
                 ),
                 name="docs",
             )
@@ -8,4 +8,19 @@ class CoreConfig(AppConfig):
     name = "project.core"
 
     def ready(self):
+        from django.contrib.sites.models import Site
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from project.core.metrics import install_query_recorder
+        from project.core.sites import invalidate_site_cache
+        from project.core.tenant import patch_site_manager
+
         CharField.register_lookup(Length)
+
+        patch_site_manager()
+
+        post_save.connect(invalidate_site_cache, sender=Site)
+        post_delete.connect(invalidate_site_cache, sender=Site)
+
+        connection_created.connect(install_query_recorder)
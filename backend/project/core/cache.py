@@ -0,0 +1,413 @@
+"""
+A two-tier cache backend: a bounded in-process LRU in front of Redis.
+
+Reads are served from the worker's own memory when possible and from Redis
+otherwise, so hot keys (tenants, fighters, scores) cost no network round trip.
+Writes go to Redis, drop the key from the local tier and are broadcast over Redis
+pub/sub, so that every other worker drops its local copy too. Until a worker is
+subscribed (and whenever the subscription fails) it skips the local tier, so it
+never serves values it can't hear about changes to. Local entries also expire
+after LOCAL_TIMEOUT seconds, which bounds staleness should a message be lost.
+The local tier and its listener are per process, shared by the backend instances
+Django creates for each thread (see LocalTier).
+
+Values of COMPRESS_MIN_LENGTH bytes or more are stored zlib compressed.
+
+Keys of the form "<namespace>:<key>" get the timeout configured for their
+namespace, unless one is given explicitly:
+
+    CACHES = {
+        "default": {
+            "BACKEND": "project.core.cache.TieredCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "NAMESPACES": {"fighters": 3600, "scoring": 30},
+                "LOCAL_MAX_ENTRIES": 1000,
+                "LOCAL_TIMEOUT": 60,
+                "COMPRESS_MIN_LENGTH": 1024,
+            },
+        },
+    }
+
+Other OPTIONS are passed on to Django's RedisCache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+import redis
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache, RedisSerializer
+
+from project.core.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Prefixes compressed values. Pickles start with b"\x80" and integers are stored
+# as digits, so neither can be mistaken for a compressed value.
+COMPRESSED = b"z"
+
+
+class CompressedSerializer(RedisSerializer):
+    def __init__(self, min_length: int = 1024, protocol=None):
+        super().__init__(protocol)
+        self.min_length = min_length
+
+    def dumps(self, obj):
+        data = super().dumps(obj)
+        if isinstance(data, bytes) and len(data) >= self.min_length:
+            return COMPRESSED + zlib.compress(data)
+        return data
+
+    def loads(self, data):
+        if isinstance(data, bytes) and data.startswith(COMPRESSED):
+            data = zlib.decompress(data[len(COMPRESSED) :])
+        return super().loads(data)
+
+
+class LocalCache:
+    """
+    A thread-safe LRU of serialized values with expiry times.
+
+    Values are kept serialized, like in Django's local-memory cache, so callers
+    can't change cached values by mutating what they got. The generation counts
+    invalidations: a value read from Redis is only stored if no invalidation
+    arrived while it was being read.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, timeout: float, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation or timeout <= 0:
+                return
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys) -> None:
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LocalTier:
+    """
+    A process's local cache and the pub/sub listener that keeps it fresh.
+
+    Django creates a cache backend per thread (and per async context), so the
+    tier lives in a registry, one per LOCATION and CHANNEL, and TieredCache
+    instances are views over it. Otherwise every thread would have a mostly empty
+    LRU of its own, and a listener thread and Redis connection to keep it fresh.
+    """
+
+    def __init__(self, channel: str, max_entries: int):
+        self.channel = channel
+        self.local = LocalCache(max_entries)
+        self.pid = os.getpid()
+        self.sender = uuid.uuid4().hex
+        self.listener: threading.Thread | None = None
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._retry_at = 0.0
+
+    def record(self, local: bool, found: bool) -> None:
+        with self._lock:
+            if local:
+                self.local_hits += 1
+            elif found:
+                self.remote_hits += 1
+            else:
+                self.misses += 1
+
+    def handle_message(self, message: dict) -> None:
+        try:
+            data = json.loads(message["data"])
+        except (KeyError, TypeError, ValueError):
+            return
+        # The sending worker already dropped the keys.
+        if data.get("sender") == self.sender:
+            return
+        with self._lock:
+            self.invalidations += 1
+        if data.get("keys") is None:
+            self.local.clear()
+        else:
+            self.local.discard(data["keys"])
+
+    def handle_listener_error(self, exc, pubsub, thread) -> None:
+        logger.warning("Cache invalidation listener stopped: %s", exc)
+        thread.stop()
+        pubsub.close()
+        self.listener = None
+        # Entries may have gone stale while we weren't listening.
+        self.local.clear()
+
+    def ensure_listener(self, client: redis.Redis) -> None:
+        """Start the listener thread, unless it's running or failed recently."""
+        if self.listener is not None or time.monotonic() < self._retry_at:
+            return
+        with self._lock:
+            if self.listener is not None:
+                return
+            self.local.clear()
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: self.handle_message})
+                self.listener = pubsub.run_in_thread(
+                    sleep_time=1,
+                    daemon=True,
+                    exception_handler=self.handle_listener_error,
+                )
+            except redis.RedisError:
+                logger.warning(
+                    "Could not subscribe to cache invalidations", exc_info=True
+                )
+                self._retry_at = time.monotonic() + 30
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pid": self.pid,
+                "local_size": len(self.local),
+                "local_hits": self.local_hits,
+                "remote_hits": self.remote_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+_tiers: dict[tuple[str, str], LocalTier] = {}
+_tiers_lock = threading.Lock()
+
+
+def get_local_tier(location: str, channel: str, max_entries: int) -> LocalTier:
+    """
+    This process's tier for a Redis location and channel, created on first use.
+
+    Like the site cache's listener (see project.core.sites), a tier is replaced
+    when the process id changes: gunicorn forks workers after the master may have
+    used the cache, and the master's listener thread doesn't survive the fork.
+    """
+    key = (location, channel)
+    tier = _tiers.get(key)
+    if tier is not None and tier.pid == os.getpid():
+        return tier
+    with _tiers_lock:
+        tier = _tiers.get(key)
+        if tier is None or tier.pid != os.getpid():
+            tier = _tiers[key] = LocalTier(channel, max_entries)
+        return tier
+
+
+class TieredCache(RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = dict(self._options)
+        self.namespaces: dict[str, int | None] = options.pop("NAMESPACES", {})
+        self.local_timeout: float = options.pop("LOCAL_TIMEOUT", 60)
+        self.channel: str = options.pop("CHANNEL", "project:cache:invalidate")
+        self.broadcast: bool = options.pop("BROADCAST", True)
+        self.local_max_entries: int = options.pop("LOCAL_MAX_ENTRIES", 1000)
+        self.serializer = CompressedSerializer(options.pop("COMPRESS_MIN_LENGTH", 1024))
+        options["serializer"] = self.serializer
+        self._options = options
+        self._location = ",".join(self._servers)
+
+    @property
+    def tier(self) -> LocalTier:
+        return get_local_tier(self._location, self.channel, self.local_max_entries)
+
+    @property
+    def local(self) -> LocalCache:
+        return self.tier.local
+
+    # Timeouts.
+
+    def _namespace(self, key: str) -> str | None:
+        namespace, separator, _ = key.partition(":")
+        return namespace if separator else None
+
+    def namespace_timeout(self, key: str, timeout=DEFAULT_TIMEOUT):
+        """The timeout for a key: the given one, its namespace's, or the default."""
+        if timeout is DEFAULT_TIMEOUT:
+            return self.namespaces.get(self._namespace(key), DEFAULT_TIMEOUT)
+        return timeout
+
+    def _local_timeout(self, key: str) -> float:
+        timeout = self.get_backend_timeout(self.namespace_timeout(key))
+        return (
+            self.local_timeout if timeout is None else min(timeout, self.local_timeout)
+        )
+
+    # Reads.
+
+    def _use_local(self) -> bool:
+        if not self.broadcast:
+            return True
+        self._ensure_listener()
+        return self.tier.listener is not None
+
+    def _record(self, local: bool, found: bool) -> None:
+        record_cache_lookup(found)
+        self.tier.record(local, found)
+
+    def get(self, key, default=None, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        use_local = self._use_local()
+        if use_local and (value := self.local.get(made_key)) is not None:
+            self._record(local=True, found=True)
+            return self.serializer.loads(value)
+
+        generation = self.local.generation
+        value = self._cache.get_client(made_key).get(made_key)
+        self._record(local=False, found=value is not None)
+        if value is None:
+            return default
+        if use_local:
+            self.local.set(made_key, value, self._local_timeout(key), generation)
+        return self.serializer.loads(value)
+
+    def get_many(self, keys, version=None):
+        key_map = {
+            self.make_and_validate_key(key, version=version): key for key in keys
+        }
+        use_local = self._use_local()
+        result = {}
+        missing = []
+        for made_key, key in key_map.items():
+            if use_local and (value := self.local.get(made_key)) is not None:
+                self._record(local=True, found=True)
+                result[key] = self.serializer.loads(value)
+            else:
+                missing.append(made_key)
+        if not missing:
+            return result
+
+        generation = self.local.generation
+        values = self._cache.get_client(None).mget(missing)
+        for made_key, value in zip(missing, values):
+            self._record(local=False, found=value is not None)
+            if value is None:
+                continue
+            key = key_map[made_key]
+            if use_local:
+                self.local.set(made_key, value, self._local_timeout(key), generation)
+            result[key] = self.serializer.loads(value)
+        return result
+
+    def has_key(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        if self._use_local() and self.local.get(made_key) is not None:
+            return True
+        return super().has_key(key, version=version)
+
+    # Writes.
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = super().add(key, value, self.namespace_timeout(key, timeout), version)
+        if added:
+            self._invalidate([self.make_key(key, version=version)])
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        super().set(key, value, self.namespace_timeout(key, timeout), version)
+        self._invalidate([self.make_key(key, version=version)])
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.namespace_timeout(key, timeout)
+        touched = super().touch(key, timeout, version)
+        if self.get_backend_timeout(timeout) == 0:
+            self._invalidate([self.make_key(key, version=version)])
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = super().delete(key, version)
+        self._invalidate([self.make_key(key, version=version)])
+        return deleted
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version)
+        self._invalidate([self.make_key(key, version=version)])
+        return value
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        # Redis sets many keys with one timeout, so group them by namespace.
+        groups: dict[object, dict] = {}
+        for key, value in data.items():
+            groups.setdefault(self.namespace_timeout(key, timeout), {})[key] = value
+        for group_timeout, group in groups.items():
+            super().set_many(group, group_timeout, version)
+        self._invalidate([self.make_key(key, version=version) for key in data])
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        super().delete_many(keys, version)
+        self._invalidate([self.make_key(key, version=version) for key in keys])
+
+    def clear(self):
+        cleared = super().clear()
+        self._invalidate(None)
+        return cleared
+
+    # Invalidation.
+
+    def _invalidate(self, keys: list[str] | None) -> None:
+        """Drop keys (or everything, for None) here and in every other worker."""
+        if not keys and keys is not None:
+            return
+        if keys is None:
+            self.local.clear()
+        else:
+            self.local.discard(keys)
+        if not self.broadcast:
+            return
+        message = json.dumps({"sender": self.tier.sender, "keys": keys})
+        try:
+            self._cache.get_client(None, write=True).publish(self.channel, message)
+        except redis.RedisError:
+            logger.warning("Could not broadcast cache invalidation", exc_info=True)
+
+    def _ensure_listener(self) -> None:
+        self.tier.ensure_listener(self._cache.get_client(None))
+
+    def stats(self) -> dict:
+        return self.tier.stats()
@@ -0,0 +1,137 @@
+"""
+The OpenAPI schema, built once at deploy time instead of on every request.
+
+Generating the schema walks every view and serializer, which takes seconds as the
+API grows. `manage.py build_schema` (run in the Docker build, next to
+collectstatic) writes the schema as YAML and JSON, each with gzip and brotli
+variants, to OPENAPI_SCHEMA_DIR. Workers load these files into memory on first
+use and serve them with a strong ETag per representation.
+
+With DEBUG on, the schema is generated live so changes show up immediately. If the
+files are missing otherwise, the schema is generated once and kept in memory.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import brotli
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+logger = logging.getLogger(__name__)
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+# Content encodings in order of preference, with their file suffixes.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass(frozen=True)
+class Representation:
+    body: bytes
+    etag: str
+
+
+def generate_schema(request=None) -> dict:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=request, public=True)
+
+
+def render_schema(schema: dict) -> dict[str, bytes]:
+    """The schema in every format, by format."""
+    return {
+        format: renderer().render(schema, renderer_context={})
+        for format, renderer in RENDERERS.items()
+    }
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def etag(body: bytes, encoding: str | None = None) -> str:
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def representations(
+    rendered: dict[str, bytes]
+) -> dict[tuple[str, str | None], Representation]:
+    """Every (format, content encoding) variant of the rendered schema."""
+    result = {}
+    for format, body in rendered.items():
+        result[format, None] = Representation(body, etag(body))
+        for encoding in ENCODINGS:
+            result[format, encoding] = Representation(
+                compress(body, encoding), etag(body, encoding)
+            )
+    return result
+
+
+def schema_path(directory: Path, format: str, encoding: str | None = None) -> Path:
+    return directory / f"openapi.{format}{ENCODINGS.get(encoding, '')}"
+
+
+def write_schema(directory: Path, rendered: dict[str, bytes]) -> list[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for (format, encoding), representation in representations(rendered).items():
+        path = schema_path(directory, format, encoding)
+        # Replace atomically, in case workers are reading the previous build.
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(representation.body)
+        tmp.replace(path)
+        paths.append(path)
+    return paths
+
+
+class PrebuiltSchema:
+    """The schema representations, loaded once per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._representations: dict[tuple[str, str | None], Representation] | None = (
+            None
+        )
+
+    def _load(self) -> dict[tuple[str, str | None], Representation]:
+        directory = Path(settings.OPENAPI_SCHEMA_DIR)
+        try:
+            result = {}
+            for format in RENDERERS:
+                body = schema_path(directory, format).read_bytes()
+                result[format, None] = Representation(body, etag(body))
+                for encoding in ENCODINGS:
+                    result[format, encoding] = Representation(
+                        schema_path(directory, format, encoding).read_bytes(),
+                        etag(body, encoding),
+                    )
+            return result
+        except FileNotFoundError:
+            logger.error(
+                "No prebuilt OpenAPI schema in %s, run manage.py build_schema. "
+                "Generating it now.",
+                directory,
+            )
+            return representations(render_schema(generate_schema()))
+
+    def get(self, format: str, encoding: str | None) -> Representation:
+        if self._representations is None:
+            with self._lock:
+                if self._representations is None:
+                    self._representations = self._load()
+        return self._representations[format, encoding]
+
+    def clear(self) -> None:
+        self._representations = None
+
+
+prebuilt_schema = PrebuiltSchema()
@@ -3,6 +3,8 @@ from drf_spectacular.extensions import OpenApiAuthenticationExtension
 
 class JWTSchema(OpenApiAuthenticationExtension):
     target_class = "dj_rest_auth.jwt_auth.JWTCookieAuthentication"
+    # Also covers project.accounts.authentication.CachedJWTCookieAuthentication.
+    match_subclasses = True
     name = "jwtAuth"
 
     def get_security_definition(self, auto_schema):
@@ -1,10 +1,19 @@
 """Tests for documentation views and API schema."""
 
+import gzip
+import json
+from unittest.mock import patch
+
+import brotli
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
 from rest_framework.test import APIClient
 
 from project.accounts.models import User
+from project.core.docs.prebuilt import prebuilt_schema
+from project.core.docs.views import preferred_encoding
 
 
 @pytest.mark.django_db
@@ -169,3 +178,82 @@ def test_docs_work_with_session_auth(client, site):
     assert schema_response.status_code == 200
     content_type = schema_response.get("Content-Type", "")
     assert any(ct in content_type.lower() for ct in ["json", "yaml", "openapi"])
+
+
+@pytest.mark.django_db
+class TestPrebuiltSchema:
+    @pytest.fixture
+    def schema_dir(self, tmp_path, settings):
+        settings.OPENAPI_SCHEMA_DIR = tmp_path
+        call_command("build_schema")
+        prebuilt_schema.clear()
+        yield tmp_path
+        prebuilt_schema.clear()
+
+    @pytest.fixture
+    def admin_client(self, api_client: APIClient, site) -> APIClient:
+        api_client.force_authenticate(
+            User.objects.create_user(
+                email="admin@example.com", site=site, is_staff=True
+            )
+        )
+        return api_client
+
+    def test_compressed_variants(self, admin_client, schema_dir):
+        response = admin_client.get(
+            reverse("schema"), HTTP_ACCEPT_ENCODING="gzip, deflate, br"
+        )
+        assert response.status_code == 200
+        assert response["Content-Encoding"] == "br"
+        assert "Accept-Encoding" in response["Vary"]
+        assert brotli.decompress(response.content) == (
+            (schema_dir / "openapi.yaml").read_bytes()
+        )
+
+        response = admin_client.get(
+            reverse("schema"), {"format": "json"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        assert response["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.content))["openapi"]
+
+    def test_etag(self, admin_client, schema_dir):
+        response = admin_client.get(reverse("schema"))
+        assert "Content-Encoding" not in response
+        etag = response["ETag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+
+        response = admin_client.get(reverse("schema"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        response = admin_client.get(
+            reverse("schema"), HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING="br"
+        )
+        assert response.status_code == 200
+
+    def test_served_from_memory(self, admin_client, schema_dir):
+        admin_client.get(reverse("schema"))
+        with patch.object(SchemaGenerator, "get_schema") as get_schema:
+            assert admin_client.get(reverse("schema")).status_code == 200
+        get_schema.assert_not_called()
+
+    def test_live_in_debug(self, admin_client, schema_dir, settings):
+        settings.DEBUG = True
+        response = admin_client.get(reverse("schema"))
+        assert response.status_code == 200
+        assert "ETag" not in response
+
+    def test_missing_build_is_generated_once(self, admin_client, tmp_path, settings):
+        settings.OPENAPI_SCHEMA_DIR = tmp_path / "missing"
+        prebuilt_schema.clear()
+        try:
+            assert admin_client.get(reverse("schema")).status_code == 200
+        finally:
+            prebuilt_schema.clear()
+
+
+def test_preferred_encoding():
+    assert preferred_encoding("gzip, deflate, br") == "br"
+    assert preferred_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert preferred_encoding("identity") is None
+    assert preferred_encoding("") is None
@@ -1,15 +1,17 @@
 from django.conf import settings
 
+from project.core.tenant import get_current_site
+
 
 def get_docs_title() -> str:
+    """
+    Title for the API docs, including the name of the current tenant.
+
+    Doesn't query the database: the tenant comes from the request (see
+    SiteMiddleware), and outside of a request the plain title is used.
+    """
     docs_title = settings.SPECTACULAR_SETTINGS["TITLE"]
-    try:
-        # We try to get the site name from the database, but this won't work
-        # on a fresh project that hasn't done any migrations yet.
-        from django.contrib.sites.models import Site
-
-        site_name = Site.objects.get_current().name
-        docs_title += f" | {site_name} admin"
-    except Exception:  # pragma: no cover
-        pass
+    site = get_current_site()
+    if site is not None:
+        docs_title += f" | {site.name} admin"
     return docs_title
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView
+from rest_framework.authentication import SessionAuthentication
+
+from project.accounts.authentication import CachedJWTCookieAuthentication
+from project.core.docs.prebuilt import ENCODINGS, prebuilt_schema
+from project.core.docs.utils import get_docs_title
+from project.core.permissions import IsAdminUser
+
+
+class TenantSpectacularRedocView(SpectacularRedocView):
+    """Redoc view titled after the tenant of the request."""
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        self.title = get_docs_title()
+        return super().get(request, *args, **kwargs)
+
+
+class AdminOnlySpectacularRedocView(TenantSpectacularRedocView):
+    """
+    Redoc view that requires admin permissions.
+    """
+
+    permission_classes = [IsAdminUser]
+    authentication_classes = [CachedJWTCookieAuthentication, SessionAuthentication]
+
+
+def preferred_encoding(accept_encoding: str) -> str | None:
+    """The preferred content encoding we have a variant for, if any."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return next((encoding for encoding in ENCODINGS if encoding in accepted), None)
+
+
+class AdminOnlySpectacularAPIView(SpectacularAPIView):
+    """
+    Schema API view that requires admin permissions.
+
+    Serves the prebuilt schema (see project.core.docs.prebuilt), and only
+    generates it live with DEBUG on.
+    """
+
+    permission_classes = [IsAdminUser]
+    authentication_classes = [CachedJWTCookieAuthentication, SessionAuthentication]
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            return super().get(request, *args, **kwargs)
+
+        encoding = preferred_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        representation = prebuilt_schema.get(request.accepted_renderer.format, encoding)
+        if representation.etag in parse_etags(
+            request.META.get("HTTP_IF_NONE_MATCH", "")
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                representation.body, content_type=request.accepted_media_type
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["ETag"] = representation.etag
+        # Admins only, but clients can revalidate with the ETag.
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
@@ -0,0 +1,195 @@
+"""
+Request handlers that run a different middleware pipeline per route prefix.
+
+settings.MIDDLEWARE lists the full stack, which the admin and other HTML routes
+need. Much of it only matters to browsers: JSON API routes authenticate with JWT
+cookies and never render HTML, so they have no use for CSP headers, sessions or
+flash messages. MIDDLEWARE_PIPELINES maps route prefixes to the middleware that is
+skipped for them. The longest matching prefix wins, and routes that don't match
+any prefix run the full stack.
+
+The full list stays in settings.MIDDLEWARE because apps like allauth and the debug
+toolbar check that their middleware is installed.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+
+class MiddlewareTimer:
+    """
+    Accumulates the time spent in each middleware of a pipeline.
+
+    Every middleware is timed including the middleware and view it calls, so the
+    time spent in a middleware itself is its total minus that of the next one.
+    """
+
+    def __init__(self):
+        self.totals: dict[str, float] = defaultdict(float)
+
+    def wrap(self, name: str, handler):
+        def timed(request):
+            start = time.perf_counter()
+            try:
+                return handler(request)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+
+        return timed
+
+    def report(self, middleware: list[str]) -> dict[str, float]:
+        """Time spent in each middleware itself, and in the view, in seconds."""
+        names = list(middleware) + ["view"]
+        inner = [self.totals[name] for name in names[1:]] + [0.0]
+        return {
+            name: self.totals[name] - inner_total
+            for name, inner_total in zip(names, inner)
+        }
+
+
+class MiddlewarePipeline(BaseHandler):
+    """A middleware chain built from an explicit list instead of settings.MIDDLEWARE."""
+
+    def __init__(self, middleware: list[str], timer: MiddlewareTimer | None = None):
+        self.middleware = list(middleware)
+        self.timer = timer
+
+    def load_middleware(self, is_async=False):
+        """Like BaseHandler.load_middleware, but with self.middleware."""
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        if self.timer is not None:
+            handler = self.timer.wrap("view", handler)
+        handler_is_async = is_async
+        for middleware_path in reversed(self.middleware):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, "sync_capable", True)
+            middleware_can_async = getattr(middleware, "async_capable", False)
+            if not middleware_can_sync and not middleware_can_async:
+                raise RuntimeError(
+                    "Middleware %s must have at least one of "
+                    "sync_capable/async_capable set to True." % middleware_path
+                )
+            elif not handler_is_async and middleware_can_sync:
+                middleware_is_async = False
+            else:
+                middleware_is_async = middleware_can_async
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async,
+                    handler,
+                    handler_is_async,
+                    debug=settings.DEBUG,
+                    name="middleware %s" % middleware_path,
+                )
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+            else:
+                handler = adapted_handler
+
+            if mw_instance is None:
+                raise ImproperlyConfigured(
+                    "Middleware factory %s returned None." % middleware_path
+                )
+
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(
+                    0, self.adapt_method_mode(is_async, mw_instance.process_view)
+                )
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(
+                        is_async, mw_instance.process_template_response
+                    )
+                )
+            if hasattr(mw_instance, "process_exception"):
+                self._exception_middleware.append(
+                    self.adapt_method_mode(False, mw_instance.process_exception)
+                )
+
+            handler = convert_exception_to_response(mw_instance)
+            if self.timer is not None and not middleware_is_async:
+                handler = self.timer.wrap(middleware_path, handler)
+            handler_is_async = middleware_is_async
+
+        handler = self.adapt_method_mode(is_async, handler, handler_is_async)
+        self._middleware_chain = handler
+
+
+class PipelineRouter:
+    """Picks the middleware pipeline for a request path."""
+
+    def __init__(self, is_async: bool = False):
+        pipelines: dict[tuple[str, ...], MiddlewarePipeline] = {}
+
+        def build(skip: list[str]) -> MiddlewarePipeline:
+            unknown = set(skip) - set(settings.MIDDLEWARE)
+            if unknown:
+                raise ImproperlyConfigured(
+                    "MIDDLEWARE_PIPELINES skips middleware that isn't in MIDDLEWARE: "
+                    + ", ".join(sorted(unknown))
+                )
+            middleware = tuple(path for path in settings.MIDDLEWARE if path not in skip)
+            if middleware not in pipelines:
+                pipelines[middleware] = MiddlewarePipeline(list(middleware))
+                pipelines[middleware].load_middleware(is_async)
+            return pipelines[middleware]
+
+        self.default = build([])
+        self.routes = [
+            (prefix, build(skip))
+            for prefix, skip in sorted(
+                settings.MIDDLEWARE_PIPELINES.items(), key=lambda item: -len(item[0])
+            )
+        ]
+
+    def pipeline_for(self, path: str) -> MiddlewarePipeline:
+        for prefix, pipeline in self.routes:
+            if path.startswith(prefix):
+                return pipeline
+        return self.default
+
+
+class PipelineWSGIHandler(WSGIHandler):
+    def load_middleware(self, is_async=False):
+        self.router = PipelineRouter(is_async=False)
+
+    def get_response(self, request):
+        return self.router.pipeline_for(request.path_info).get_response(request)
+
+
+class PipelineASGIHandler(ASGIHandler):
+    def load_middleware(self, is_async=False):
+        self.router = PipelineRouter(is_async=True)
+
+    async def get_response_async(self, request):
+        pipeline = self.router.pipeline_for(request.path_info)
+        return await pipeline.get_response_async(request)
+
+
+def get_wsgi_application() -> PipelineWSGIHandler:
+    """Like django.core.wsgi.get_wsgi_application, with per-route middleware."""
+    django.setup(set_prefix=False)
+    return PipelineWSGIHandler()
+
+
+def get_asgi_application() -> PipelineASGIHandler:
+    """Like django.core.asgi.get_asgi_application, with per-route middleware."""
+    django.setup(set_prefix=False)
+    return PipelineASGIHandler()
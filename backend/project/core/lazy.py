@@ -0,0 +1,82 @@
+"""
+Lazily imported heavy dependencies.
+
+Libraries like numpy, langchain, dspy, opencv and weasyprint take from tens of
+milliseconds to seconds to import. Every web worker, Celery worker and manage.py
+command would pay for them at boot if they were imported at the top of a module
+that Django loads, even when no code path uses them. Import them from here
+instead:
+
+    from project.core.lazy import numpy as np
+
+    def aggregate(values):
+        return np.asarray(values).sum()  # numpy is imported here, on first use.
+
+`manage.py profile_startup` fails when any module in HEAVY_MODULES is imported
+while Django boots.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from types import ModuleType
+
+# Top-level packages that must not be imported while Django boots.
+HEAVY_MODULES = (
+    "cv2",
+    "dspy",
+    "groq",
+    "interpreter",
+    "langchain",
+    "langchain_openai",
+    "numpy",
+    "rapidfuzz",
+    "sentry_sdk",
+    "weasyprint",
+)
+
+_lock = threading.Lock()
+
+
+class LazyModule(ModuleType):
+    """A module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+_registry: dict[str, LazyModule] = {}
+
+
+def lazy_import(name: str) -> LazyModule:
+    """The lazy module for an import path, shared by all callers."""
+    with _lock:
+        if name not in _registry:
+            _registry[name] = LazyModule(name)
+        return _registry[name]
+
+
+numpy = lazy_import("numpy")
+rapidfuzz = lazy_import("rapidfuzz")
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from textwrap import dedent
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+# Environment for each connection mode, see the database settings.
+MODES = {
+    "close": {"DATABASE_POOL": "0", "DATABASE_CONN_MAX_AGE": "0"},
+    "persistent": {"DATABASE_POOL": "0", "DATABASE_CONN_MAX_AGE": "60"},
+    "pooled": {"DATABASE_POOL": "1"},
+}
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Benchmarks requests per second with a new database connection per request,
+        with persistent connections, and with pooled connections (see
+        project.core.postgres). Every request runs one query between the
+        request_started and request_finished signals, so the numbers are the cost
+        of connection handling and nothing else. Each mode runs in a fresh process.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument("--mode", choices=MODES, help="Run only this mode.")
+
+    def run_requests(self, count: int, backend_pids: set[int]) -> None:
+        for _ in range(count):
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_backend_pid()")
+                backend_pids.add(cursor.fetchone()[0])
+            request_finished.send(sender=self.__class__)
+
+    def run_mode(self, requests: int, threads: int) -> None:
+        backend_pids: set[int] = set()
+        self.run_requests(10, set())  # Warm up.
+        workers = [
+            threading.Thread(
+                target=self.run_requests, args=(requests // threads, backend_pids)
+            )
+            for _ in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        result = {
+            "requests": requests // threads * threads,
+            "seconds": elapsed,
+            "connections": len(backend_pids),
+        }
+        self.stdout.write(json.dumps(result))
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        requests: int = options["requests"]
+        threads: int = options["threads"]
+        if options["mode"]:
+            self.run_mode(requests, threads)
+            return
+
+        self.stdout.write(f"{requests:,} requests on {threads} thread(s)")
+        self.stdout.write(
+            f"{'mode':<12} {'requests/s':>12} {'µs/request':>12} connections"
+        )
+        for mode, environ in MODES.items():
+            process = subprocess.run(
+                [
+                    sys.executable,
+                    "manage.py",
+                    "benchmark_db_connections",
+                    f"--mode={mode}",
+                    f"--requests={requests}",
+                    f"--threads={threads}",
+                ],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, **environ},
+                capture_output=True,
+                text=True,
+            )
+            if process.returncode:
+                raise CommandError(process.stderr)
+            result = json.loads(process.stdout.splitlines()[-1])
+            rate = result["requests"] / result["seconds"]
+            self.stdout.write(
+                f"{mode:<12} {rate:>12,.0f} {1e6 / rate:>12.0f} "
+                f"{result['connections']:>11,}"
+            )
@@ -0,0 +1,64 @@
+import time
+from textwrap import dedent
+from typing import Any
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import RequestFactory
+
+from project.core.handlers import MiddlewarePipeline, MiddlewareTimer, PipelineRouter
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Reports the time spent in each middleware for a route, with the full
+        middleware stack and with the route's pipeline (see project.core.handlers).
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--path", default="/api/healthcheck/")
+        parser.add_argument("--host", help="Defaults to the domain of the first site.")
+        parser.add_argument("--requests", type=int, default=1000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path: str = options["path"]
+        host = options["host"] or Site.objects.order_by("pk").first().domain
+        count: int = options["requests"]
+        factory = RequestFactory()
+
+        pipelined = PipelineRouter().pipeline_for(path).middleware
+        results = {}
+        for label, middleware in (
+            ("full", settings.MIDDLEWARE),
+            ("pipeline", pipelined),
+        ):
+            timer = MiddlewareTimer()
+            pipeline = MiddlewarePipeline(middleware, timer=timer)
+            pipeline.load_middleware()
+            # Warm up caches and lazy imports before measuring.
+            pipeline.get_response(factory.get(path, HTTP_HOST=host))
+            timer.totals.clear()
+
+            start = time.perf_counter()
+            for _ in range(count):
+                pipeline.get_response(factory.get(path, HTTP_HOST=host))
+            results[label] = (time.perf_counter() - start, timer.report(middleware))
+
+        full_time, full_report = results["full"]
+        pipeline_time, pipeline_report = results["pipeline"]
+        width = max(len(name) for name in full_report)
+        self.stdout.write(f"{path} on {host}, {count:,} requests, µs per request\n")
+        self.stdout.write(f"{'':<{width}}  {'full':>8}  {'pipeline':>8}")
+        for name, seconds in full_report.items():
+            after = pipeline_report.get(name)
+            column = "skipped" if after is None else f"{after / count * 1e6:.1f}"
+            self.stdout.write(
+                f"{name:<{width}}  {seconds / count * 1e6:>8.1f}  {column:>8}"
+            )
+        self.stdout.write(
+            f"{'total':<{width}}  {full_time / count * 1e6:>8.1f}  "
+            f"{pipeline_time / count * 1e6:>8.1f}"
+        )
@@ -0,0 +1,68 @@
+import random
+import time
+from textwrap import dedent
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from project.core.routing import HostRoutingTable
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Benchmarks the tenant routing table (project.core.routing) on synthetic data.
+        Doesn't touch the database.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--tenants", type=int, default=10_000)
+        parser.add_argument("--hosts", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rng = random.Random(options["seed"])
+        tenants: int = options["tenants"]
+
+        # A mix of exact domains and wildcard subdomain tenants.
+        routes = []
+        for site_id in range(1, tenants + 1):
+            if site_id % 4 == 0:
+                routes.append((f"*.league-{site_id}.example.com", site_id))
+            else:
+                routes.append((f"league-{site_id}.example.com", site_id))
+
+        # Exact hits, hits with a port, wildcard hits and unknown hosts.
+        hosts = []
+        for _ in range(options["hosts"]):
+            site_id = rng.randint(1, tenants)
+            kind = rng.random()
+            if site_id % 4 == 0:
+                hosts.append(f"team-{rng.randint(1, 99)}.league-{site_id}.example.com")
+            elif kind < 0.6:
+                hosts.append(f"league-{site_id}.example.com")
+            elif kind < 0.9:
+                hosts.append(f"league-{site_id}.example.com:8000")
+            else:
+                hosts.append(f"unknown-{site_id}.example.org")
+
+        start = time.perf_counter()
+        table = HostRoutingTable.build(routes)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resolved = sum(1 for host in hosts if table.resolve(host) is not None)
+        resolve_time = time.perf_counter() - start
+
+        self.stdout.write(
+            dedent(
+                f"""
+                Tenants:  {tenants:,} ({len(table.wildcards):,} wildcard)
+                Hosts:    {len(hosts):,} ({resolved:,} resolved)
+                Build:    {build_time * 1000:.1f} ms
+                Resolve:  {resolve_time * 1000:.1f} ms total, {resolve_time / len(hosts) * 1e9:.0f} ns per host
+                          {len(hosts) / resolve_time:,.0f} hosts/s, 0 queries
+                """
+            ).strip()
+        )
@@ -0,0 +1,44 @@
+import time
+from pathlib import Path
+from textwrap import dedent
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from drf_spectacular.validation import validate_schema
+
+from project.core.docs.prebuilt import generate_schema, render_schema, write_schema
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Builds the OpenAPI schema served by the docs (see project.core.docs.prebuilt)
+        as YAML and JSON, with gzip and brotli variants. Run at deploy time; doesn't
+        need the database.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=None,
+            help="Defaults to OPENAPI_SCHEMA_DIR.",
+        )
+        parser.add_argument("--validate", action="store_true")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        directory: Path = options["output_dir"] or Path(settings.OPENAPI_SCHEMA_DIR)
+        start = time.perf_counter()
+        schema = generate_schema()
+        if options["validate"]:
+            validate_schema(schema)
+        paths = write_schema(directory, render_schema(schema))
+        for path in paths:
+            self.stdout.write(f"{path} ({path.stat().st_size:,} bytes)")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built the OpenAPI schema in {time.perf_counter() - start:.1f}s"
+            )
+        )
@@ -0,0 +1,132 @@
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from textwrap import dedent
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from project.core.lazy import HEAVY_MODULES
+
+# What a web worker imports before serving its first request.
+BOOT = dedent(
+    """
+    import django
+    django.setup()
+    import project.urls
+    """
+)
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".")[0]
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """The timings in `python -X importtime` output, in import order."""
+    result = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():  # The header line.
+            continue
+        result.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return result
+
+
+def profile_boot(importtime: bool = False) -> tuple[float, str]:
+    """Boots Django in a fresh interpreter, returning the wall time and stderr."""
+    command = [
+        sys.executable,
+        *(["-X", "importtime"] if importtime else []),
+        "-c",
+        BOOT,
+    ]
+    env = {
+        "DJANGO_SETTINGS_MODULE": "project.settings",
+        **os.environ,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    start = time.perf_counter()
+    process = subprocess.run(
+        command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if process.returncode:
+        raise CommandError(f"Booting Django failed:\n{process.stderr}")
+    return elapsed, process.stderr
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Profiles how long a web worker takes to boot: the wall time of django.setup()
+        plus loading the URLconf in a fresh interpreter, and the import time of the
+        slowest modules and packages. Fails if the best boot is over the budget, or
+        if a module from project.core.lazy.HEAVY_MODULES is imported while booting.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--budget",
+            type=float,
+            default=None,
+            help="In seconds. Defaults to STARTUP_TIME_BUDGET.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        budget: float = options["budget"] or settings.STARTUP_TIME_BUDGET
+        top: int = options["top"]
+
+        # The first run warms the OS file cache, so every run after it is comparable.
+        profile_boot()
+        best = min(profile_boot()[0] for _ in range(options["runs"]))
+        timings = parse_importtime(profile_boot(importtime=True)[1])
+
+        slowest = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)
+        self.stdout.write("Slowest modules (cumulative ms, self ms):")
+        for timing in slowest[:top]:
+            self.stdout.write(
+                f"  {timing.cumulative_us / 1000:8.1f} {timing.self_us / 1000:8.1f}"
+                f"  {timing.module}"
+            )
+
+        packages: dict[str, int] = {}
+        for timing in timings:
+            packages[timing.package] = packages.get(timing.package, 0) + timing.self_us
+        self.stdout.write("Slowest packages (ms):")
+        for package, self_us in sorted(
+            packages.items(), key=lambda item: item[1], reverse=True
+        )[:top]:
+            self.stdout.write(f"  {self_us / 1000:8.1f}  {package}")
+
+        self.stdout.write(
+            f"Boot time: {best * 1000:.0f}ms (budget {budget * 1000:.0f}ms)"
+        )
+
+        heavy = sorted(set(HEAVY_MODULES) & packages.keys())
+        if heavy:
+            raise CommandError(
+                f"Imported at boot: {', '.join(heavy)}. Import them lazily, "
+                "see project.core.lazy."
+            )
+        if best > budget:
+            raise CommandError(
+                f"Booting took {best * 1000:.0f}ms, over the budget of "
+                f"{budget * 1000:.0f}ms."
+            )
+        self.stdout.write(self.style.SUCCESS("Boot time is within the budget"))
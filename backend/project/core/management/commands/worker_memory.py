@@ -0,0 +1,44 @@
+from pathlib import Path
+from textwrap import dedent
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from project.core.prefork import MB, children, memory
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Reports the memory use of a running gunicorn master and each of its workers.
+        A worker's private memory is what it costs on top of the master's shared
+        pages, use its peak for GUNICORN_WORKER_MEMORY_MB (see project.core.prefork).
+        Linux only.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--pid", type=int, help="The pid of the gunicorn master.")
+        parser.add_argument("--pidfile", type=Path)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        pid: int | None = options["pid"]
+        if pid is None and options["pidfile"]:
+            pid = int(options["pidfile"].read_text())
+        if pid is None:
+            raise CommandError("Pass the master's --pid or --pidfile.")
+        master = memory(pid)
+        if master is None:
+            raise CommandError(f"Can't read the memory use of process {pid}.")
+
+        self.stdout.write(f"Master {master}")
+        workers = [usage for worker in children(pid) if (usage := memory(worker))]
+        for usage in workers:
+            self.stdout.write(f"Worker {usage}")
+        if workers:
+            private = max(usage.private for usage in workers)
+            total = master.pss + sum(usage.pss for usage in workers)
+            self.stdout.write(
+                f"{len(workers)} workers, {total / MB:.1f}MB in total, "
+                f"at most {private / MB:.1f}MB private per worker"
+            )
@@ -0,0 +1,203 @@
+"""
+Per-request performance instrumentation.
+
+project.core.middleware.RequestMetricsMiddleware measures every request: wall time, database queries and
+their duration, and cache lookups. With SERVER_TIMING on (the default in DEBUG),
+each response gets a Server-Timing header. The numbers are aggregated into
+histograms per URL name which the admin-only Metrics view exposes in the
+Prometheus text format.
+
+Metrics are kept in memory per worker process, so every scrape reports the worker
+that happened to serve it (identified by the "pid" label).
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def record_cache_lookup(hit: bool) -> None:
+    """Count a cache lookup towards the current request, if it's being measured."""
+    metrics = request_metrics.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper that times queries of the current request.
+
+    Installed on every connection when it's created (see CoreConfig.ready), rather
+    than per request, so that queries run from sync_to_async threads under ASGI are
+    measured too: the context variable follows the request into those threads.
+    """
+    metrics = request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    """Signal receiver for connection_created."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf.
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.db_duration = Histogram(DURATION_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class MetricsRegistry:
+    """Thread-safe aggregation of request metrics per URL name."""
+
+    def __init__(self):
+        self._views: dict[str, ViewMetrics] = {}
+        self._collectors: list[Callable[[], list[str]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, collector: Callable[[], list[str]]) -> None:
+        """Add a callable that returns extra lines in the Prometheus format."""
+        self._collectors.append(collector)
+
+    def observe(self, view: str, duration: float, metrics: RequestMetrics) -> None:
+        with self._lock:
+            view_metrics = self._views.get(view)
+            if view_metrics is None:
+                view_metrics = self._views[view] = ViewMetrics()
+            view_metrics.duration.observe(duration)
+            view_metrics.db_duration.observe(metrics.db_time)
+            view_metrics.db_queries.observe(metrics.queries)
+            view_metrics.cache_hits += metrics.cache_hits
+            view_metrics.cache_misses += metrics.cache_misses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        from project.core.sites import site_cache
+
+        pid = os.getpid()
+        histograms = {
+            "http_request_duration_seconds": (
+                "Wall time of requests per URL name.",
+                lambda m: m.duration,
+            ),
+            "http_request_db_duration_seconds": (
+                "Time spent in database queries per request.",
+                lambda m: m.db_duration,
+            ),
+            "http_request_db_queries": (
+                "Number of database queries per request.",
+                lambda m: m.db_queries,
+            ),
+        }
+        counters = {
+            "http_request_cache_hits_total": (
+                "Cache hits during requests.",
+                lambda m: m.cache_hits,
+            ),
+            "http_request_cache_misses_total": (
+                "Cache misses during requests.",
+                lambda m: m.cache_misses,
+            ),
+        }
+
+        lines = []
+        with self._lock:
+            views = sorted(self._views.items())
+            for name, (description, get) in histograms.items():
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+                for view, view_metrics in views:
+                    lines += get(view_metrics).render(
+                        name, f'pid="{pid}",view="{_escape(view)}"'
+                    )
+            for name, (description, get) in counters.items():
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+                for view, view_metrics in views:
+                    lines.append(
+                        f'{name}{{pid="{pid}",view="{_escape(view)}"}} {get(view_metrics)}'
+                    )
+
+        site_stats = site_cache.stats()
+        for key, kind in (
+            ("hits", "counter"),
+            ("misses", "counter"),
+            ("size", "gauge"),
+        ):
+            name = f"site_cache_{key}" + ("_total" if kind == "counter" else "")
+            lines += [
+                f"# HELP {name} Tenant routing table {key}.",
+                f"# TYPE {name} {kind}",
+                f'{name}{{pid="{pid}"}} {site_stats[key]}',
+            ]
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
@@ -1,14 +1,55 @@
 """
-Multi-tenancy middleware using Django Sites framework.
+Multi-tenancy middleware using Django Sites framework, and request instrumentation.
 """
 
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.http import Http404
-from django.utils.deprecation import MiddlewareMixin
+from django.http import Http404, HttpResponse
+
+from project.core.metrics import RequestMetrics, registry, request_metrics
+from project.core.sites import (
+    get_or_create_site_by_domain,
+    get_site_by_domain,
+    site_cache,
+)
+from project.core.tenant import set_current_site
+
+
+class AsyncCapableMiddleware:
+    """
+    Base class for middleware that runs natively under both WSGI and ASGI.
+
+    Django's MiddlewareMixin runs process_request/process_response through
+    sync_to_async when serving ASGI, which costs a thread hop on every request.
+    Subclasses implement sync_call and async_call instead, and Django picks the
+    variant that matches the rest of the middleware chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.async_call(request)
+        return self.sync_call(request)
+
+    def sync_call(self, request):  # pragma: no cover
+        raise NotImplementedError
+
+    async def async_call(self, request):  # pragma: no cover
+        raise NotImplementedError
 
 
-class SiteMiddleware(MiddlewareMixin):
+class SiteMiddleware(AsyncCapableMiddleware):
     """
     Middleware to identify and attach site context.
 
@@ -25,24 +66,115 @@ class SiteMiddleware(MiddlewareMixin):
     For production:
     - Each tenant has its own domain
     - Site is determined by the actual domain
+
+    Hosts are resolved through the in-process routing table (see
+    project.core.sites and project.core.routing), which knows exact domains,
+    domains without port and wildcard subdomains ("*.example.com"). Only hosts
+    the table can't route fall back to the database, and the outcome of that
+    fallback is added to the table, so a host costs queries at most once.
+    Hosts that don't resolve at all are remembered for a short while and
+    rejected without queries; clients sending many of them can be throttled.
+    Unknown X-Tenant-Domain headers are remembered the same way, and requests
+    carrying one are routed by their Host alone.
+
+    The resolved site is made available as request.site and as the current
+    tenant (see project.core.tenant) for the duration of the request.
+
+    Under ASGI, sites found in the cache are attached without leaving the event
+    loop; only cache misses run the (database-backed) process_request in a thread.
     """
 
+    def sync_call(self, request):
+        response = self.process_request(request)
+        if response is not None:
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            # Don't leak the tenant into whatever this thread handles next.
+            set_current_site(None)
+
+    async def async_call(self, request):
+        site = self.get_cached_site(request)
+        if site is not None:
+            self.attach_site(request, site)
+        else:
+            response = await sync_to_async(self.process_request)(request)
+            if response is not None:
+                return response
+        try:
+            return await self.get_response(request)
+        finally:
+            set_current_site(None)
+
+    def get_cached_site(self, request):
+        """The site from the routing table, if it has been built and knows the host."""
+        domain = request.headers.get("x-tenant-domain") or request.get_host()
+        return site_cache.resolve(domain, build=False)
+
+    def attach_site(self, request, site):
+        # Attach site to request
+        request.site = site
+
+        # Set the request-scoped tenant, used by Site.objects.get_current()
+        set_current_site(site)
+
     def process_request(self, request):
         """Extract site from domain/headers and attach to request."""
-        site = None
-
         # First, check for X-Tenant-Domain header (useful for development)
         tenant_domain = request.headers.get("x-tenant-domain")
 
+        host = request.get_host()
+
+        site = site_cache.resolve(tenant_domain or host)
+        unknown_hosts = site_cache.unknown_hosts
+        if site is None and tenant_domain and (tenant_domain, None) in unknown_hosts:
+            # The header is known not to match any site: route by the Host alone.
+            tenant_domain = None
+            site = site_cache.resolve(host)
+        if site is None:
+            # Reject known-unknown hosts and noisy clients without queries.
+            client = request.META.get("REMOTE_ADDR")
+            if unknown_hosts.is_throttled(client):
+                return HttpResponse("Too many unknown hosts.", status=429)
+            if (tenant_domain, host) in unknown_hosts:
+                unknown_hosts.reject()
+                unknown_hosts.record_miss(client)
+                raise Http404(f"No site configured for domain: {host}")
+
+            try:
+                site = self.get_site_from_database(request, tenant_domain)
+            except Http404:
+                if tenant_domain and (tenant_domain, None) in unknown_hosts:
+                    # The header was just found unknown, so the next request is
+                    # routed by the Host alone: remember the miss under that key.
+                    tenant_domain = None
+                unknown_hosts.add((tenant_domain, host))
+                unknown_hosts.record_miss(client)
+                raise
+
+        self.attach_site(request, site)
+
+        # Continue processing
+        return None
+
+    def get_site_from_database(self, request, tenant_domain):
+        """Resolve hosts the routing table doesn't know (yet)."""
+        generation = site_cache.generation
+        site = None
+
         if tenant_domain:
             try:
-                site = Site.objects.get(domain=tenant_domain)
+                site = get_site_by_domain(tenant_domain)
             except Site.DoesNotExist:
                 if settings.DEBUG:
                     # Auto-create site in development
                     site = Site.objects.create(
                         domain=tenant_domain, name=f"{tenant_domain} (Auto-created)"
                     )
+                else:
+                    # Don't look the header up again on every request.
+                    site_cache.unknown_hosts.add((tenant_domain, None))
 
         # If no site from header, use host-based detection
         if not site:
@@ -57,11 +189,11 @@ class SiteMiddleware(MiddlewareMixin):
             try:
                 # Try to get site by exact domain match first
                 try:
-                    site = Site.objects.get(domain=host)
+                    site = get_site_by_domain(host)
                 except Site.DoesNotExist:
                     try:
                         # Try without port for development
-                        site = Site.objects.get(domain=host_without_port)
+                        site = get_site_by_domain(host_without_port)
                     except Site.DoesNotExist:
                         # Check if this is a development environment
                         if settings.DEBUG:
@@ -71,23 +203,21 @@ class SiteMiddleware(MiddlewareMixin):
                                 if len(parts) >= 2:  # e.g., "demo.localhost"
                                     subdomain = parts[0]
                                     # Create development site if it doesn't exist
-                                    site, created = Site.objects.get_or_create(
-                                        domain=f"{subdomain}.localhost",
-                                        defaults={"name": f"{subdomain.title()} (Dev)"},
+                                    site = get_or_create_site_by_domain(
+                                        f"{subdomain}.localhost",
+                                        name=f"{subdomain.title()} (Dev)",
                                     )
                                 else:
                                     # Default localhost without subdomain
                                     # For development, default to demo.localhost
-                                    site = Site.objects.get_or_create(
-                                        domain="demo.localhost",
-                                        defaults={"name": "Demo Site (Development)"},
-                                    )[0]
+                                    site = get_or_create_site_by_domain(
+                                        "demo.localhost", name="Demo Site (Development)"
+                                    )
                             else:
                                 # Non-localhost development access
-                                site = Site.objects.get_or_create(
-                                    domain="demo.localhost",
-                                    defaults={"name": "Demo Site (Development)"},
-                                )[0]
+                                site = get_or_create_site_by_domain(
+                                    "demo.localhost", name="Demo Site (Development)"
+                                )
                         else:
                             # Production: strict domain matching
                             raise Http404(f"No site configured for domain: {host}")
@@ -96,19 +226,59 @@ class SiteMiddleware(MiddlewareMixin):
                 # In case of any database errors
                 if settings.DEBUG:
                     # Use demo site as fallback in development
-                    site = Site.objects.get_or_create(
-                        domain="demo.localhost",
-                        defaults={"name": "Demo Site (Development)"},
-                    )[0]
+                    site = get_or_create_site_by_domain(
+                        "demo.localhost", name="Demo Site (Development)"
+                    )
                 else:
                     # In production, re-raise the exception
                     raise e
 
-        # Attach site to request
-        request.site = site
+            # Route this host straight to its site from now on.
+            site_cache.add(site, host, generation=generation)
 
-        # Set current site for Django (for compatibility)
-        settings.SITE_ID = site.pk
+        return site
 
-        # Always return None to continue processing
-        return None
+
+class RequestMetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Measures requests and adds a Server-Timing header to the response.
+
+    Should be the first middleware, so the wall time includes all other middleware.
+    The header is only added with the SERVER_TIMING setting, which defaults to
+    DEBUG.
+    """
+
+    def sync_call(self, request):
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def async_call(self, request):
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def finish(self, request, response, metrics: RequestMetrics, duration: float):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match._func_path) if match else "<unresolved>"
+        registry.observe(view, duration, metrics)
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"total;dur={duration * 1000:.1f}",
+                    f'db;desc="{metrics.queries} queries";dur={metrics.db_time * 1000:.1f}',
+                    f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+                ]
+            )
+        return response
@@ -0,0 +1,48 @@
+"""
+Paginators for large tables.
+
+Django's Paginator runs an exact COUNT(*), which reads the whole table (or every
+matching row) on every changelist page. EstimatedCountPaginator asks the query
+planner for its row estimate first, and only counts exactly when the estimate is
+small enough for that to be cheap. Above the threshold the page count is
+approximate, which is fine for browsing.
+
+Settings:
+- ESTIMATED_COUNT_THRESHOLD: estimates below this many rows are counted exactly.
+"""
+
+from __future__ import annotations
+
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """The planner's row estimate for a queryset, or None if it can't tell."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the count of large querysets instead of counting."""
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list.order_by())
+            if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
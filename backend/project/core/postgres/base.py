@@ -0,0 +1,73 @@
+"""
+The PostgreSQL backend, with connections checked out from a per-process pool.
+
+Django opens a connection when a request (or Celery task) first queries and
+closes it when the request finishes, unless CONN_MAX_AGE keeps it around for the
+thread. With this backend, closing returns the connection to a pool (see
+project.core.postgres.pool) that every thread of the process shares. It suits ASGI
+and threaded workers, where threads come and go and a connection per thread is
+either wasted or never reused. CONN_MAX_AGE must be 0.
+
+Configured with OPTIONS["pool"], like the pool of Django's psycopg 3 backend:
+
+    "ENGINE": "project.core.postgres",
+    "OPTIONS": {"pool": {"max_size": 4, "timeout": 10, "check_after": 30}},
+"""
+
+from __future__ import annotations
+
+import psycopg2.extras
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from project.core.postgres.pool import ConnectionPool, get_pool
+
+
+def connect(conn_params: dict):
+    connection = base.Database.connect(**conn_params)
+    # Like the parent class, skip decoding jsonb so that JSONField can decode it.
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool: ConnectionPool | None = None
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        # The pool's options aren't connection parameters.
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        if self.settings_dict["CONN_MAX_AGE"]:
+            raise ImproperlyConfigured(
+                "Pooled connections require CONN_MAX_AGE to be 0."
+            )
+        key = repr(sorted(conn_params.items()))
+        self.pool = get_pool(
+            key,
+            lambda: ConnectionPool(
+                lambda: connect(conn_params),
+                **self.settings_dict["OPTIONS"].get("pool", {}),
+            ),
+        )
+        connection = self.pool.get()
+        # Set up as the parent class does.
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        self.isolation_level = (
+            IsolationLevel.READ_COMMITTED
+            if isolation_level is None
+            else IsolationLevel(isolation_level)
+        )
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.put(self.connection)
@@ -0,0 +1,191 @@
+"""
+A thread-safe pool of psycopg2 connections.
+
+Connections are handed out last in, first out, so that the ones used most often
+stay warm and the rest can time out on the server side if it wants them closed.
+
+- Checking out a connection that sat idle for longer than `check_after` seconds
+  runs `SELECT 1` on it first. Connections that are closed or fail the check are
+  discarded and replaced.
+- Returning a connection rolls back whatever transaction it was left in, then
+  runs DISCARD ALL, which resets session settings (SET, set_config()), drops
+  temporary tables and releases advisory locks, so that nothing one request left
+  behind leaks into the next. A connection whose state can't be restored is
+  closed instead of being reused.
+- A process forked from the one that created the pool (a gunicorn or Celery
+  worker) gets a pool of its own. The parent's connections are never used or
+  closed by the child: closing them would also end them for the parent.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became available in time."""
+
+
+@dataclass
+class PoolStats:
+    size: int = 0
+    idle: int = 0
+    connects: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    discarded: int = 0
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[], psycopg2.extensions.connection],
+        max_size: int = 4,
+        timeout: float = 10.0,
+        check_after: float = 30.0,
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.pid = os.getpid()
+        self._idle: list[tuple[psycopg2.extensions.connection, float]] = []
+        self._size = 0
+        self._condition = threading.Condition()
+        self._stats = PoolStats()
+
+    def get(self) -> psycopg2.extensions.connection:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    self._stats.waits += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        self._stats.timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout}s "
+                            f"({self.max_size} in use)."
+                        )
+                self._stats.checkouts += 1
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                else:
+                    connection, returned_at = None, 0.0
+                    self._size += 1
+                    self._stats.connects += 1
+
+            if connection is None:
+                try:
+                    return self.connect()
+                except BaseException:
+                    self._release_slot()
+                    raise
+            if self._is_healthy(connection, returned_at):
+                return connection
+            self._discard(connection)
+
+    def put(self, connection: psycopg2.extensions.connection) -> None:
+        if self.pid != os.getpid():
+            # Checked out before this process was forked, it belongs to the parent.
+            _inherited.append(connection)
+            return
+        if not self._reset(connection):
+            self._discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Close the idle connections. Checked out ones close when returned."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return PoolStats(
+                **{**vars(self._stats), "size": self._size, "idle": len(self._idle)}
+            )
+
+    def _is_healthy(self, connection, returned_at: float) -> bool:
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _reset(self, connection) -> bool:
+        """Restore a returned connection to a clean state, if possible."""
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            if status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            # DISCARD ALL can't run inside a transaction block.
+            autocommit = connection.autocommit
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute("DISCARD ALL")
+            connection.autocommit = autocommit
+        except psycopg2.Error:
+            return False
+        return connection.info.transaction_status == TRANSACTION_STATUS_IDLE
+
+    def _discard(self, connection) -> None:
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        self._release_slot(discarded=True)
+
+    def _release_slot(self, discarded: bool = False) -> None:
+        with self._condition:
+            self._size -= 1
+            self._stats.discarded += discarded
+            self._condition.notify()
+
+
+_pools: dict[str, ConnectionPool] = {}
+# Pools and connections inherited from a parent process. They're kept referenced
+# so that their connections are never garbage collected (and so closed) here.
+_inherited: list = []
+_lock = threading.Lock()
+
+
+def get_pool(key: str, factory: Callable[[], ConnectionPool]) -> ConnectionPool:
+    pool = _pools.get(key)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            if pool is not None:
+                _inherited.append(pool)
+            pool = _pools[key] = factory()
+        return pool
+
+
+def close_pools() -> None:
+    """Close the idle connections of every pool this process created."""
+    for pool in list(_pools.values()):
+        if pool.pid == os.getpid():
+            pool.close()
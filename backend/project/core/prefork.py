@@ -0,0 +1,163 @@
+"""
+Helpers for gunicorn's preforking master (see gunicorn.conf.py).
+
+With preload on, the master imports the application and warms per-process caches
+once, then forks the workers. Workers share the master's pages copy-on-write, so
+each one only pays for the memory it writes to afterwards. CPython writes to an
+object whenever its reference count changes or the garbage collector visits it,
+so the heap is frozen right before forking: gc.freeze() moves every object to a
+permanent generation that collections skip.
+
+The number of workers follows from a memory budget rather than the CPU count:
+what a worker costs is its private memory, which `manage.py worker_memory` shows
+for every worker.
+
+This module is imported by the gunicorn configuration before Django is set up, so
+it only imports Django inside functions.
+"""
+
+from __future__ import annotations
+
+import gc
+import multiprocessing
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+MB = 1024 * 1024
+
+
+def warm_caches() -> None:
+    """
+    Fill the per-process caches that would otherwise fill in every worker.
+
+    Only data: see start_listeners() for the threads that go with it.
+    """
+    from django.apps import apps
+    from django.conf import settings
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from project.core.docs.prebuilt import RENDERERS, prebuilt_schema
+    from project.core.postgres.pool import close_pools
+    from project.core.sites import site_cache
+
+    # Model metadata (fields, relations) is computed lazily on first use.
+    for model in apps.get_models():
+        model._meta.get_fields()
+    get_resolver().url_patterns
+    site_cache.warm()
+    if not settings.DEBUG:
+        for format in RENDERERS:
+            prebuilt_schema.get(format, None)
+    # Connections must never be shared with the forked workers.
+    connections.close_all()
+    close_pools()
+
+
+def start_listeners() -> None:
+    """
+    Start the background threads that warm_caches() leaves out, in a worker.
+
+    Threads started in the master don't survive the fork, and a lock one of them
+    holds at that moment stays locked in the worker.
+    """
+    from project.core.sites import site_cache
+
+    site_cache.start_listener()
+
+
+def freeze_heap() -> None:
+    """Keep the garbage collector off the pages shared with the workers."""
+    gc.collect()
+    gc.freeze()
+
+
+def memory_budget() -> int | None:
+    """The memory available to the workers, in bytes."""
+    if budget := os.environ.get("GUNICORN_MEMORY_BUDGET_MB"):
+        return int(budget) * MB
+    # The container's limit under cgroup v2, if it has one.
+    try:
+        limit = Path("/sys/fs/cgroup/memory.max").read_text().strip()
+    except OSError:
+        return None
+    return int(limit) if limit.isdigit() else None
+
+
+def worker_count(budget: int | None = None) -> int:
+    """
+    How many workers fit in the memory budget.
+
+    Settings (environment):
+    - GUNICORN_WORKERS: a fixed number of workers, overriding the rest.
+    - GUNICORN_MEMORY_BUDGET_MB: memory for the whole server. Defaults to the
+      container's memory limit; without either, workers follow the CPU count.
+    - GUNICORN_MASTER_MEMORY_MB: memory of the preloaded master, which the workers
+      share.
+    - GUNICORN_WORKER_MEMORY_MB: private memory of a worker at its peak.
+    - GUNICORN_MAX_WORKERS: an upper bound.
+    """
+    if workers := os.environ.get("GUNICORN_WORKERS"):
+        return int(workers)
+    cpu_bound = multiprocessing.cpu_count() * 2 + 1
+    if budget is None:
+        budget = memory_budget()
+    if budget is None:
+        return cpu_bound
+    master = int(os.environ.get("GUNICORN_MASTER_MEMORY_MB", 100)) * MB
+    worker = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", 40)) * MB
+    maximum = int(os.environ.get("GUNICORN_MAX_WORKERS", cpu_bound * 2))
+    return max(1, min(maximum, (budget - master) // worker))
+
+
+@dataclass(frozen=True)
+class Memory:
+    """
+    Memory use of a process, in bytes.
+
+    rss counts pages shared with the master in full, pss divides them between the
+    processes sharing them, and private is what the process alone uses.
+    """
+
+    pid: int
+    rss: int
+    pss: int
+    private: int
+
+    def __str__(self) -> str:
+        return (
+            f"pid {self.pid}: rss {self.rss / MB:.1f}MB, pss {self.pss / MB:.1f}MB, "
+            f"private {self.private / MB:.1f}MB"
+        )
+
+
+def memory(pid: int) -> Memory | None:
+    """A process's memory use from /proc, or None where that isn't available."""
+    try:
+        rollup = Path(f"/proc/{pid}/smaps_rollup").read_text()
+    except OSError:
+        return None
+    values = {}
+    for line in rollup.splitlines()[1:]:
+        key, _, value = line.partition(":")
+        values[key] = int(value.split()[0]) * 1024
+    return Memory(
+        pid,
+        rss=values.get("Rss", 0),
+        pss=values.get("Pss", 0),
+        private=values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    )
+
+
+def children(pid: int) -> list[int]:
+    """The child processes of a process, e.g. the workers of a gunicorn master."""
+    result = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            result.extend(
+                int(child) for child in (task / "children").read_text().split()
+            )
+        except OSError:
+            continue
+    return sorted(result)
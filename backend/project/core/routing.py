@@ -0,0 +1,77 @@
+"""
+Host -> tenant routing table.
+
+The table is compiled from all Site domains and resolves a Host header to a site
+id with a handful of dictionary lookups, without touching the database.
+
+Site domains can be:
+- exact domains, optionally with a port: "example.com", "localhost:8000"
+- wildcard subdomain patterns: "*.example.com" matches "a.example.com" and
+  "a.b.example.com", but not "example.com" itself.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+
+def split_port(host: str) -> str:
+    """Strip the port from a host, leaving IPv6 literals like "[::1]" intact."""
+    if host.endswith("]"):
+        return host
+    return host.rsplit(":", 1)[0] if ":" in host else host
+
+
+def normalize_host(host: str) -> str:
+    return host.strip().lower().rstrip(".")
+
+
+class HostRoutingTable:
+    def __init__(self):
+        self.exact: dict[str, int] = {}
+        self.wildcards: dict[str, int] = {}
+
+    @classmethod
+    def build(cls, routes: Iterable[tuple[str, int]]) -> HostRoutingTable:
+        """Compile a table from (domain, site_id) pairs."""
+        table = cls()
+        for domain, site_id in routes:
+            table.add(domain, site_id)
+        return table
+
+    def add(self, domain: str, site_id: int) -> None:
+        domain = normalize_host(domain)
+        if domain.startswith("*."):
+            self.wildcards[domain[2:]] = site_id
+        else:
+            self.exact[domain] = site_id
+
+    def resolve(self, host: str) -> int | None:
+        """
+        Return the site id for a host, or None if no route matches.
+
+        Order: exact host, host without port, then the most specific wildcard.
+        """
+        host = host.lower().rstrip(".")
+        site_id = self.exact.get(host)
+        if site_id is not None:
+            return site_id
+
+        hostname = split_port(host)
+        if hostname != host:
+            site_id = self.exact.get(hostname)
+            if site_id is not None:
+                return site_id
+
+        if self.wildcards:
+            # "a.b.example.com" -> "b.example.com" -> "example.com" -> "com"
+            dot = hostname.find(".")
+            while dot != -1:
+                site_id = self.wildcards.get(hostname[dot + 1 :])
+                if site_id is not None:
+                    return site_id
+                dot = hostname.find(".", dot + 1)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.wildcards)
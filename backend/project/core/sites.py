@@ -0,0 +1,392 @@
+"""
+In-process tenant (Site) resolution cache.
+
+Every request resolves its tenant from a domain before any view code runs. The
+mapping changes very rarely, so each worker compiles all Site domains into a
+routing table (see project.core.routing) and keeps it in memory for a limited
+time. Changes to ``Site`` rows clear the local copy through Django signals and are
+broadcast over Redis pub/sub so that every other worker clears its copy too.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+import redis
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.db import DatabaseError, connection, transaction
+
+from project.core.metrics import record_cache_lookup
+from project.core.routing import HostRoutingTable, normalize_host
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownHosts:
+    """
+    Short-lived memory of hosts that didn't resolve to any site.
+
+    Scanners and misconfigured clients send garbage Host headers. Remembering the
+    misses for a short while rejects repeats without database queries, and counting
+    misses per client allows throttling clients that cycle through random hosts.
+
+    Settings:
+    - SITE_NEGATIVE_CACHE_TTL: seconds a miss is remembered (0 disables it).
+    - SITE_NEGATIVE_CACHE_MAX_SIZE: maximum number of remembered misses and clients.
+    - SITE_MISS_RATE_LIMIT: misses allowed per client per window (0 disables it).
+    - SITE_MISS_RATE_LIMIT_WINDOW: length of the rate limit window in seconds.
+    """
+
+    def __init__(self):
+        self._hosts: OrderedDict[Hashable, float] = OrderedDict()
+        self._clients: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.throttled = 0
+
+    def _bound(self, entries: OrderedDict) -> None:
+        while len(entries) > settings.SITE_NEGATIVE_CACHE_MAX_SIZE:
+            entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expires_at = self._hosts.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._hosts[key]
+                return False
+            return True
+
+    def reject(self) -> None:
+        """Count a request rejected because its host is known to be unknown."""
+        with self._lock:
+            self.rejected += 1
+
+    def add(self, key: Hashable) -> None:
+        ttl = settings.SITE_NEGATIVE_CACHE_TTL
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._hosts[key] = time.monotonic() + ttl
+            self._hosts.move_to_end(key)
+            self._bound(self._hosts)
+
+    def is_throttled(self, client: str | None) -> bool:
+        """Whether the client used up its misses for the current window."""
+        limit = settings.SITE_MISS_RATE_LIMIT
+        if limit <= 0 or not client:
+            return False
+        with self._lock:
+            window_start, count = self._clients.get(client, (0.0, 0))
+            window = settings.SITE_MISS_RATE_LIMIT_WINDOW
+            if count < limit or window_start + window <= time.monotonic():
+                return False
+            self.throttled += 1
+            return True
+
+    def record_miss(self, client: str | None) -> None:
+        if settings.SITE_MISS_RATE_LIMIT <= 0 or not client:
+            return
+        now = time.monotonic()
+        with self._lock:
+            window_start, count = self._clients.get(client, (now, 0))
+            if window_start + settings.SITE_MISS_RATE_LIMIT_WINDOW <= now:
+                window_start, count = now, 0
+            self._clients[client] = (window_start, count + 1)
+            self._clients.move_to_end(client)
+            self._bound(self._clients)
+
+    def clear(self, clients: bool = False) -> None:
+        """Forget misses, e.g. because a site was added, and optionally client counters."""
+        with self._lock:
+            self._hosts.clear()
+            if clients:
+                self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+@dataclass(frozen=True)
+class RoutingSnapshot:
+    """A routing table and the sites it routes to, replaced as a whole."""
+
+    table: HostRoutingTable
+    sites: dict[int, Site]
+    expires_at: float
+    generation: int
+
+
+class SiteCache:
+    """
+    A thread-safe, per-worker routing table of every Site.
+
+    The table and its sites are one snapshot that is swapped atomically, so a
+    lookup never sees a table without its sites. Every clear() bumps a generation
+    counter, and tables or routes read from the database before a clear are
+    discarded instead of installed.
+
+    Settings:
+    - SITE_CACHE_TTL: seconds before the table is rebuilt even without a change
+      (0 disables the cache).
+    - SITE_CACHE_MAX_SIZE: maximum number of hosts routed outside of the table.
+    - SITE_CACHE_BROADCAST: whether to use Redis pub/sub for cross-worker invalidation.
+    - SITE_CACHE_CHANNEL: the Redis pub/sub channel used for invalidation messages.
+    """
+
+    def __init__(self):
+        self._snapshot: RoutingSnapshot | None = None
+        self._generation = 0
+        # Hosts routed outside of the table, least recently used first, see add().
+        self._routes: OrderedDict[str, Site] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.unknown_hosts = UnknownHosts()
+        self._listener: threading.Thread | None = None
+        self._listener_pid: int | None = None
+        self._listener_retry_at = 0.0
+
+    @property
+    def generation(self) -> int:
+        """Pass to add() to drop routes read before a concurrent clear()."""
+        return self._generation
+
+    def _current_snapshot(self, build: bool) -> RoutingSnapshot | None:
+        """Return the routing snapshot, (re)building it if allowed and needed."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.expires_at > time.monotonic():
+            return snapshot
+        if not build or settings.SITE_CACHE_TTL <= 0:
+            return None
+        generation = self._generation
+        sites = {site.pk: site for site in Site.objects.all()}
+        snapshot = RoutingSnapshot(
+            table=HostRoutingTable.build(
+                (site.domain, site_id) for site_id, site in sites.items()
+            ),
+            sites=sites,
+            expires_at=time.monotonic() + settings.SITE_CACHE_TTL,
+            generation=generation,
+        )
+        with self._lock:
+            if self._generation != generation:
+                # Sites changed while they were read, so this table may be stale.
+                return None
+            self._snapshot = snapshot
+            self._routes = OrderedDict()
+        return snapshot
+
+    def resolve(self, host: str, build: bool = True) -> Site | None:
+        """
+        Return the Site routed to by a Host header, or None on a miss.
+
+        Pass build=False where database queries aren't allowed (e.g. on the event
+        loop); this also returns None while the table hasn't been built yet.
+        Callers fall back to the database on None.
+        """
+        self._ensure_listener()
+        snapshot = self._current_snapshot(build)
+        if snapshot is None:
+            return None
+        site_id = snapshot.table.resolve(host)
+        site = snapshot.sites.get(site_id) if site_id is not None else None
+        with self._lock:
+            if site is None and snapshot.generation == self._generation:
+                host = normalize_host(host)
+                site = self._routes.get(host)
+                if site is not None:
+                    self._routes.move_to_end(host)
+            if site is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        record_cache_lookup(site is not None)
+        return site
+
+    def add(self, site: Site, domain: str | None = None, generation=None) -> None:
+        """
+        Route a domain (by default the site's own) to a site until the next rebuild.
+
+        Used for sites and fallback routes found outside of the table. Hosts come
+        from requests, so at most SITE_CACHE_MAX_SIZE of them are kept, least
+        recently used first out. Pass the generation from before the site was
+        read, so that a route read before a concurrent clear() is dropped.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if self._snapshot is not None:
+                host = normalize_host(domain or site.domain)
+                self._routes[host] = site
+                self._routes.move_to_end(host)
+                while len(self._routes) > settings.SITE_CACHE_MAX_SIZE:
+                    self._routes.popitem(last=False)
+
+    def warm(self) -> None:
+        """
+        Build the routing table ahead of the first request.
+
+        Called when the application is loaded, which can be in the gunicorn master
+        (see project.core.prefork). It starts no threads, since they don't survive
+        a fork, and a lock held by one at fork time would stay locked in the
+        workers; the invalidation listener starts on first use, or explicitly with
+        start_listener(). The connection is closed afterwards so that it can't be
+        shared with worker processes forked from this one.
+        """
+        try:
+            self._current_snapshot(build=True)
+        except DatabaseError:
+            logger.warning("Could not warm the site cache", exc_info=True)
+        finally:
+            if not connection.in_atomic_block:
+                connection.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._routes = OrderedDict()
+            self._generation += 1
+            self.invalidations += 1
+        self.unknown_hosts.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+            self.unknown_hosts.rejected = 0
+            self.unknown_hosts.throttled = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pid": os.getpid(),
+                "size": len(self),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "unknown_hosts": len(self.unknown_hosts),
+                "unknown_hosts_rejected": self.unknown_hosts.rejected,
+                "unknown_hosts_throttled": self.unknown_hosts.throttled,
+            }
+
+    def __len__(self) -> int:
+        snapshot = self._snapshot
+        return len(snapshot.table) + len(self._routes) if snapshot is not None else 0
+
+    # Cross-worker invalidation.
+
+    def publish_invalidation(self) -> None:
+        """Tell every other worker to drop its cached sites."""
+        if not settings.SITE_CACHE_BROADCAST:
+            return
+        try:
+            client = redis.Redis.from_url(settings.REDIS_URL)
+            client.publish(settings.SITE_CACHE_CHANNEL, str(os.getpid()))
+        except redis.RedisError:
+            logger.warning("Could not broadcast site cache invalidation", exc_info=True)
+
+    def _handle_message(self, message: dict) -> None:
+        sender = message.get("data", b"")
+        if isinstance(sender, bytes):
+            sender = sender.decode()
+        # The sending worker already cleared its own cache.
+        if sender != str(os.getpid()):
+            self.clear()
+
+    def _handle_listener_error(self, exc, pubsub, thread) -> None:
+        logger.warning("Site cache invalidation listener stopped: %s", exc)
+        thread.stop()
+        pubsub.close()
+        self._listener = None
+        # Entries may have gone stale while we weren't listening.
+        self.clear()
+
+    def start_listener(self) -> None:
+        """Subscribe to invalidations from other workers, in a background thread."""
+        self._ensure_listener()
+
+    def _ensure_listener(self) -> None:
+        """
+        Start the pub/sub listener thread for this process.
+
+        Gunicorn forks workers after the master may have used the cache, so the
+        listener is (re)started lazily whenever the process id changes.
+        """
+        if not settings.SITE_CACHE_BROADCAST:
+            return
+        pid = os.getpid()
+        if self._listener is not None and self._listener_pid == pid:
+            return
+        if time.monotonic() < self._listener_retry_at:
+            return
+        with self._lock:
+            if self._listener is not None and self._listener_pid == pid:
+                return
+            try:
+                client = redis.Redis.from_url(settings.REDIS_URL)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{settings.SITE_CACHE_CHANNEL: self._handle_message})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1,
+                    daemon=True,
+                    exception_handler=self._handle_listener_error,
+                )
+                self._listener_pid = pid
+            except redis.RedisError:
+                logger.warning(
+                    "Could not subscribe to site cache invalidations", exc_info=True
+                )
+                self._listener_retry_at = time.monotonic() + 30
+                # Without invalidations, only the TTL bounds staleness.
+                self._snapshot = None
+                self._generation += 1
+
+
+site_cache = SiteCache()
+
+
+def get_site_by_domain(domain: str) -> Site:
+    """
+    Return the Site for a domain, using the in-process routing table.
+
+    Falls back to the database when the table doesn't know the domain, in case the
+    site was created after the table was built.
+
+    Raises Site.DoesNotExist when no site is configured for the domain.
+    """
+    site = site_cache.resolve(domain)
+    if site is None or site.domain != domain:
+        generation = site_cache.generation
+        site = Site.objects.get(domain=domain)
+        site_cache.add(site, generation=generation)
+    return site
+
+
+def get_or_create_site_by_domain(domain: str, name: str) -> Site:
+    """Like get_site_by_domain, but creates the Site if it doesn't exist yet."""
+    site = site_cache.resolve(domain)
+    if site is None or site.domain != domain:
+        generation = site_cache.generation
+        site = Site.objects.get_or_create(domain=domain, defaults={"name": name})[0]
+        site_cache.add(site, generation=generation)
+    return site
+
+
+def invalidate_site_cache(**kwargs) -> None:
+    """Signal receiver for changes to Site rows."""
+    site_cache.clear()
+    # Broadcast after commit, otherwise other workers could re-cache the old row.
+    transaction.on_commit(site_cache.publish_invalidation)
@@ -0,0 +1,72 @@
+"""
+Request-scoped tenant context.
+
+The current tenant (a Django Site) is stored in a ContextVar instead of being
+written to settings.SITE_ID. Context variables are isolated per thread and per
+asyncio task, so concurrent requests in one process never see each other's tenant
+under both WSGI (threaded workers) and ASGI.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+from django.contrib.sites.models import Site, SiteManager
+
+_current_site: ContextVar[Site | None] = ContextVar("current_site", default=None)
+
+
+def get_current_site() -> Site | None:
+    """Return the tenant of the current request, or None outside of a request."""
+    return _current_site.get()
+
+
+def set_current_site(site: Site | None) -> Token:
+    """Set the tenant for the current context. Returns a token for reset_current_site."""
+    return _current_site.set(site)
+
+
+def reset_current_site(token: Token) -> None:
+    _current_site.reset(token)
+
+
+@contextmanager
+def tenant_context(site: Site | None) -> Iterator[Site | None]:
+    """
+    Run a block of code on behalf of a tenant.
+
+    Useful outside of the request cycle, e.g. in Celery tasks and management commands:
+
+        with tenant_context(site):
+            send_mail(...)
+    """
+    token = set_current_site(site)
+    try:
+        yield site
+    finally:
+        reset_current_site(token)
+
+
+def patch_site_manager() -> None:
+    """
+    Make Site.objects.get_current() return the tenant of the current context.
+
+    Third-party code (allauth, dj-rest-auth, the admin) calls get_current() or
+    django.contrib.sites.shortcuts.get_current_site(), which would otherwise use the
+    static settings.SITE_ID. Outside of a tenant context the original behaviour
+    is kept.
+    """
+    original_get_current = SiteManager.get_current
+    if getattr(original_get_current, "tenant_aware", False):
+        return
+
+    def get_current(self, request=None):
+        site = get_current_site()
+        if site is not None:
+            return site
+        return original_get_current(self, request)
+
+    get_current.tenant_aware = True  # type: ignore[attr-defined]
+    SiteManager.get_current = get_current  # type: ignore[method-assign]
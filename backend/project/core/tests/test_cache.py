@@ -0,0 +1,302 @@
+import json
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+import redis
+from django.core.cache import caches
+from django.test import override_settings
+
+from project.core import cache as tiered
+from project.core.cache import CompressedSerializer, LocalCache, TieredCache
+from project.core.metrics import RequestMetrics, request_metrics
+
+
+class FakeRedis:
+    """The subset of redis.Redis that Django's RedisCacheClient uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.timeouts = {}
+        self.reads = 0
+        self.published = []
+
+    def get(self, key):
+        self.reads += 1
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.reads += 1
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.timeouts[key] = ex
+        return True
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def expire(self, key, timeout):
+        self.timeouts[key] = timeout
+        return key in self.data
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def exists(self, key):
+        return key in self.data
+
+    def incr(self, key, delta):
+        self.data[key] = str(int(self.data[key]) + delta).encode()
+        return int(self.data[key])
+
+    def pipeline(self):
+        pipeline = Mock()
+        pipeline.mset.side_effect = self.mset
+        pipeline.expire.side_effect = self.expire
+        return pipeline
+
+    def flushdb(self):
+        self.data.clear()
+        return True
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+@pytest.fixture(autouse=True)
+def local_tiers(monkeypatch):
+    monkeypatch.setattr(tiered, "_tiers", {})
+
+
+@pytest.fixture
+def server():
+    return FakeRedis()
+
+
+def tiered_cache(server: FakeRedis, **options) -> TieredCache:
+    cache = TieredCache(
+        "redis://localhost:6379",
+        {
+            "OPTIONS": {
+                "NAMESPACES": {"fighters": 3600, "scoring": 30},
+                "LOCAL_TIMEOUT": 60,
+                "COMPRESS_MIN_LENGTH": 100,
+                **options,
+            }
+        },
+    )
+    cache._cache.get_client = lambda *args, **kwargs: server
+    # Pretend to be subscribed to invalidations.
+    cache._ensure_listener = Mock()
+    cache.tier.listener = Mock()
+    return cache
+
+
+@pytest.fixture
+def cache(server):
+    return tiered_cache(server)
+
+
+class TestTieredCache:
+    def test_reads_are_served_locally(self, cache, server):
+        cache.set("fighters:1", {"name": "Fighter"})
+        assert cache.get("fighters:1") == {"name": "Fighter"}
+        assert cache.get("fighters:1") == {"name": "Fighter"}
+        assert server.reads == 1
+        assert cache.stats()["local_hits"] == 1
+        assert cache.stats()["remote_hits"] == 1
+
+    def test_local_values_are_copies(self, cache):
+        cache.set("fighters:1", {"name": "Fighter"})
+        cache.get("fighters:1")["name"] = "Changed"
+        assert cache.get("fighters:1") == {"name": "Fighter"}
+
+    def test_misses(self, cache, server):
+        assert cache.get("fighters:missing", "default") == "default"
+        assert cache.get("fighters:missing") is None
+        assert server.reads == 2
+        assert cache.stats()["misses"] == 2
+
+    def test_lookups_are_recorded(self, cache):
+        cache.set("fighters:1", 1)
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        try:
+            cache.get("fighters:1")
+            cache.get("fighters:1")
+            cache.get("fighters:2")
+        finally:
+            request_metrics.reset(token)
+        assert (metrics.cache_hits, metrics.cache_misses) == (2, 1)
+
+    def test_get_many(self, cache, server):
+        cache.set_many({"fighters:1": 1, "scoring:1": 2})
+        cache.get("fighters:1")
+        assert cache.get_many(["fighters:1", "scoring:1", "other"]) == {
+            "fighters:1": 1,
+            "scoring:1": 2,
+        }
+        assert server.reads == 2
+        assert cache.get_many(["fighters:1", "scoring:1"]) == {
+            "fighters:1": 1,
+            "scoring:1": 2,
+        }
+        assert server.reads == 2
+
+    def test_writes_invalidate_everywhere(self, cache, server):
+        cache.set("fighters:1", 1)
+        cache.get("fighters:1")
+        cache.incr("fighters:1")
+        assert cache.get("fighters:1") == 2
+        cache.delete("fighters:1")
+        assert cache.get("fighters:1") is None
+
+        key = cache.make_key("fighters:1")
+        assert (
+            server.published
+            == [
+                (
+                    "project:cache:invalidate",
+                    {"sender": cache.tier.sender, "keys": [key]},
+                )
+            ]
+            * 3
+        )
+
+    def test_invalidations_from_other_workers(self, cache, server):
+        cache.set("fighters:1", 1)
+        cache.get("fighters:1")
+        server.data[cache.make_key("fighters:1")] = b"2"
+
+        cache.tier.handle_message({"data": json.dumps({"sender": cache.tier.sender})})
+        assert cache.get("fighters:1") == 1
+
+        message = {"sender": "other", "keys": [cache.make_key("fighters:1")]}
+        cache.tier.handle_message({"data": json.dumps(message)})
+        assert cache.get("fighters:1") == 2
+
+        cache.tier.handle_message(
+            {"data": json.dumps({"sender": "other", "keys": None})}
+        )
+        assert len(cache.local) == 0
+        assert cache.stats()["invalidations"] == 2
+
+    def test_values_read_during_an_invalidation_are_not_kept(self, cache, server):
+        cache.set("fighters:1", 1)
+        get = server.get
+
+        def invalidated_while_reading(key):
+            cache.tier.handle_message(
+                {"data": json.dumps({"sender": "other", "keys": [key]})}
+            )
+            return get(key)
+
+        with patch.object(server, "get", invalidated_while_reading):
+            cache.get("fighters:1")
+        assert len(cache.local) == 0
+
+    def test_local_tier_is_skipped_until_subscribed(self, cache, server):
+        cache.tier.listener = None
+        cache.set("fighters:1", 1)
+        cache.get("fighters:1")
+        cache.get("fighters:1")
+        assert server.reads == 2
+
+    def test_namespace_timeouts(self, cache, server):
+        cache.set("fighters:1", 1)
+        cache.set("scoring:1", 1)
+        cache.set("scoring:2", 1, timeout=5)
+        cache.set("other", 1)
+        cache.set_many({"fighters:2": 1, "scoring:3": 1})
+        timeouts = {
+            key.split(":", 2)[-1]: timeout for key, timeout in server.timeouts.items()
+        }
+        assert timeouts == {
+            "fighters:1": 3600,
+            "scoring:1": 30,
+            "scoring:2": 5,
+            "other": 300,
+            "fighters:2": 3600,
+            "scoring:3": 30,
+        }
+        assert cache._local_timeout("fighters:1") == 60
+        assert cache._local_timeout("scoring:1") == 30
+
+    def test_large_values_are_compressed(self, cache, server):
+        cache.set("fighters:1", "x" * 1000)
+        stored = server.data[cache.make_key("fighters:1")]
+        assert stored.startswith(b"z") and len(stored) < 100
+        assert cache.get("fighters:1") == "x" * 1000
+
+    def test_clear(self, cache, server):
+        cache.set("fighters:1", 1)
+        cache.get("fighters:1")
+        cache.clear()
+        assert len(cache.local) == 0
+        assert server.published[-1][1]["keys"] is None
+
+    def test_without_broadcast(self, server):
+        cache = tiered_cache(server, BROADCAST=False)
+        cache.tier.listener = None
+        cache.set("fighters:1", 1)
+        cache.get("fighters:1")
+        cache.get("fighters:1")
+        assert server.reads == 1
+        assert server.published == []
+
+
+def test_threads_share_the_local_tier():
+    cache_settings = {
+        "BACKEND": "project.core.cache.TieredCache",
+        "LOCATION": "redis://localhost:6379",
+    }
+    backends = []
+
+    def get_backend():
+        backend = caches["tiered"]
+        backend._ensure_listener()
+        backends.append(backend)
+
+    pubsub = Mock()
+    with override_settings(CACHES={"tiered": cache_settings}), patch.object(
+        redis.Redis, "pubsub", return_value=pubsub
+    ) as create_pubsub:
+        threads = [threading.Thread(target=get_backend) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    first, second = backends
+    assert first is not second
+    assert first.local is second.local
+    assert first.tier.listener is pubsub.run_in_thread.return_value
+    create_pubsub.assert_called_once()
+    pubsub.run_in_thread.assert_called_once()
+
+
+def test_compressed_serializer():
+    serializer = CompressedSerializer(min_length=10)
+    for value in (1, -5, "short", "long" * 100, {"a": [1, 2]}, True):
+        assert serializer.loads(serializer.dumps(value)) == value
+    assert serializer.dumps(1) == 1
+
+
+def test_local_cache_is_bounded():
+    local = LocalCache(max_entries=2)
+    for key in "abc":
+        local.set(key, b"value", 60, local.generation)
+    assert local.get("a") is None
+    assert local.get("c") == b"value"
+
+
+def test_forked_workers_get_a_tier_of_their_own():
+    tier = tiered.get_local_tier("redis://localhost:6379", "channel", 10)
+    assert tiered.get_local_tier("redis://localhost:6379", "channel", 10) is tier
+    tier.pid = -1
+    assert tiered.get_local_tier("redis://localhost:6379", "channel", 10) is not tier
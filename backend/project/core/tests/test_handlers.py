@@ -0,0 +1,78 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.urls import reverse
+
+from project.accounts.models import User
+from project.core.handlers import PipelineRouter, PipelineWSGIHandler
+
+SESSIONS = "django.contrib.sessions.middleware.SessionMiddleware"
+
+
+class TestPipelineRouter:
+    def test_api_routes_skip_browser_middleware(self):
+        middleware = PipelineRouter().pipeline_for("/api/healthcheck/").middleware
+        assert SESSIONS not in middleware
+        assert "csp.middleware.CSPMiddleware" not in middleware
+        assert "project.core.middleware.SiteMiddleware" in middleware
+
+    def test_longest_prefix_wins(self, settings):
+        router = PipelineRouter()
+        assert (
+            router.pipeline_for("/api/admin/login/").middleware == settings.MIDDLEWARE
+        )
+        assert SESSIONS in router.pipeline_for("/api/accounts/login/").middleware
+
+    def test_unmatched_routes_run_everything(self, settings):
+        assert PipelineRouter().pipeline_for("/").middleware == settings.MIDDLEWARE
+
+    def test_pipelines_are_shared(self):
+        router = PipelineRouter()
+        assert router.pipeline_for("/api/admin/") is router.pipeline_for("/api/docs/")
+
+    def test_unknown_middleware_is_rejected(self, settings):
+        settings.MIDDLEWARE_PIPELINES = {"/api/": ["missing.Middleware"]}
+        with pytest.raises(ImproperlyConfigured):
+            PipelineRouter()
+
+
+@pytest.mark.django_db
+class TestPipelineWSGIHandler:
+    @pytest.fixture
+    def handler(self):
+        return PipelineWSGIHandler()
+
+    def test_api_request_skips_sessions(self, handler, site, settings):
+        settings.SERVER_TIMING = True
+        request = RequestFactory().get(reverse("healthcheck"), HTTP_HOST=site.domain)
+        response = handler.get_response(request)
+        assert response.status_code == 204
+        assert not hasattr(request, "session")
+        assert "Server-Timing" in response
+
+    def test_admin_keeps_full_stack(self, handler, site):
+        request = RequestFactory().get("/api/admin/login/", HTTP_HOST=site.domain)
+        response = handler.get_response(request)
+        assert response.status_code == 200
+        assert hasattr(request, "session")
+
+    def test_login(self, handler, site):
+        User.objects.create_user(email="user@example.com", site=site, password="pw")
+        request = RequestFactory().post(
+            reverse("rest_login"),
+            {"email": "user@example.com", "password": "pw"},
+            content_type="application/json",
+            HTTP_HOST=site.domain,
+        )
+        response = handler.get_response(request)
+        assert response.status_code == 200, response.content
+        assert "refresh-token" in response.cookies
+
+
+@pytest.mark.django_db
+def test_benchmark_middleware(site, capsys):
+    call_command("benchmark_middleware", "--requests", "2", "--host", site.domain)
+    output = capsys.readouterr().out
+    assert "skipped" in output
+    assert "total" in output
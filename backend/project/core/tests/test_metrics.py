@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.sites.models import Site
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project.accounts.models import User
+from project.core.metrics import Histogram, RequestMetrics, registry
+from project.core.sites import site_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 5))
+    for value in (0, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.render("queries", 'view="x"') == [
+        'queries_bucket{view="x",le="1.0"} 2',
+        'queries_bucket{view="x",le="5.0"} 3',
+        'queries_bucket{view="x",le="+Inf"} 4',
+        'queries_sum{view="x"} 14.0',
+        'queries_count{view="x"} 4',
+    ]
+
+
+def test_registry_renders_per_view():
+    registry.observe("healthcheck", 0.02, RequestMetrics(queries=3, cache_hits=1))
+    output = registry.render()
+    assert "# TYPE http_request_duration_seconds histogram" in output
+    assert 'view="healthcheck",le="0.025"} 1' in output
+    assert "http_request_cache_hits_total{pid=" in output
+    assert "site_cache_size" in output
+
+
+@pytest.mark.django_db
+class TestRequestMetricsMiddleware:
+    @pytest.fixture(autouse=True)
+    def server_timing(self, settings):
+        settings.SERVER_TIMING = True
+
+    def test_server_timing_header(self, client, site):
+        site_cache.warm()
+        response = client.get(reverse("healthcheck"), HTTP_HOST=site.domain)
+        timing = response["Server-Timing"]
+        assert timing.startswith("total;dur=")
+        assert 'cache;desc="1 hits, 0 misses"' in timing
+
+    def test_counts_queries(self, client, site):
+        response = client.get(reverse("healthcheck"), HTTP_HOST=site.domain)
+        # The routing table is built on the first request.
+        assert 'db;desc="1 queries"' in response["Server-Timing"]
+
+    def test_queries_outside_requests_are_not_counted(self, client, site):
+        Site.objects.count()
+        client.get(reverse("healthcheck"), HTTP_HOST=site.domain)
+        assert registry._views["healthcheck"].db_queries.sum == 1
+
+    def test_server_timing_can_be_disabled(self, client, site, settings):
+        settings.SERVER_TIMING = False
+        response = client.get(reverse("healthcheck"), HTTP_HOST=site.domain)
+        assert "Server-Timing" not in response
+
+    def test_aggregates_per_url_name(self, client, site):
+        for _ in range(2):
+            client.get(reverse("healthcheck"), HTTP_HOST=site.domain)
+        client.get("/api/missing/", HTTP_HOST=site.domain)
+        assert registry._views["healthcheck"].duration.count == 2
+        assert registry._views["<unresolved>"].duration.count == 1
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    def test_requires_admin(self, api_client: APIClient, user: User):
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("metrics"))
+        assert response.status_code == 403
+
+    def test_prometheus_output(self, api_client: APIClient, site):
+        admin = User.objects.create_user(
+            email="admin@example.com", site=site, password="password", is_staff=True
+        )
+        api_client.force_authenticate(user=admin)
+        api_client.get(reverse("healthcheck"))
+        response = api_client.get(reverse("metrics"))
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'view="healthcheck"' in response.content.decode()
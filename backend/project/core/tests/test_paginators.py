@@ -0,0 +1,35 @@
+import pytest
+from django.contrib.sites.models import Site
+from django.db import connection
+
+from project.core.paginators import EstimatedCountPaginator
+
+
+@pytest.fixture
+def sites():
+    Site.objects.bulk_create(
+        Site(domain=f"site-{i}.example.com", name=f"Site {i}") for i in range(50)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE django_site")
+    return Site.objects.order_by("pk")
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_small_querysets_are_counted(self, sites, settings):
+        settings.ESTIMATED_COUNT_THRESHOLD = 10_000
+        assert EstimatedCountPaginator(sites, 10).count == sites.count()
+
+    def test_large_querysets_are_estimated(
+        self, sites, settings, django_assert_num_queries
+    ):
+        settings.ESTIMATED_COUNT_THRESHOLD = 10
+        paginator = EstimatedCountPaginator(sites, 10)
+        with django_assert_num_queries(1) as queries:
+            assert paginator.count >= 10
+        assert queries.captured_queries[0]["sql"].startswith("EXPLAIN")
+
+    def test_lists_are_counted(self, settings):
+        settings.ESTIMATED_COUNT_THRESHOLD = 0
+        assert EstimatedCountPaginator([1, 2, 3], 2).count == 3
@@ -0,0 +1,148 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.utils import load_backend
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from project.core.postgres import pool as pools
+from project.core.postgres.base import connect
+from project.core.postgres.pool import ConnectionPool, PoolTimeout, get_pool
+
+pytestmark = pytest.mark.django_db
+
+
+def backend_pid(conn) -> int:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def pool():
+    params = connection.get_connection_params()
+    pool = ConnectionPool(lambda: connect(params), max_size=2, timeout=0.05)
+    yield pool
+    pool.close()
+
+
+class TestConnectionPool:
+    def test_connections_are_reused(self, pool):
+        first = pool.get()
+        pid = backend_pid(first)
+        pool.put(first)
+        assert backend_pid(pool.get()) == pid
+        stats = pool.stats()
+        assert (stats.connects, stats.checkouts, stats.size) == (1, 2, 1)
+
+    def test_returned_transactions_are_rolled_back(self, pool):
+        conn = pool.get()
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE leftover (id int)")
+        pool.put(conn)
+        assert conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+        assert pool.get() is conn
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.leftover')")
+            assert cursor.fetchone() == (None,)
+
+    def test_returned_sessions_are_reset(self, pool):
+        conn = pool.get()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW work_mem")
+            (default,) = cursor.fetchone()
+            cursor.execute("SET work_mem = '1234kB'")
+            cursor.execute("SELECT pg_advisory_lock(42)")
+        pool.put(conn)
+        assert pool.get() is conn
+        assert conn.autocommit
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW work_mem")
+            assert cursor.fetchone() == (default,)
+            cursor.execute(
+                "SELECT count(*) FROM pg_locks"
+                " WHERE locktype = 'advisory' AND pid = pg_backend_pid()"
+            )
+            assert cursor.fetchone() == (0,)
+
+    def test_connections_that_fail_to_reset_are_closed(self, pool):
+        conn = pool.get()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [backend_pid(conn)])
+        pool.put(conn)
+        assert conn.closed
+        assert pool.stats().discarded == 1
+
+    def test_closed_connections_are_discarded(self, pool):
+        conn = pool.get()
+        conn.close()
+        pool.put(conn)
+        assert pool.get() is not conn
+        assert pool.stats().discarded == 1
+
+    def test_idle_connections_are_health_checked(self, pool):
+        pool.check_after = 0
+        conn = pool.get()
+        pid = backend_pid(conn)
+        pool.put(conn)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+        replacement = pool.get()
+        assert backend_pid(replacement) != pid
+        assert pool.stats().discarded == 1
+
+    def test_timeout(self, pool):
+        pool.get()
+        pool.get()
+        with pytest.raises(PoolTimeout):
+            pool.get()
+        assert pool.stats().timeouts == 1
+
+    def test_forked_processes_get_their_own_pool(self, pool):
+        conn = pool.get()
+        assert get_pool("test", lambda: pool) is pool
+        with patch.object(os, "getpid", return_value=pool.pid + 1):
+            # Connections of the parent are left alone.
+            pool.put(conn)
+            assert not conn.closed
+            assert pool.stats().idle == 0
+            assert get_pool("test", lambda: "child pool") == "child pool"
+        assert pool in pools._inherited
+        pools._pools.pop("test")
+
+
+class TestDatabaseWrapper:
+    @pytest.fixture
+    def pooled(self):
+        wrapper = load_backend("project.core.postgres").DatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "CONN_MAX_AGE": 0,
+                "OPTIONS": {**connection.settings_dict["OPTIONS"], "pool": {}},
+            },
+            # contrib.postgres looks the alias up when a connection is created.
+            connection.alias,
+        )
+        yield wrapper
+        wrapper.close()
+        pools.close_pools()
+
+    def test_connections_return_to_the_pool(self, pooled):
+        with pooled.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            (pid,) = cursor.fetchone()
+        pooled.close()
+        assert pooled.connection is None
+        assert pooled.pool.stats().idle == 1
+
+        pooled.connect()
+        assert backend_pid(pooled.connection) == pid
+        assert pooled.get_autocommit()
+
+    def test_requires_conn_max_age_0(self, pooled):
+        pooled.settings_dict["CONN_MAX_AGE"] = 60
+        with pytest.raises(ImproperlyConfigured):
+            pooled.connect()
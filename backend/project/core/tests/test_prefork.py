@@ -0,0 +1,122 @@
+import gc
+import os
+import runpy
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from project.core import prefork
+from project.core.sites import site_cache
+
+linux = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Uses /proc")
+
+
+class TestWorkerCount:
+    @pytest.fixture(autouse=True)
+    def environ(self, monkeypatch):
+        for name in (
+            "GUNICORN_WORKERS",
+            "GUNICORN_MEMORY_BUDGET_MB",
+            "GUNICORN_MASTER_MEMORY_MB",
+            "GUNICORN_WORKER_MEMORY_MB",
+            "GUNICORN_MAX_WORKERS",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setattr(prefork.multiprocessing, "cpu_count", lambda: 4)
+        monkeypatch.setattr(prefork, "memory_budget", lambda: None)
+        return monkeypatch
+
+    def test_fixed(self, environ):
+        environ.setenv("GUNICORN_WORKERS", "3")
+        assert prefork.worker_count(budget=10_000 * prefork.MB) == 3
+
+    def test_from_memory_budget(self):
+        # (500MB - 100MB for the master) / 40MB per worker.
+        assert prefork.worker_count(budget=500 * prefork.MB) == 10
+
+    def test_bounds(self, environ):
+        assert prefork.worker_count(budget=50 * prefork.MB) == 1
+        assert prefork.worker_count(budget=100_000 * prefork.MB) == 18
+        environ.setenv("GUNICORN_MAX_WORKERS", "6")
+        assert prefork.worker_count(budget=100_000 * prefork.MB) == 6
+
+    def test_without_budget(self):
+        assert prefork.worker_count() == 9
+
+
+def test_memory_budget(monkeypatch):
+    monkeypatch.setenv("GUNICORN_MEMORY_BUDGET_MB", "512")
+    assert prefork.memory_budget() == 512 * prefork.MB
+
+
+@pytest.mark.django_db
+def test_warm_caches(settings):
+    settings.DEBUG = True
+    site_cache.clear()
+    prefork.warm_caches()
+    assert len(site_cache) > 0
+
+
+def test_freeze_heap():
+    try:
+        prefork.freeze_heap()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+@linux
+class TestMemory:
+    def test_memory(self):
+        usage = prefork.memory(os.getpid())
+        assert 0 < usage.private <= usage.pss <= usage.rss
+        assert prefork.memory(2**22 + 1) is None
+
+    def test_children(self):
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+        try:
+            assert child.pid in prefork.children(os.getpid())
+        finally:
+            child.kill()
+            child.wait()
+
+    def test_worker_memory(self, capsys):
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+        try:
+            time.sleep(0.1)
+            call_command("worker_memory", pid=os.getpid())
+        finally:
+            child.kill()
+            child.wait()
+        out = capsys.readouterr().out
+        assert f"Worker pid {child.pid}: rss" in out
+        assert "MB private per worker" in out
+
+    def test_worker_memory_unknown_process(self):
+        with pytest.raises(CommandError):
+            call_command("worker_memory", pid=2**22 + 1)
+
+
+@pytest.mark.django_db
+def test_warm_caches_starts_no_threads(settings):
+    settings.SITE_CACHE_BROADCAST = True
+    site_cache.clear()
+    with patch("project.core.sites.redis.Redis.from_url") as from_url:
+        prefork.warm_caches()
+        from_url.assert_not_called()
+        prefork.start_listeners()
+        from_url.assert_called_once()
+    site_cache._listener = None
+
+
+@pytest.mark.parametrize("threads, pool", [("4", "1"), ("1", None)])
+def test_threaded_workers_use_the_database_pool(settings, threads, pool):
+    with patch.dict(os.environ, {"GUNICORN_THREADS": threads}):
+        os.environ.pop("DATABASE_POOL", None)
+        config = runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+        assert config["threads"] == int(threads)
+        assert os.environ.get("DATABASE_POOL") == pool
@@ -0,0 +1,47 @@
+from project.core.routing import HostRoutingTable, split_port
+
+
+def test_split_port():
+    assert split_port("example.com:8000") == "example.com"
+    assert split_port("example.com") == "example.com"
+    assert split_port("[::1]") == "[::1]"
+    assert split_port("[::1]:8000") == "[::1]"
+
+
+class TestHostRoutingTable:
+    table = HostRoutingTable.build(
+        [
+            ("example.com", 1),
+            ("localhost:8000", 2),
+            ("*.league.example.com", 3),
+            ("*.example.com", 4),
+            ("vip.league.example.com", 5),
+        ]
+    )
+
+    def test_exact(self):
+        assert self.table.resolve("example.com") == 1
+        assert self.table.resolve("EXAMPLE.com.") == 1
+
+    def test_exact_with_port(self):
+        assert self.table.resolve("localhost:8000") == 2
+        assert self.table.resolve("localhost:5173") is None
+
+    def test_port_is_stripped(self):
+        assert self.table.resolve("example.com:443") == 1
+
+    def test_most_specific_wildcard_wins(self):
+        assert self.table.resolve("team.league.example.com") == 3
+        assert self.table.resolve("a.b.league.example.com:8000") == 3
+        assert self.table.resolve("shop.example.com") == 4
+
+    def test_exact_beats_wildcard(self):
+        assert self.table.resolve("vip.league.example.com") == 5
+
+    def test_wildcard_does_not_match_apex(self):
+        assert self.table.resolve("league.example.com") == 4
+        assert HostRoutingTable.build([("*.a.com", 1)]).resolve("a.com") is None
+
+    def test_unknown(self):
+        assert self.table.resolve("example.org") is None
+        assert len(self.table) == 5
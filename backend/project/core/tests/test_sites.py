@@ -0,0 +1,277 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from django.contrib.sites.models import Site
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project.accounts.models import User
+from project.core.middleware import SiteMiddleware
+from project.core.sites import SiteCache, get_site_by_domain, site_cache
+
+
+@pytest.mark.django_db
+class TestSiteCache:
+    def test_cached_lookup_makes_no_queries(self, site, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert get_site_by_domain(site.domain) == site
+        with django_assert_num_queries(0):
+            assert get_site_by_domain(site.domain) == site
+
+        stats = site_cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 0
+        assert stats["hit_rate"] == 1
+
+    def test_unknown_domain_raises(self):
+        with pytest.raises(Site.DoesNotExist):
+            get_site_by_domain("unknown.example.com")
+        assert site_cache.stats()["misses"] == 1
+
+    def test_site_created_after_build_is_found(self, site):
+        site_cache.resolve(site.domain)
+        # Bypass the signals, as if the change happened in another worker.
+        new_site = Site.objects.bulk_create([Site(domain="new.example.com")])[0]
+        assert get_site_by_domain("new.example.com") == new_site
+        assert site_cache.resolve("new.example.com") == new_site
+
+    def test_table_built_during_a_clear_is_discarded(self, site):
+        all_sites = Site.objects.all
+
+        def cleared_while_reading():
+            sites = list(all_sites())
+            site_cache.clear()
+            return sites
+
+        with patch.object(Site.objects, "all", cleared_while_reading):
+            assert site_cache.resolve(site.domain) is None
+        assert len(site_cache) == 0
+        assert get_site_by_domain(site.domain) == site
+
+    def test_clear_during_a_lookup(self, site):
+        site_cache.warm()
+        table = site_cache._snapshot.table
+        resolve = table.resolve
+
+        def cleared_while_resolving(host):
+            site_cache.clear()
+            return resolve(host)
+
+        with patch.object(table, "resolve", cleared_while_resolving):
+            assert site_cache.resolve(site.domain, build=False) == site
+
+    def test_route_read_before_a_clear_is_dropped(self, site):
+        site_cache.warm()
+        generation = site_cache.generation
+        site_cache.clear()
+        site_cache.warm()
+        site_cache.add(site, "stale.example.com", generation=generation)
+        assert site_cache.resolve("stale.example.com") is None
+
+    @override_settings(SITE_CACHE_MAX_SIZE=2)
+    def test_routes_outside_the_table_are_bounded(self, site):
+        site_cache.warm()
+        size = len(site_cache)
+        for host in ("a.example.com", "b.example.com", "c.example.com"):
+            site_cache.add(site, host)
+        assert len(site_cache) == size + 2
+        assert site_cache.resolve("a.example.com") is None
+        assert site_cache.resolve("c.example.com") == site
+
+    def test_table_expires(self, site):
+        cache = SiteCache()
+        with patch("project.core.sites.time.monotonic", return_value=1000.0):
+            assert cache.resolve(site.domain) == site
+        with patch("project.core.sites.time.monotonic", return_value=1000.0 + 301):
+            assert cache.resolve(site.domain, build=False) is None
+
+    def test_unbuilt_table_is_not_built_on_request(self, site):
+        assert site_cache.resolve(site.domain, build=False) is None
+        assert len(site_cache) == 0
+
+    @override_settings(SITE_CACHE_TTL=0)
+    def test_zero_ttl_disables_cache(self, site):
+        get_site_by_domain(site.domain)
+        assert len(site_cache) == 0
+
+    def test_warm_builds_table(self, site):
+        site_cache.warm()
+        assert site_cache.resolve(site.domain, build=False) == site
+
+    def test_site_save_invalidates(self, site):
+        get_site_by_domain(site.domain)
+        site.name = "Renamed"
+        site.save()
+        assert len(site_cache) == 0
+        assert get_site_by_domain(site.domain).name == "Renamed"
+
+    def test_site_delete_invalidates(self, site):
+        domain = site.domain
+        get_site_by_domain(domain)
+        site.delete()
+        with pytest.raises(Site.DoesNotExist):
+            get_site_by_domain(domain)
+
+    @override_settings(SITE_CACHE_BROADCAST=True)
+    def test_change_is_broadcast_after_commit(
+        self, site, django_capture_on_commit_callbacks
+    ):
+        with patch("project.core.sites.redis.Redis.from_url") as from_url:
+            with django_capture_on_commit_callbacks(execute=True):
+                site.save()
+        from_url.return_value.publish.assert_called_once()
+
+    def test_broadcast_from_other_worker_clears_cache(self, site):
+        get_site_by_domain(site.domain)
+        site_cache._handle_message({"data": b"-1"})
+        assert len(site_cache) == 0
+
+    def test_own_broadcast_is_ignored(self, site):
+        get_site_by_domain(site.domain)
+        site_cache._handle_message({"data": str(os.getpid()).encode()})
+        assert len(site_cache) > 0
+
+
+@pytest.mark.django_db
+class TestSiteMiddlewareRouting:
+    def resolve(self, host, **headers):
+        request = RequestFactory().get("/", HTTP_HOST=host, **headers)
+        SiteMiddleware(lambda request: None).process_request(request)
+        return request.site
+
+    def test_port_is_stripped(self, site, django_assert_num_queries):
+        site_cache.warm()
+        with django_assert_num_queries(0):
+            assert self.resolve(f"{site.domain}:5173") == site
+
+    def test_wildcard_subdomain(self, django_assert_num_queries):
+        tenant = Site.objects.create(domain="*.league.example.com", name="League")
+        site_cache.warm()
+        with django_assert_num_queries(0):
+            assert self.resolve("team-1.league.example.com") == tenant
+
+    @override_settings(DEBUG=True)
+    def test_development_fallback_is_routed(self, django_assert_num_queries):
+        site = self.resolve("localhost:8000")
+        assert site.domain == "demo.localhost"
+        # Creating the demo site invalidated the table, so route the host again.
+        self.resolve("localhost:8000")
+        with django_assert_num_queries(0):
+            assert self.resolve("localhost:8000") == site
+
+
+@pytest.mark.django_db
+class TestUnknownHosts:
+    @pytest.fixture(autouse=True)
+    def production(self, settings):
+        settings.DEBUG = False
+
+    def request(self, host, client="10.0.0.1"):
+        request = RequestFactory().get("/", HTTP_HOST=host, REMOTE_ADDR=client)
+        return SiteMiddleware(lambda request: None).process_request(request)
+
+    def test_unknown_tenant_header_is_remembered(self, site, django_assert_num_queries):
+        def request():
+            request = RequestFactory().get(
+                "/", HTTP_HOST=site.domain, HTTP_X_TENANT_DOMAIN="garbage.example.org"
+            )
+            SiteMiddleware(lambda request: None).process_request(request)
+            return request.site
+
+        site_cache.warm()
+        assert request() == site
+        for _ in range(3):
+            with django_assert_num_queries(0):
+                assert request() == site
+        # Routed by the Host, so not rejected.
+        assert site_cache.stats()["unknown_hosts_rejected"] == 0
+
+    def test_unknown_tenant_header_and_host(self, site, django_assert_num_queries):
+        def request():
+            request = RequestFactory().get(
+                "/",
+                HTTP_HOST="garbage.example.org",
+                HTTP_X_TENANT_DOMAIN="garbage.example.net",
+            )
+            SiteMiddleware(lambda request: None).process_request(request)
+
+        site_cache.warm()
+        with pytest.raises(Http404):
+            request()
+        for _ in range(3):
+            with django_assert_num_queries(0), pytest.raises(Http404):
+                request()
+        assert site_cache.stats()["unknown_hosts_rejected"] == 3
+
+    def test_unknown_host_is_rejected_without_queries(self, django_assert_num_queries):
+        with pytest.raises(Http404):
+            self.request("garbage.example.org")
+        with django_assert_num_queries(0), pytest.raises(Http404):
+            self.request("garbage.example.org")
+        assert site_cache.stats()["unknown_hosts_rejected"] == 1
+
+    def test_new_site_is_not_shadowed(self):
+        with pytest.raises(Http404):
+            self.request("new.example.org")
+        Site.objects.create(domain="new.example.org", name="New")
+        assert self.request("new.example.org") is None
+
+    @override_settings(SITE_NEGATIVE_CACHE_TTL=0)
+    def test_negative_cache_can_be_disabled(self, django_assert_num_queries):
+        with pytest.raises(Http404):
+            self.request("garbage.example.org")
+        with django_assert_num_queries(2), pytest.raises(Http404):
+            self.request("garbage.example.org")
+
+    @override_settings(SITE_NEGATIVE_CACHE_MAX_SIZE=1)
+    def test_negative_cache_is_bounded(self):
+        for host in ("a.example.org", "b.example.org"):
+            with pytest.raises(Http404):
+                self.request(host)
+        assert len(site_cache.unknown_hosts) == 1
+
+    @override_settings(SITE_MISS_RATE_LIMIT=2)
+    def test_clients_with_many_misses_are_throttled(
+        self, site, django_assert_num_queries
+    ):
+        for host in ("a.example.org", "b.example.org"):
+            with pytest.raises(Http404):
+                self.request(host)
+        with django_assert_num_queries(0):
+            assert self.request("c.example.org").status_code == 429
+        # Other clients and known hosts aren't affected.
+        with pytest.raises(Http404):
+            self.request("c.example.org", client="10.0.0.2")
+        assert self.request(site.domain) is None
+
+    @override_settings(SITE_MISS_RATE_LIMIT=1, SITE_MISS_RATE_LIMIT_WINDOW=60)
+    def test_throttle_window_expires(self):
+        with patch("project.core.sites.time.monotonic", return_value=1000.0):
+            with pytest.raises(Http404):
+                self.request("a.example.org")
+            assert self.request("b.example.org").status_code == 429
+        with patch("project.core.sites.time.monotonic", return_value=1061.0):
+            with pytest.raises(Http404):
+                self.request("b.example.org")
+
+
+@pytest.mark.django_db
+class TestSiteCacheStats:
+    def test_requires_admin(self, api_client: APIClient, user: User):
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("site-cache-stats"))
+        assert response.status_code == 403
+
+    def test_reports_hit_rate(self, api_client: APIClient, site):
+        admin = User.objects.create_user(
+            email="admin@example.com", site=site, password="password", is_staff=True
+        )
+        api_client.force_authenticate(user=admin)
+        api_client.get(reverse("site-cache-stats"))
+        response = api_client.get(reverse("site-cache-stats"))
+        assert response.status_code == 200
+        assert response.json()["hits"] >= 1
+        assert 0 < response.json()["hit_rate"] <= 1
@@ -0,0 +1,62 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from project.core.lazy import LazyModule, lazy_import
+from project.core.management.commands.profile_startup import (
+    ImportTime,
+    parse_importtime,
+)
+
+
+class TestLazyModule:
+    def test_imported_on_first_use(self):
+        sys.modules.pop("colorsys", None)
+        module = LazyModule("colorsys")
+        assert "colorsys" not in sys.modules
+        assert "not loaded" in repr(module)
+
+        assert module.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+        assert "colorsys" in sys.modules
+        assert "(loaded)" in repr(module)
+
+    def test_shared_between_callers(self):
+        assert lazy_import("colorsys") is lazy_import("colorsys")
+
+    def test_missing_attributes(self):
+        with pytest.raises(AttributeError):
+            LazyModule("colorsys").missing
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     _io\n"
+        "import time:      1500 |       4200 | django.db.models\n"
+        "Some other warning\n"
+    )
+    assert parse_importtime(output) == [
+        ImportTime("_io", 120, 120),
+        ImportTime("django.db.models", 1500, 4200),
+    ]
+    assert parse_importtime(output)[1].package == "django"
+
+
+class TestProfileStartup:
+    def test_within_budget(self, capsys):
+        call_command("profile_startup", runs=1, top=5, budget=60)
+        assert "Boot time is within the budget" in capsys.readouterr().out
+
+    def test_over_budget(self):
+        with pytest.raises(CommandError, match="over the budget"):
+            call_command("profile_startup", runs=1, top=5, budget=0.001)
+
+    def test_heavy_modules_imported_at_boot(self):
+        with patch(
+            "project.core.management.commands.profile_startup.HEAVY_MODULES",
+            ("numpy", "celery"),
+        ):
+            with pytest.raises(CommandError, match="Imported at boot: celery"):
+                call_command("profile_startup", runs=1, top=5, budget=60)
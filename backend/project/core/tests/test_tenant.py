@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from project.core.admin import CustomAdminSite
+from project.core.docs.utils import get_docs_title
+from project.core.middleware import SiteMiddleware
+from project.core.sites import get_site_by_domain, site_cache
+from project.core.tenant import get_current_site, set_current_site, tenant_context
+
+
+@pytest.mark.django_db
+class TestTenantContext:
+    def test_no_tenant_by_default(self):
+        assert get_current_site() is None
+
+    def test_tenant_context(self, site):
+        with tenant_context(site):
+            assert get_current_site() == site
+            assert Site.objects.get_current() == site
+        assert get_current_site() is None
+
+    def test_get_current_falls_back_to_site_id(self, site):
+        assert Site.objects.get_current().pk == settings.SITE_ID
+
+    def test_threads_are_isolated(self, site, other_site):
+        def current_site_in_thread(tenant):
+            set_current_site(tenant)
+            return get_current_site()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(current_site_in_thread, [site, other_site]))
+        assert results == [site, other_site]
+        assert get_current_site() is None
+
+    def test_tasks_are_isolated(self, site, other_site):
+        async def current_site_in_task(tenant):
+            set_current_site(tenant)
+            await asyncio.sleep(0)
+            return get_current_site()
+
+        async def main():
+            return await asyncio.gather(
+                current_site_in_task(site), current_site_in_task(other_site)
+            )
+
+        assert asyncio.run(main()) == [site, other_site]
+
+    def test_docs_title_uses_tenant(self, site):
+        with tenant_context(site):
+            assert get_docs_title().endswith(f"| {site.name} admin")
+
+    def test_admin_titles_use_tenant(self, site):
+        admin_site = CustomAdminSite()
+        with tenant_context(site):
+            assert admin_site.site_header == f"{site.name} administration"
+            assert admin_site.site_title == f"{site.name} admin"
+
+    def test_titles_without_tenant_make_no_queries(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert CustomAdminSite().site_header == "Project Backend administration"
+            assert get_docs_title() == settings.SPECTACULAR_SETTINGS["TITLE"]
+
+    def test_urlconf_import_makes_no_queries(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            for module in ("project.core.admin", "project.core.docs.urls"):
+                importlib.reload(importlib.import_module(module))
+            importlib.import_module("project.core.admin").CustomAdminSite().urls
+            importlib.reload(importlib.import_module("project.urls"))
+
+
+@pytest.mark.django_db
+class TestSiteMiddlewareTenant:
+    def test_request_sets_tenant_without_touching_settings(self, site):
+        seen = {}
+
+        def view(request):
+            seen["site"] = get_current_site()
+            seen["current"] = Site.objects.get_current(request)
+            return HttpResponse()
+
+        site_id = settings.SITE_ID
+        request = RequestFactory().get("/", HTTP_HOST=site.domain)
+        SiteMiddleware(view)(request)
+
+        assert seen == {"site": site, "current": site}
+        assert settings.SITE_ID == site_id
+        assert get_current_site() is None
+
+
+@pytest.mark.django_db
+class TestAsyncSiteMiddleware:
+    @pytest.fixture
+    def cached_site(self, site):
+        get_site_by_domain(site.domain)
+        site_cache.reset_stats()
+        return site
+
+    @pytest.mark.asyncio
+    async def test_cached_site_is_attached_in_async_mode(self, cached_site):
+        seen = {}
+
+        async def view(request):
+            seen["site"] = request.site
+            seen["current"] = get_current_site()
+            return HttpResponse()
+
+        middleware = SiteMiddleware(view)
+        assert middleware.async_mode
+
+        request = RequestFactory().get("/", HTTP_HOST=cached_site.domain)
+        with patch.object(middleware, "process_request") as process_request:
+            await middleware(request)
+
+        # Resolved on the event loop, without falling back to the sync path.
+        process_request.assert_not_called()
+        assert seen == {"site": cached_site, "current": cached_site}
+        assert site_cache.stats()["hits"] == 1
+        assert get_current_site() is None
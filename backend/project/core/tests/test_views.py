@@ -22,3 +22,16 @@ def test_authcheck(api_client: APIClient, user: User):
     api_client.force_authenticate(user=user)
     response = api_client.get(reverse("authcheck"))
     assert response.status_code == HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_admin_iframe_policy(api_client: APIClient) -> None:
+    response = api_client.get(
+        reverse("healthcheck"), HTTP_REFERER="http://localhost:5173/admin"
+    )
+    assert response["Content-Security-Policy"] == "frame-ancestors localhost:5173"
+
+    response = api_client.get(
+        reverse("healthcheck"), HTTP_REFERER="https://evil.example.com/"
+    )
+    assert response["Content-Security-Policy"] == "frame-ancestors 'none'"
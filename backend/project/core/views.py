@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import HttpResponse
 from drf_spectacular.utils import OpenApiResponse  # type: ignore
 from drf_spectacular.utils import extend_schema  # type: ignore
 from rest_framework import status
@@ -7,7 +8,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from revproxy.views import ProxyView
 
-from .permissions import PublicReadOnly
+from .metrics import registry
+from .permissions import IsAdminUser, PublicReadOnly
+from .sites import site_cache
 
 
 class HealthCheck(APIView):
@@ -43,6 +46,40 @@ class AuthCheck(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class SiteCacheStats(APIView):
+    """
+    Hit rate of the tenant resolution cache in the worker serving this request.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        operation_id="Site Cache Stats",
+        responses={200: OpenApiResponse(description="Site cache counters.")},
+        tags=["Checks"],
+    )
+    def get(self, _):
+        return Response(site_cache.stats())
+
+
+class Metrics(APIView):
+    """
+    Request metrics of the worker serving this request, in the Prometheus text format.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        operation_id="Metrics",
+        responses={200: OpenApiResponse(description="Prometheus metrics.")},
+        tags=["Checks"],
+    )
+    def get(self, _):
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
 class FlowerProxyView(LoginRequiredMixin, UserPassesTestMixin, ProxyView):
     upstream = (
         f"http://{settings.DOKKU_APP_NAME}.flower.1:5555/api/admin/flower/"
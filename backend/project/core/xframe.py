@@ -1,10 +1,11 @@
 from urllib.parse import urlparse
 
 from django.conf import settings
-from django.utils.deprecation import MiddlewareMixin
 
+from project.core.middleware import AsyncCapableMiddleware
 
-class XFrameAllowFrontendDomainsMiddleware(MiddlewareMixin):
+
+class XFrameAllowFrontendDomainsMiddleware(AsyncCapableMiddleware):
     """
     The frontend is allowed to embed the admin site in an iframe.
 
@@ -12,6 +13,12 @@ class XFrameAllowFrontendDomainsMiddleware(MiddlewareMixin):
     which domains can embed this content in iframes, replacing the deprecated X-Frame-Options.
     """
 
+    def sync_call(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def async_call(self, request):
+        return self.process_response(request, await self.get_response(request))
+
     def process_response(self, request, response):
         referrer = request.headers.get("referer")
         if referrer:
@@ -10,10 +10,7 @@ from urllib.parse import urlparse
 
 import dj_database_url
 import nest_asyncio
-import sentry_sdk
 from dotenv import load_dotenv
-from sentry_sdk.integrations.django import DjangoIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
 
 logger = logging.getLogger(__name__)
 
@@ -138,6 +135,7 @@ INSTALLED_APPS = [
     "django.contrib.sites",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "dj_rest_auth",
@@ -150,6 +148,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "project.core.middleware.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "project.core.xframe.XFrameAllowFrontendDomainsMiddleware",
     "project.core.middleware.SiteMiddleware",
@@ -167,6 +166,31 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Middleware skipped per route prefix (see project.core.handlers). The longest
+# matching prefix wins; other routes run everything in MIDDLEWARE.
+BROWSER_ONLY_MIDDLEWARE = [
+    "django_permissions_policy.PermissionsPolicyMiddleware",
+    "csp.middleware.CSPMiddleware",
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+MIDDLEWARE_PIPELINES = {
+    # JSON API routes authenticate with JWTs through DRF, not sessions.
+    "/api/": BROWSER_ONLY_MIDDLEWARE
+    + [
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+        "allauth.account.middleware.AccountMiddleware",
+    ],
+    # dj-rest-auth also logs in a session, and allauth needs its request context
+    # and messages.
+    "/api/accounts/": BROWSER_ONLY_MIDDLEWARE,
+    "/api/admin/": [],
+    "/api/docs/": [],
+    "/api/__debug__/": [],
+}
+
 ROOT_URLCONF = "project.urls"
 
 TEMPLATES = [
@@ -192,7 +216,7 @@ WSGI_APPLICATION = "project.wsgi.application"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
+        "project.accounts.authentication.CachedJWTCookieAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -240,6 +264,9 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Built by `manage.py build_schema` at deploy time, see project.core.docs.prebuilt.
+OPENAPI_SCHEMA_DIR = BASE_DIR / "openapi"
+
 
 # Authentication
 
@@ -257,13 +284,21 @@ ACCOUNT_USER_MODEL_USERNAME_FIELD = (
 
 
 # Database.
+#
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and health checked
+# before being reused by the next request. With DATABASE_POOL=1, connections are
+# returned to a per-process pool after every request instead, which threads share
+# (see project.core.postgres). Use it for the ASGI and threaded workers:
+# gunicorn.conf.py turns it on when it runs more than one thread per worker.
+
+DATABASE_POOL = os.environ.get("DATABASE_POOL") == "1"
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", 60))
 
 if database_url := os.environ.get("DATABASE_URL"):
     DATABASES = {"default": dj_database_url.parse(database_url)}
 else:
     DATABASES = {
         "default": {
-            "CONN_MAX_AGE": 0,
             "ENGINE": "django.db.backends.postgresql",
             "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
             "NAME": os.environ.get("POSTGRES_DB"),
@@ -272,6 +307,24 @@ else:
             "USER": os.environ.get("POSTGRES_USER"),
         }
     }
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+if DATABASE_POOL:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["ENGINE"] = "project.core.postgres"
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        # Connections per process, by default one per gunicorn worker thread.
+        "max_size": int(
+            os.environ.get(
+                "DATABASE_POOL_MAX_SIZE", os.environ.get("GUNICORN_THREADS", 4)
+            )
+        ),
+        # Seconds a request waits for a connection before failing.
+        "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+        # Connections idle for longer than this are checked before reuse.
+        "check_after": float(os.environ.get("DATABASE_POOL_CHECK_AFTER", 30)),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = DATABASE_CONN_MAX_AGE
 
 
 # Passwords.
@@ -293,11 +346,31 @@ AUTH_PASSWORD_VALIDATORS = [
 
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.Argon2PasswordHasher"]
 
+# Concurrent password hashes per worker process in the API, and how long a request
+# may wait for one before it gets a 503 (see project.accounts.hashing).
+PASSWORD_HASHING_CONCURRENCY = int(os.environ.get("PASSWORD_HASHING_CONCURRENCY", 2))
+PASSWORD_HASHING_QUEUE_TIMEOUT = float(
+    os.environ.get("PASSWORD_HASHING_QUEUE_TIMEOUT", 2)
+)
+
+# Token buckets in Redis for login and signup attempts (see
+# project.accounts.throttling): capacity is the burst size, rate the refill rate.
+AUTH_THROTTLE_ENABLED = os.environ.get("AUTH_THROTTLE_ENABLED", "1") == "1"
+AUTH_THROTTLE_BUCKETS = {
+    "email": {"capacity": 10, "rate": "10/hour"},
+    "ip": {"capacity": 60, "rate": "60/min"},
+}
+
 
 # Logging & reporting.
 
 if sentry_dsn := os.environ.get("SENTRY_DSN"):  # pragma: no cover
-    # Only initialize Sentry if DSN is not empty
+    # Only initialize Sentry if DSN is not empty. Imported here, as sentry_sdk
+    # and its integrations take a noticeable part of the boot time.
+    import sentry_sdk
+    from sentry_sdk.integrations.django import DjangoIntegration
+    from sentry_sdk.integrations.logging import LoggingIntegration
+
     sentry_sdk.init(
         dsn=sentry_dsn,
         environment=ENVIRONMENT,
@@ -337,6 +410,13 @@ if ENVIRONMENT == "production":  # pragma: no cover
 
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
+# Send account emails (confirmations, password resets) from a Celery worker, see
+# project.accounts.emails. Failed sends are retried with exponential backoff.
+ACCOUNT_EMAIL_ASYNC = os.environ.get("ACCOUNT_EMAIL_ASYNC", "1") == "1"
+ACCOUNT_EMAIL_MAX_RETRIES = 8
+ACCOUNT_EMAIL_RETRY_BACKOFF = 5  # seconds, doubled on every retry
+ACCOUNT_EMAIL_RETRY_BACKOFF_MAX = 600
+
 
 # Internationalization.
 
@@ -424,6 +504,73 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+
+# Caches
+
+CACHES = {
+    # Redis, with hot keys also kept in each worker's memory, see project.core.cache.
+    "default": {
+        "BACKEND": "project.core.cache.TieredCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {
+            # Timeouts of "<namespace>:<key>" keys, in seconds.
+            "NAMESPACES": {"sites": 300, "fighters": 3600, "scoring": 30},
+            "LOCAL_MAX_ENTRIES": int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", 1000)),
+            "LOCAL_TIMEOUT": int(os.environ.get("CACHE_LOCAL_TIMEOUT", 60)),
+            "COMPRESS_MIN_LENGTH": 1024,
+        },
+    },
+    # Shared by all workers.
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    },
+}
+
+# Authenticated users are cached for this many seconds (0 disables it), see
+# project.accounts.authentication.
+JWT_USER_CACHE_TTL = int(os.environ.get("JWT_USER_CACHE_TTL", 60))
+JWT_USER_CACHE = "shared"
+
+
+# Admin changelists estimate counts above this many rows instead of counting them
+# exactly, see project.core.paginators.
+ESTIMATED_COUNT_THRESHOLD = int(os.environ.get("ESTIMATED_COUNT_THRESHOLD", 100_000))
+
+
+# `manage.py profile_startup` (run in CI) fails when booting a web worker takes
+# longer than this many seconds.
+STARTUP_TIME_BUDGET = float(os.environ.get("STARTUP_TIME_BUDGET", 2.0))
+
+
+# Each worker rebuilds its fuzzy fighter name index after this many seconds, see
+# project.ufc.resolver.
+FIGHTER_INDEX_TTL = int(os.environ.get("FIGHTER_INDEX_TTL", 600))
+
+
+# Tenant resolution cache (see project.core.sites)
+
+SITE_CACHE_TTL = int(os.environ.get("SITE_CACHE_TTL", 300))
+# Hosts routed outside of the table (ports, wildcards, development fallbacks).
+SITE_CACHE_MAX_SIZE = int(os.environ.get("SITE_CACHE_MAX_SIZE", 1000))
+SITE_CACHE_BROADCAST = os.environ.get("SITE_CACHE_BROADCAST", "1") == "1"
+SITE_CACHE_CHANNEL = "project:site-cache:invalidate"
+# Hosts that don't resolve to a site are rejected without queries for a while.
+SITE_NEGATIVE_CACHE_TTL = int(os.environ.get("SITE_NEGATIVE_CACHE_TTL", 30))
+SITE_NEGATIVE_CACHE_MAX_SIZE = int(
+    os.environ.get("SITE_NEGATIVE_CACHE_MAX_SIZE", 10_000)
+)
+# Optionally throttle clients that send many unknown hosts (0 disables this).
+SITE_MISS_RATE_LIMIT = int(os.environ.get("SITE_MISS_RATE_LIMIT", 0))
+SITE_MISS_RATE_LIMIT_WINDOW = int(os.environ.get("SITE_MISS_RATE_LIMIT_WINDOW", 60))
+
+
+# Request instrumentation (see project.core.metrics)
+
+# Adds wall, database and cache timings to every response. Off by default outside
+# DEBUG, as they would tell any client how the backend spends its time.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1" if DEBUG else "0") == "1"
+
 # Default primary key field type.
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class UfcConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "project.ufc"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from project.ufc.models import Fighter
+        from project.ufc.resolver import clear_fighter_index
+
+        post_save.connect(clear_fighter_index, sender=Fighter)
+        post_delete.connect(clear_fighter_index, sender=Fighter)
@@ -0,0 +1,377 @@
+"""
+Bulk ingestion of fighter rosters.
+
+Roster files are CSV or NDJSON (optionally gzipped), with a row per fighter:
+
+    external_id,name,nickname,gender,weight_class,nationality_code,birth_date,...
+
+Rows are read as a stream and upserted in batches, keyed on `external_id`. Each
+batch reads the existing fighters with one query, and writes only the new and
+changed ones with one INSERT ... ON CONFLICT DO UPDATE statement. Unchanged
+fighters aren't written at all. Divisions are resolved by (gender, weight_class)
+from a map loaded once, missing divisions are created on first use.
+
+Rows that can't be read (malformed NDJSON lines, values that aren't objects) or
+whose values don't fit the Fighter columns are counted as invalid and reported,
+like rows with unknown choices, instead of failing their batch.
+
+Used by `manage.py ingest_fighters` and the ingest_fighter_roster Celery task.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import PurePath
+from typing import IO, Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from project.ufc.models import Division, Fighter, Gender, Stance, WeightClass
+from project.ufc.resolver import clear_fighter_index
+
+# The fields a roster row sets, compared to decide whether a fighter changed.
+FIELDS = (
+    "name",
+    "nickname",
+    "gender",
+    "division_id",
+    "nationality_code",
+    "birth_date",
+    "height_cm",
+    "is_active",
+    "fighting_style",
+    "reach_cm",
+    "leg_reach_cm",
+    "current_price",
+)
+MAX_ERRORS = 100
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+@dataclass
+class IngestionReport:
+    read: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+    deactivated: int = 0
+    seconds: float = 0.0
+    # The first MAX_ERRORS problems, as (row number, message).
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+    def __str__(self) -> str:
+        return (
+            f"{self.read:,} rows in {self.seconds:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/s): {self.created:,} created, "
+            f"{self.updated:,} updated, {self.unchanged:,} unchanged, "
+            f"{self.invalid:,} invalid, {self.deactivated:,} deactivated"
+        )
+
+
+def detect_format(name: str) -> str:
+    suffixes = PurePath(name).suffixes
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    return "ndjson" if suffixes and suffixes[-1] in (".ndjson", ".jsonl") else "csv"
+
+
+def open_text(file: IO, name: str) -> IO[str]:
+    """A text stream over a binary file, decompressed if its name ends with .gz."""
+    if name.endswith(".gz"):
+        file = gzip.GzipFile(fileobj=file)
+    return io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+
+def read_rows(stream: IO[str], format: str) -> Iterator[dict | InvalidRow]:
+    """The rows of a roster, with an InvalidRow in place of unreadable lines."""
+    if format == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield InvalidRow(f"Invalid JSON: {exc}")
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _choice(value, choices: type[Gender | Stance | WeightClass], required=True) -> str:
+    value = str(value or "").strip().upper().replace(" ", "_").replace("-", "_")
+    if not value and not required:
+        return ""
+    if value not in choices.values:
+        raise InvalidRow(f"Unknown {choices.__name__}: {value!r}")
+    return value
+
+
+def _int(value) -> int | None:
+    if value in (None, ""):
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise InvalidRow(f"Not a number: {value!r}")
+
+
+def _bool(value) -> bool:
+    if value in (None, ""):
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "active")
+
+
+class DivisionMap:
+    """
+    Division ids by (gender, weight_class), creating missing divisions.
+
+    Divisions created in a transaction are only kept once it commits. Call
+    rollback() when it doesn't, so that they're looked up again.
+    """
+
+    def __init__(self):
+        self._ids = {
+            (gender, weight_class): pk
+            for pk, gender, weight_class in Division.objects.values_list(
+                "pk", "gender", "weight_class"
+            )
+        }
+        # Looked up or created in the current transaction.
+        self._pending: dict[tuple[str, str], uuid.UUID] = {}
+
+    def get(self, gender: str, weight_class: str):
+        key = (gender, weight_class)
+        pk = self._ids.get(key) or self._pending.get(key)
+        if pk is None:
+            name = WeightClass(weight_class).label.split(" (")[0]
+            if gender == Gender.FEMALE:
+                name = f"Women's {name}"
+            division, _ = Division.objects.get_or_create(
+                gender=gender, weight_class=weight_class, defaults={"name": name}
+            )
+            pk = self._pending[key] = division.pk
+            transaction.on_commit(self._commit)
+        return pk
+
+    def _commit(self) -> None:
+        self._ids.update(self._pending)
+        self._pending.clear()
+
+    def rollback(self) -> None:
+        self._pending.clear()
+
+
+def _validate(values: dict) -> None:
+    """Check values against their columns: lengths, digits and integer ranges."""
+    for name, value in values.items():
+        try:
+            Fighter._meta.get_field(name).run_validators(value)
+        except ValidationError as exc:
+            raise InvalidRow(f"{name}: {' '.join(exc.messages)}")
+
+
+def parse_fighter(row: dict | InvalidRow, divisions: DivisionMap) -> dict:
+    """The Fighter field values for a roster row."""
+    if isinstance(row, InvalidRow):
+        raise row
+    if not isinstance(row, dict):
+        raise InvalidRow(f"Not an object: {type(row).__name__}")
+    external_id = str(row.get("external_id") or "").strip()
+    name = str(row.get("name") or "").strip()
+    if not external_id or not name:
+        raise InvalidRow("external_id and name are required")
+    gender = _choice(row.get("gender"), Gender)
+    weight_class = _choice(row.get("weight_class"), WeightClass)
+    birth_date = row.get("birth_date") or None
+    try:
+        birth_date = birth_date and date.fromisoformat(str(birth_date))
+        current_price = Decimal(str(row.get("current_price") or 0)).quantize(
+            Decimal("0.01")
+        )
+    except (ValueError, InvalidOperation) as exc:
+        raise InvalidRow(str(exc))
+    values = {
+        "external_id": external_id,
+        "name": name,
+        "nickname": str(row.get("nickname") or "").strip(),
+        "gender": gender,
+        "nationality_code": str(row.get("nationality_code") or "").strip().upper(),
+        "birth_date": birth_date,
+        "height_cm": _int(row.get("height_cm")),
+        "is_active": _bool(row.get("is_active")),
+        "fighting_style": _choice(row.get("fighting_style"), Stance, required=False),
+        "reach_cm": _int(row.get("reach_cm")),
+        "leg_reach_cm": _int(row.get("leg_reach_cm")),
+        "current_price": current_price,
+    }
+    _validate(values)
+    values["division_id"] = divisions.get(gender, weight_class)
+    return values
+
+
+def upsert(fighters: list[dict]) -> None:
+    """
+    Insert fighters, or update them if their external_id exists.
+
+    The same statement as bulk_create(update_conflicts=True), but compiling it
+    through the ORM takes several times longer than running it.
+    """
+    now = timezone.now()
+    meta = Fighter._meta
+    columns = ["external_id", *(meta.get_field(name).column for name in FIELDS)]
+    sql = (
+        f"INSERT INTO {meta.db_table} (id, created, modified, {', '.join(columns)}) "
+        "VALUES %s ON CONFLICT (external_id) DO UPDATE SET "
+        + ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in [*columns[1:], "modified"]
+        )
+    )
+    rows = [
+        (
+            uuid.uuid4(),
+            now,
+            now,
+            values["external_id"],
+            *(values[name] for name in FIELDS),
+        )
+        for values in fighters
+    ]
+    placeholders = f"({', '.join(['%s'] * len(rows[0]))})"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql % ", ".join([placeholders] * len(rows)),
+            [value for row in rows for value in row],
+        )
+
+
+class FighterIngestion:
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+        self.report = IngestionReport()
+        self.divisions = DivisionMap()
+        self.seen: set[str] = set()
+
+    def parse_batch(self, batch: list[dict]) -> dict[str, dict]:
+        """Valid rows by external id. The last row wins for duplicate ids."""
+        fighters: dict[str, dict] = {}
+        for row in batch:
+            self.report.read += 1
+            try:
+                values = parse_fighter(row, self.divisions)
+            except InvalidRow as exc:
+                self.report.invalid += 1
+                if len(self.report.errors) < MAX_ERRORS:
+                    self.report.errors.append((self.report.read, str(exc)))
+                # Still in the roster, so not to be deactivated as missing.
+                if isinstance(row, dict) and (
+                    external_id := str(row.get("external_id") or "").strip()
+                ):
+                    self.seen.add(external_id)
+                continue
+            fighters[values["external_id"]] = values
+        self.seen.update(fighters)
+        return fighters
+
+    def ingest_batch(self, batch: list[dict]) -> None:
+        fighters = self.parse_batch(batch)
+        existing = {
+            row[0]: row[1:]
+            for row in Fighter.objects.filter(external_id__in=fighters).values_list(
+                "external_id", *FIELDS
+            )
+        }
+        changed = []
+        for external_id, values in fighters.items():
+            current = existing.get(external_id)
+            if current == tuple(values[name] for name in FIELDS):
+                self.report.unchanged += 1
+                continue
+            if current is None:
+                self.report.created += 1
+            else:
+                self.report.updated += 1
+            changed.append(values)
+        if changed:
+            upsert(changed)
+
+    def deactivate_missing(self) -> None:
+        """Mark active fighters that weren't in the roster as inactive."""
+        active = Fighter.objects.filter(is_active=True).values_list(
+            "external_id", flat=True
+        )
+        missing = [
+            external_id for external_id in active if external_id not in self.seen
+        ]
+        for ids in batched(missing, self.batch_size):
+            self.report.deactivated += Fighter.objects.filter(
+                external_id__in=ids
+            ).update(is_active=False, modified=timezone.now())
+
+    def run(
+        self, rows: Iterable[dict], deactivate_missing: bool = False, progress=None
+    ):
+        start = time.perf_counter()
+        for batch in batched(rows, self.batch_size):
+            try:
+                with transaction.atomic():
+                    self.ingest_batch(batch)
+            except BaseException:
+                self.divisions.rollback()
+                raise
+            self.report.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(self.report)
+        if deactivate_missing:
+            with transaction.atomic():
+                self.deactivate_missing()
+        if self.report.created or self.report.updated or self.report.deactivated:
+            # The upserts bypass the signals that keep the name index current.
+            clear_fighter_index()
+        self.report.seconds = time.perf_counter() - start
+        return self.report
+
+
+def ingest_fighters(
+    file: IO,
+    name: str,
+    format: str | None = None,
+    batch_size: int = 5000,
+    deactivate_missing: bool = False,
+    progress=None,
+) -> IngestionReport:
+    """Ingest a roster from a binary file, named for its format and compression."""
+    stream = open_text(file, name)
+    try:
+        rows = read_rows(stream, format or detect_format(name))
+        return FighterIngestion(batch_size).run(rows, deactivate_missing, progress)
+    finally:
+        stream.detach()
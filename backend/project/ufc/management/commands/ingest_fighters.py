@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+from textwrap import dedent
+from typing import Any
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from project.ufc.ingestion import IngestionReport, ingest_fighters
+from project.ufc.tasks import ingest_fighter_roster
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Upserts fighters from a roster file: CSV or NDJSON, optionally gzipped, or
+        "-" for stdin (see project.ufc.ingestion). Fighters are matched on their
+        external_id, and only new and changed fighters are written.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--deactivate-missing",
+            action="store_true",
+            help="Mark active fighters that aren't in the roster as inactive.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Upload the file to the default storage and ingest it in a worker.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path: str = options["path"]
+        if options["queue"]:
+            if path == "-":
+                raise CommandError("Only files can be queued.")
+            with open(path, "rb") as file:
+                name = default_storage.save(f"rosters/{Path(path).name}", File(file))
+            ingest_fighter_roster.delay(
+                name,
+                format=options["format"],
+                batch_size=options["batch_size"],
+                deactivate_missing=options["deactivate_missing"],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Queued {name}"))
+            return
+
+        file = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            report = ingest_fighters(
+                file,
+                path,
+                format=options["format"],
+                batch_size=options["batch_size"],
+                deactivate_missing=options["deactivate_missing"],
+                progress=self.progress,
+            )
+        finally:
+            if file is not sys.stdin.buffer:
+                file.close()
+
+        for line, error in report.errors:
+            self.stderr.write(f"Row {line}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Ingested {report}"))
+
+    def progress(self, report: IngestionReport) -> None:
+        self.stdout.write(
+            f"{report.read:,} rows, {report.created + report.updated:,} written, "
+            f"{report.rows_per_second:,.0f} rows/s"
+        )
@@ -0,0 +1,72 @@
+import csv
+import sys
+import time
+from textwrap import dedent
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from project.ufc.models import Division
+from project.ufc.resolver import MIN_SCORE, FighterIndex, FighterQuery
+
+
+class Command(BaseCommand):
+    help: str = dedent(
+        """
+        Matches the names in a CSV feed against the fighter roster (see
+        project.ufc.resolver). The feed needs a "name" column, and optional
+        "gender" and "weight_class" columns narrow down the candidates. Writes the
+        feed to stdout with external_id, fighter and score columns added.
+        """
+    ).strip()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help='A CSV file, or "-" for stdin.')
+        parser.add_argument("--min-score", type=float, default=MIN_SCORE)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path: str = options["path"]
+        file = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            rows = list(csv.DictReader(file))
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        divisions = {
+            (gender, weight_class): pk
+            for pk, gender, weight_class in Division.objects.values_list(
+                "pk", "gender", "weight_class"
+            )
+        }
+        queries = []
+        for row in rows:
+            gender = (row.get("gender") or "").strip().upper() or None
+            weight_class = (row.get("weight_class") or "").strip().upper()
+            division_id = divisions.get((gender, weight_class.replace(" ", "_")))
+            queries.append(FighterQuery(row["name"], gender, division_id))
+
+        start = time.perf_counter()
+        index = FighterIndex.build()
+        built = time.perf_counter()
+        matches = index.match_many(queries, min_score=options["min_score"])
+        matched = time.perf_counter()
+
+        fields = [*(rows[0] if rows else ["name"]), "external_id", "fighter", "score"]
+        writer = csv.DictWriter(self.stdout, fields, lineterminator="\n")
+        writer.writeheader()
+        for row, match in zip(rows, matches):
+            if match is not None:
+                row.update(
+                    external_id=match.external_id,
+                    fighter=match.name,
+                    score=f"{match.score:.0f}",
+                )
+            writer.writerow(row)
+
+        found = sum(match is not None for match in matches)
+        self.stderr.write(
+            f"Matched {found:,} of {len(rows):,} names against {len(index):,} "
+            f"fighters in {matched - built:.2f}s (index built in "
+            f"{built - start:.2f}s)"
+        )
@@ -0,0 +1,124 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:10
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Division",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "gender",
+                    models.CharField(
+                        choices=[("MALE", "Male"), ("FEMALE", "Female")], max_length=255
+                    ),
+                ),
+                (
+                    "weight_class",
+                    models.CharField(
+                        choices=[
+                            ("STRAWWEIGHT", "Strawweight (115 lbs)"),
+                            ("FLYWEIGHT", "Flyweight (125 lbs)"),
+                            ("BANTAMWEIGHT", "Bantamweight (135 lbs)"),
+                            ("FEATHERWEIGHT", "Featherweight (145 lbs)"),
+                            ("LIGHTWEIGHT", "Lightweight (155 lbs)"),
+                            ("WELTERWEIGHT", "Welterweight (170 lbs)"),
+                            ("MIDDLEWEIGHT", "Middleweight (185 lbs)"),
+                            ("LIGHT_HEAVYWEIGHT", "Light Heavyweight (205 lbs)"),
+                            ("HEAVYWEIGHT", "Heavyweight (265 lbs)"),
+                        ],
+                        max_length=255,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="Fighter",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("external_id", models.CharField(max_length=64, unique=True)),
+                ("name", models.CharField(max_length=255)),
+                ("nickname", models.CharField(blank=True, max_length=255)),
+                (
+                    "gender",
+                    models.CharField(
+                        choices=[("MALE", "Male"), ("FEMALE", "Female")], max_length=255
+                    ),
+                ),
+                ("nationality_code", models.CharField(blank=True, max_length=3)),
+                ("birth_date", models.DateField(blank=True, null=True)),
+                ("height_cm", models.IntegerField(blank=True, null=True)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "fighting_style",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("SOUTHPAW", "Southpaw"),
+                            ("ORTHODOX", "Orthodox"),
+                            ("BOTH", "Both"),
+                        ],
+                        max_length=255,
+                    ),
+                ),
+                ("reach_cm", models.IntegerField(blank=True, null=True)),
+                ("leg_reach_cm", models.IntegerField(blank=True, null=True)),
+                (
+                    "current_price",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                (
+                    "division",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="ufc.division"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="division",
+            constraint=models.UniqueConstraint(
+                fields=("gender", "weight_class"),
+                name="division_gender_weight_class_unique",
+            ),
+        ),
+    ]
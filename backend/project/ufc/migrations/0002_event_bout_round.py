@@ -0,0 +1,192 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:20
+
+import uuid
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+import project.ufc.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ufc", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Bout",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("position", models.PositiveSmallIntegerField()),
+                ("scheduled_rounds", models.PositiveSmallIntegerField(default=3)),
+                ("is_title_fight", models.BooleanField(default=False)),
+                (
+                    "winner",
+                    models.CharField(
+                        blank=True,
+                        choices=[("RED", "Red"), ("BLUE", "Blue")],
+                        max_length=4,
+                    ),
+                ),
+                (
+                    "method",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("KO_TKO", "KO/TKO"),
+                            ("SUBMISSION", "Submission"),
+                            ("UNANIMOUS_DECISION", "Unanimous decision"),
+                            ("SPLIT_DECISION", "Split decision"),
+                            ("MAJORITY_DECISION", "Majority decision"),
+                            ("DISQUALIFICATION", "Disqualification"),
+                            ("DRAW", "Draw"),
+                            ("NO_CONTEST", "No contest"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("end_round", models.PositiveSmallIntegerField(blank=True, null=True)),
+                (
+                    "end_seconds",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                (
+                    "blue_fighter",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="blue_bouts",
+                        to="ufc.fighter",
+                    ),
+                ),
+                (
+                    "division",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT, to="ufc.division"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["position"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="Event",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("external_id", models.CharField(max_length=64, unique=True)),
+                ("name", models.CharField(max_length=255)),
+                ("date", models.DateField()),
+                ("location", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "ordering": ["-date"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="Round",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                ("number", models.PositiveSmallIntegerField()),
+                (
+                    "red_stats",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        default=project.ufc.models.empty_round_stats,
+                        size=13,
+                    ),
+                ),
+                (
+                    "blue_stats",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        default=project.ufc.models.empty_round_stats,
+                        size=13,
+                    ),
+                ),
+                (
+                    "bout",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rounds",
+                        to="ufc.bout",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["number"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="bout",
+            name="event",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="bouts",
+                to="ufc.event",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bout",
+            name="red_fighter",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="red_bouts",
+                to="ufc.fighter",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="round",
+            constraint=models.UniqueConstraint(
+                fields=("bout", "number"), name="round_bout_number_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="round",
+            constraint=models.CheckConstraint(
+                check=models.Q(("red_stats__len", 13), ("blue_stats__len", 13)),
+                name="round_stats_layout",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bout",
+            constraint=models.UniqueConstraint(
+                fields=("event", "position"), name="bout_event_position_unique"
+            ),
+        ),
+    ]
@@ -1,3 +1,7 @@
+from enum import IntEnum
+from typing import Mapping
+
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
 from project.core.models import BaseModel
@@ -57,24 +61,174 @@ class Division(BaseModel):
     gender = models.CharField(max_length=255, choices=Gender.choices)
     weight_class = models.CharField(max_length=255, choices=WeightClass.choices)
 
+    class Meta(BaseModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["gender", "weight_class"],
+                name="division_gender_weight_class_unique",
+            )
+        ]
+
     def __str__(self):
-        return self.name, self.gender, self.weight_class
+        return self.name
 
 
 class Fighter(BaseModel):
+    # Identifies the fighter in the roster files, see project.ufc.ingestion.
+    external_id = models.CharField(max_length=64, unique=True)
     name = models.CharField(max_length=255)
-    nickname = models.CharField(max_length=255)
+    nickname = models.CharField(max_length=255, blank=True)
     gender = models.CharField(max_length=255, choices=Gender.choices)
-    division = models.ForeignKey(Division, on_delete=models.CASCADE, many_to_many=True)
-    nationality_code = models.CharField(max_length=3)
-    birth_date = models.DateField()
-    height_cm = models.IntegerField()
+    division = models.ForeignKey(Division, on_delete=models.CASCADE)
+    nationality_code = models.CharField(max_length=3, blank=True)
+    birth_date = models.DateField(null=True, blank=True)
+    height_cm = models.IntegerField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
-    fighting_style = models.CharField(max_length=255, choices=Stance.choices)
-    reach_cm = models.IntegerField()
-    leg_reach_cm = models.IntegerField()
+    fighting_style = models.CharField(
+        max_length=255, choices=Stance.choices, blank=True
+    )
+    reach_cm = models.IntegerField(null=True, blank=True)
+    leg_reach_cm = models.IntegerField(null=True, blank=True)
+
+    current_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    def __str__(self):
+        return self.name
+
 
-    current_price = models.DecimalField(max_digits=10, decimal_places=2)
+class Event(BaseModel):
+    external_id = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255)
+    date = models.DateField()
+    location = models.CharField(max_length=255, blank=True)
+
+    class Meta(BaseModel.Meta):
+        ordering = ["-date"]
+
+    def __str__(self):
+        return self.name
+
+
+class Corner(models.TextChoices):
+    RED = "RED"
+    BLUE = "BLUE"
+
+
+class Method(models.TextChoices):
+    KO_TKO = "KO_TKO", "KO/TKO"
+    SUBMISSION = "SUBMISSION", "Submission"
+    UNANIMOUS_DECISION = "UNANIMOUS_DECISION", "Unanimous decision"
+    SPLIT_DECISION = "SPLIT_DECISION", "Split decision"
+    MAJORITY_DECISION = "MAJORITY_DECISION", "Majority decision"
+    DISQUALIFICATION = "DISQUALIFICATION", "Disqualification"
+    DRAW = "DRAW", "Draw"
+    NO_CONTEST = "NO_CONTEST", "No contest"
+
+
+class Bout(BaseModel):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="bouts")
+    # Position on the card, 1 for the main event.
+    position = models.PositiveSmallIntegerField()
+    division = models.ForeignKey(Division, on_delete=models.PROTECT)
+    red_fighter = models.ForeignKey(
+        Fighter, on_delete=models.PROTECT, related_name="red_bouts"
+    )
+    blue_fighter = models.ForeignKey(
+        Fighter, on_delete=models.PROTECT, related_name="blue_bouts"
+    )
+    scheduled_rounds = models.PositiveSmallIntegerField(default=3)
+    is_title_fight = models.BooleanField(default=False)
+
+    # The result, blank until the bout is over. The winner is blank for draws and
+    # no contests.
+    winner = models.CharField(max_length=4, choices=Corner.choices, blank=True)
+    method = models.CharField(max_length=32, choices=Method.choices, blank=True)
+    end_round = models.PositiveSmallIntegerField(null=True, blank=True)
+    end_seconds = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "position"], name="bout_event_position_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.red_fighter} vs. {self.blue_fighter}"
+
+
+class RoundStat(IntEnum):
+    """
+    Positions in the per-round stat arrays of a Round.
+
+    The layout is stored in the database: only append to it, together with a
+    migration that extends the existing arrays.
+    """
+
+    KNOCKDOWNS = 0
+    SIGNIFICANT_STRIKES_LANDED = 1
+    SIGNIFICANT_STRIKES_ATTEMPTED = 2
+    TOTAL_STRIKES_LANDED = 3
+    TOTAL_STRIKES_ATTEMPTED = 4
+    HEAD_STRIKES_LANDED = 5
+    BODY_STRIKES_LANDED = 6
+    LEG_STRIKES_LANDED = 7
+    TAKEDOWNS_LANDED = 8
+    TAKEDOWNS_ATTEMPTED = 9
+    SUBMISSION_ATTEMPTS = 10
+    REVERSALS = 11
+    CONTROL_SECONDS = 12
+
+    @classmethod
+    def pack(cls, counts: Mapping[str, int]) -> list[int]:
+        """A stat array from counts by name: {"knockdowns": 1} -> [1, 0, ...]."""
+        stats = [0] * len(cls)
+        for name, value in counts.items():
+            try:
+                stats[cls[name.upper()]] = int(value)
+            except KeyError:
+                raise ValueError(f"Unknown round stat: {name!r}")
+        return stats
+
+    @classmethod
+    def unpack(cls, stats: list[int]) -> dict[str, int]:
+        return {stat.name.lower(): stats[stat] for stat in cls}
+
+
+def empty_round_stats() -> list[int]:
+    return [0] * len(RoundStat)
+
+
+class Round(BaseModel):
+    """
+    The stats of both fighters in one round of a bout.
+
+    Each corner's counters are one integer array laid out by RoundStat, rather
+    than a row or column per stat. See project.ufc.stats for loading them.
+    """
+
+    bout = models.ForeignKey(Bout, on_delete=models.CASCADE, related_name="rounds")
+    number = models.PositiveSmallIntegerField()
+    red_stats = ArrayField(
+        models.PositiveIntegerField(), size=len(RoundStat), default=empty_round_stats
+    )
+    blue_stats = ArrayField(
+        models.PositiveIntegerField(), size=len(RoundStat), default=empty_round_stats
+    )
+
+    class Meta(BaseModel.Meta):
+        ordering = ["number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bout", "number"], name="round_bout_number_unique"
+            ),
+            models.CheckConstraint(
+                check=models.Q(red_stats__len=len(RoundStat))
+                & models.Q(blue_stats__len=len(RoundStat)),
+                name="round_stats_layout",
+            ),
+        ]
 
     def __str__(self):
-        return self.name, self.gender, self.weight_class, self.division
+        return f"{self.bout}, round {self.number}"
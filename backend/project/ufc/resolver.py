@@ -0,0 +1,216 @@
+"""
+Fuzzy fighter identity resolution.
+
+Scraped and third-party feeds spell fighter names inconsistently ("Jon Jones",
+"JONES, Jon", "Jonny Jones", "Bones"). FighterIndex matches those names against
+the roster in memory:
+
+- Names and nicknames are normalized (accents, case and punctuation folded) and
+  split into tokens.
+- Candidates are blocked by the first three letters of each token, within the
+  fighter's gender and division when the feed provides them. A query is only
+  scored against the fighters it shares a block with, or against its whole
+  gender/division when it shares none.
+- Queries are scored in chunks with rapidfuzz's process.cdist, one matrix per
+  chunk over the union of the chunk's candidates, instead of pair by pair.
+
+    index = get_fighter_index()
+    index.match("Jonny Jones", gender="MALE")
+    index.match_many(FighterQuery(row["name"], row["gender"]) for row in feed)
+
+Settings:
+- FIGHTER_INDEX_TTL: seconds a worker keeps its index before rebuilding it.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, NamedTuple
+from uuid import UUID
+
+from django.conf import settings
+
+from project.core.lazy import numpy as np
+from project.core.lazy import rapidfuzz
+from project.ufc.models import Fighter
+
+# Minimum token_sort_ratio (0-100) for a name to match.
+MIN_SCORE = 85
+# Queries scored per cdist call.
+CHUNK_SIZE = 64
+BLOCK_KEY_LENGTH = 3
+
+_non_word = re.compile(r"[^\w]+")
+
+
+def normalize(name: str) -> str:
+    """Lowercase ASCII words: "  José  ALDO-Junior " -> "jose aldo junior"."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(_non_word.sub(" ", name.lower()).replace("_", " ").split())
+
+
+def block_keys(name: str) -> set[str]:
+    return {token[:BLOCK_KEY_LENGTH] for token in name.split() if len(token) > 1}
+
+
+class FighterQuery(NamedTuple):
+    name: str
+    gender: str | None = None
+    division_id: UUID | None = None
+
+
+@dataclass(frozen=True)
+class FighterMatch:
+    fighter_id: UUID
+    external_id: str
+    name: str
+    score: float
+
+
+class FighterIndex:
+    def __init__(self, fighters: Iterable[tuple]):
+        """
+        Index (pk, external_id, name, nickname, gender, division_id) tuples.
+
+        Every name and nickname is a choice pointing at its fighter.
+        """
+        self.fighters: list[tuple[UUID, str, str]] = []
+        self.choices: list[str] = []
+        self.choice_fighters: list[int] = []
+        # Choice positions by (gender, division_id, block key), with None for an
+        # unknown gender or division, and by (gender, division_id) alone.
+        self.blocks: dict[tuple, list[int]] = defaultdict(list)
+        self.groups: dict[tuple, list[int]] = defaultdict(list)
+        for pk, external_id, name, nickname, gender, division_id in fighters:
+            self.fighters.append((pk, external_id, name))
+            for choice in {normalize(name), normalize(nickname or "")} - {""}:
+                position = len(self.choices)
+                self.choices.append(choice)
+                self.choice_fighters.append(len(self.fighters) - 1)
+                groups = {
+                    (gender, division_id),
+                    (gender, None),
+                    (None, division_id),
+                    (None, None),
+                }
+                for group in groups:
+                    self.groups[group].append(position)
+                    for key in block_keys(choice):
+                        self.blocks[(*group, key)].append(position)
+
+    @classmethod
+    def build(cls, queryset=None) -> FighterIndex:
+        queryset = Fighter.objects.all() if queryset is None else queryset
+        return cls(
+            queryset.values_list(
+                "pk", "external_id", "name", "nickname", "gender", "division_id"
+            ).iterator()
+        )
+
+    def __len__(self) -> int:
+        return len(self.fighters)
+
+    def candidates(self, name: str, gender=None, division_id=None) -> set[int]:
+        """
+        Positions of the choices a normalized name is scored against: those that
+        share a block key with it, or its whole gender/division when none do.
+        """
+        group = (gender, division_id)
+        found = set()
+        for key in block_keys(name):
+            found.update(self.blocks.get((*group, key), ()))
+        return found or set(self.groups.get(group, ()))
+
+    def match(
+        self, name: str, gender=None, division_id=None, min_score=MIN_SCORE
+    ) -> FighterMatch | None:
+        """The best matching fighter for a name, or None below min_score."""
+        query = FighterQuery(name, gender, division_id)
+        return self.match_many([query], min_score)[0]
+
+    def match_many(
+        self, queries: Iterable[FighterQuery | str], min_score=MIN_SCORE
+    ) -> list[FighterMatch | None]:
+        """
+        match() for every query, in order.
+
+        Queries are scored CHUNK_SIZE at a time with one cdist call against the
+        union of their candidates. Scores outside a query's own candidates are
+        masked, so results don't depend on the other queries in the chunk.
+        """
+        queries = [
+            FighterQuery(query) if isinstance(query, str) else FighterQuery(*query)
+            for query in queries
+        ]
+        names = [normalize(query.name) for query in queries]
+        # Neighbours with the same tokens share candidates, which keeps the union
+        # of a chunk's candidates, and so its matrix, small.
+        order = sorted(
+            range(len(queries)),
+            key=lambda i: (
+                str(queries[i].gender),
+                str(queries[i].division_id),
+                sorted(names[i].split()),
+            ),
+        )
+        cdist, scorer = rapidfuzz.process.cdist, rapidfuzz.fuzz.token_sort_ratio
+        results: list[FighterMatch | None] = [None] * len(queries)
+        for start in range(0, len(order), CHUNK_SIZE):
+            chunk = order[start : start + CHUNK_SIZE]
+            candidates = [
+                self.candidates(names[i], queries[i].gender, queries[i].division_id)
+                for i in chunk
+            ]
+            positions = sorted(set().union(*candidates))
+            if not positions:
+                continue
+            column = {position: column for column, position in enumerate(positions)}
+            mask = np.zeros((len(chunk), len(positions)), dtype=bool)
+            for row, found in enumerate(candidates):
+                mask[row, [column[position] for position in found]] = True
+
+            scores = cdist(
+                [names[i] for i in chunk],
+                [self.choices[position] for position in positions],
+                scorer=scorer,
+                score_cutoff=min_score,
+                dtype=np.uint8,
+                workers=-1,
+            )
+            scores[~mask] = 0
+            best = scores.argmax(axis=1)
+            for row, i in enumerate(chunk):
+                score = int(scores[row, best[row]])
+                if score and score >= min_score:
+                    fighter = self.choice_fighters[positions[best[row]]]
+                    pk, external_id, name = self.fighters[fighter]
+                    results[i] = FighterMatch(pk, external_id, name, float(score))
+        return results
+
+
+_index: FighterIndex | None = None
+_expires_at = 0.0
+_lock = threading.Lock()
+
+
+def get_fighter_index() -> FighterIndex:
+    """This worker's index of all fighters, rebuilt every FIGHTER_INDEX_TTL."""
+    global _index, _expires_at
+    with _lock:
+        if _index is None or _expires_at <= time.monotonic():
+            _index = FighterIndex.build()
+            _expires_at = time.monotonic() + settings.FIGHTER_INDEX_TTL
+        return _index
+
+
+def clear_fighter_index(**kwargs) -> None:
+    """Drop this worker's index. Also a signal receiver for changes to fighters."""
+    global _index
+    with _lock:
+        _index = None
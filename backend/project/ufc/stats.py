@@ -0,0 +1,141 @@
+"""
+Per-round bout statistics as NumPy arrays.
+
+Rounds store each corner's counters as an integer array laid out by RoundStat
+(see project.ufc.models). BoutStats loads every round of a set of bouts with a
+single query into one array, shaped
+
+    (bouts, corners, rounds, stats)
+
+with the red corner at 0 and the blue corner at 1, and zeros for rounds that
+weren't fought. Scoring is then arithmetic on whole arrays instead of loops over
+model instances:
+
+    stats = BoutStats.for_event(event)
+    totals = stats.totals()  # (bouts, corners, stats)
+    points = totals @ weights  # weights: one per RoundStat
+    stats.by_fighter(points)  # {fighter_id: points}
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from uuid import UUID
+
+from django.db.models import QuerySet
+
+from project.core.lazy import numpy as np
+from project.ufc.models import Bout, Corner, Event, RoundStat
+
+CORNERS = (Corner.RED, Corner.BLUE)
+
+
+@dataclass
+class BoutStats:
+    bout_ids: list[UUID]
+    # (bouts, corners) fighter ids.
+    fighter_ids: np.ndarray
+    # (bouts,) index of the winning corner, -1 without a winner.
+    winners: np.ndarray
+    methods: list[str]
+    # (bouts,) rounds fought or, for bouts without a result, with stats.
+    rounds: np.ndarray
+    # (bouts, corners, rounds, stats) counters.
+    stats: np.ndarray
+
+    @classmethod
+    def load(cls, bouts: QuerySet[Bout]) -> BoutStats:
+        """
+        The stats of a set of bouts, in the queryset's order, in one query.
+
+        Raises ValueError for rounds numbered outside 1..scheduled_rounds.
+        """
+        # Keep each bout's rows together, in round order.
+        order = bouts.query.order_by or Bout._meta.ordering
+        rows = bouts.order_by(*order, "pk", "rounds__number").values_list(
+            "pk",
+            "red_fighter_id",
+            "blue_fighter_id",
+            "winner",
+            "method",
+            "end_round",
+            "scheduled_rounds",
+            "rounds__number",
+            "rounds__red_stats",
+            "rounds__blue_stats",
+        )
+
+        bout_ids: list[UUID] = []
+        bout_info: list[tuple] = []
+        max_rounds = 0
+        # The round stats, with the bout and round positions they go to.
+        positions: list[tuple[int, int]] = []
+        red: list[list[int]] = []
+        blue: list[list[int]] = []
+        for row in rows:
+            pk, red_id, blue_id, winner, method, end_round, scheduled = row[:7]
+            number, red_stats, blue_stats = row[7:]
+            if not bout_ids or bout_ids[-1] != pk:
+                bout_ids.append(pk)
+                bout_info.append((red_id, blue_id, winner, method, end_round))
+                max_rounds = max(max_rounds, scheduled)
+            if number is None:
+                continue
+            # Round 0 would land in the last round's position.
+            if not 1 <= number <= scheduled:
+                raise ValueError(
+                    f"Bout {pk} has a round {number}, outside 1..{scheduled}"
+                )
+            positions.append((len(bout_ids) - 1, number - 1))
+            red.append(red_stats)
+            blue.append(blue_stats)
+
+        stats = np.zeros((len(bout_ids), 2, max_rounds, len(RoundStat)), np.int32)
+        rounds = np.zeros(len(bout_ids), np.int16)
+        if positions:
+            bout_index, round_index = np.array(positions).T
+            stats[bout_index, 0, round_index] = red
+            stats[bout_index, 1, round_index] = blue
+            np.maximum.at(rounds, bout_index, round_index + 1)
+        for i, (*_, end_round) in enumerate(bout_info):
+            if end_round:
+                rounds[i] = end_round
+
+        corners = {corner.value: i for i, corner in enumerate(CORNERS)}
+        return cls(
+            bout_ids=bout_ids,
+            fighter_ids=np.array(
+                [info[:2] for info in bout_info], dtype=object
+            ).reshape(len(bout_ids), 2),
+            winners=np.array([corners.get(info[2], -1) for info in bout_info], np.int8),
+            methods=[info[3] for info in bout_info],
+            rounds=rounds,
+            stats=stats,
+        )
+
+    @classmethod
+    def for_event(cls, event: Event | UUID) -> BoutStats:
+        """The stats of every bout on an event's card, main event first."""
+        return cls.load(Bout.objects.filter(event=event).order_by("position"))
+
+    def __len__(self) -> int:
+        return len(self.bout_ids)
+
+    def __getitem__(self, stat: RoundStat) -> np.ndarray:
+        """One stat for every bout, corner and round: (bouts, corners, rounds)."""
+        return self.stats[..., stat]
+
+    def totals(self) -> np.ndarray:
+        """The stats summed over rounds: (bouts, corners, stats)."""
+        return self.stats.sum(axis=2)
+
+    def by_fighter(self, values: np.ndarray) -> dict[UUID, np.ndarray]:
+        """
+        Map per-corner values, (bouts, corners, ...), to the fighters in those
+        corners. Values are summed for fighters in more than one bout.
+        """
+        result: dict[UUID, np.ndarray] = {}
+        values = values.reshape(len(self) * 2, *values.shape[2:])
+        for fighter_id, value in zip(self.fighter_ids.ravel(), values):
+            result[fighter_id] = result.get(fighter_id, 0) + value
+        return result
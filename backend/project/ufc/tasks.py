@@ -0,0 +1,28 @@
+import logging
+
+from celery import shared_task
+from django.core.files.storage import default_storage
+
+from project.ufc.ingestion import ingest_fighters
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def ingest_fighter_roster(
+    name: str,
+    format: str | None = None,
+    batch_size: int = 5000,
+    deactivate_missing: bool = False,
+) -> dict:
+    """Ingest a roster file from the default storage, see project.ufc.ingestion."""
+    with default_storage.open(name, "rb") as file:
+        report = ingest_fighters(
+            file,
+            name,
+            format=format,
+            batch_size=batch_size,
+            deactivate_missing=deactivate_missing,
+        )
+    logger.info("Ingested fighter roster %s: %s", name, report)
+    return report.as_dict()
@@ -0,0 +1,210 @@
+import gzip
+import json
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+
+from project.ufc.ingestion import DivisionMap
+from project.ufc.models import Division, Fighter
+from project.ufc.tasks import ingest_fighter_roster
+
+HEADER = (
+    "external_id,name,nickname,gender,weight_class,nationality_code,birth_date,"
+    "height_cm,is_active,fighting_style,reach_cm,leg_reach_cm,current_price\n"
+)
+
+
+def roster(*rows: str) -> str:
+    return HEADER + "".join(f"{row}\n" for row in rows)
+
+
+ROSTER = roster(
+    "ufc-1,Jon Jones,Bones,MALE,Heavyweight,usa,1987-07-19,193,true,orthodox,215,,25",
+    "ufc-2,Zhang Weili,Magnum,FEMALE,STRAWWEIGHT,CHN,1989-08-13,163,,,160,,20.5",
+    "ufc-3,No Division,,MALE,Cruiserweight,,,,,,,,",
+    ",Missing Id,,MALE,LIGHTWEIGHT,,,,,,,,",
+)
+
+
+@pytest.fixture
+def roster_file(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text(ROSTER)
+    return path
+
+
+@pytest.mark.django_db
+class TestIngestFighters:
+    def test_csv(self, roster_file, capsys):
+        call_command("ingest_fighters", str(roster_file))
+
+        jones = Fighter.objects.get(external_id="ufc-1")
+        assert str(jones) == "Jon Jones"
+        assert jones.nationality_code == "USA"
+        assert jones.birth_date == date(1987, 7, 19)
+        assert jones.fighting_style == "ORTHODOX"
+        assert jones.leg_reach_cm is None
+        assert jones.current_price == Decimal("25.00")
+        assert str(jones.division) == "Heavyweight"
+
+        zhang = Fighter.objects.get(external_id="ufc-2")
+        assert zhang.is_active
+        assert str(zhang.division) == "Women's Strawweight"
+
+        out, err = capsys.readouterr()
+        assert "4 rows" in out
+        assert "2 created, 0 updated, 0 unchanged, 2 invalid" in out
+        assert "Row 3: Unknown WeightClass: 'CRUISERWEIGHT'" in err
+        assert "Row 4: external_id and name are required" in err
+
+    def test_only_changed_fighters_are_written(
+        self, roster_file, capsys, django_assert_num_queries
+    ):
+        call_command("ingest_fighters", str(roster_file))
+        modified = Fighter.objects.get(external_id="ufc-2").modified
+        roster_file.write_text(ROSTER.replace(",25\n", ",30\n"))
+        capsys.readouterr()
+
+        # Divisions, existing fighters and the upsert, in a savepoint.
+        with django_assert_num_queries(5):
+            call_command("ingest_fighters", str(roster_file))
+        assert "0 created, 1 updated, 1 unchanged" in capsys.readouterr().out
+        assert Fighter.objects.get(external_id="ufc-1").current_price == 30
+        assert Fighter.objects.get(external_id="ufc-2").modified == modified
+
+    def test_divisions_are_reused(self, roster_file):
+        heavyweight = Division.objects.create(
+            name="Heavyweight", gender="MALE", weight_class="HEAVYWEIGHT"
+        )
+        call_command("ingest_fighters", str(roster_file))
+        assert Fighter.objects.get(external_id="ufc-1").division == heavyweight
+        assert Division.objects.count() == 2
+
+    def test_gzipped_ndjson(self, tmp_path, capsys):
+        path = tmp_path / "roster.ndjson.gz"
+        rows = [
+            {
+                "external_id": f"ufc-{i}",
+                "name": f"Fighter {i}",
+                "gender": "MALE",
+                "weight_class": "LIGHTWEIGHT",
+                "is_active": i % 2 == 0,
+            }
+            for i in range(5)
+        ]
+        path.write_bytes(gzip.compress("\n".join(map(json.dumps, rows)).encode()))
+        call_command("ingest_fighters", str(path), "--batch-size", "2")
+        assert Fighter.objects.count() == 5
+        assert Fighter.objects.filter(is_active=True).count() == 3
+        assert "5 created" in capsys.readouterr().out
+
+    def test_values_over_the_column_limits(self, tmp_path, capsys):
+        path = tmp_path / "roster.csv"
+        path.write_text(
+            roster(
+                "ufc-1,Fighter,,MALE,LIGHTWEIGHT,USAX,,,,,,,",
+                f"ufc-2,{'x' * 256},,MALE,LIGHTWEIGHT,,,,,,,,",
+                "ufc-3,Fighter,,MALE,LIGHTWEIGHT,,,,,,,,123456789",
+                "ufc-4,Fighter,,MALE,LIGHTWEIGHT,,,99999999999,,,,,",
+                "ufc-5,Fighter,,MALE,LIGHTWEIGHT,USA,,,,,,,12345678.90",
+            )
+        )
+        call_command("ingest_fighters", str(path))
+        assert list(Fighter.objects.values_list("external_id", flat=True)) == ["ufc-5"]
+        out, err = capsys.readouterr()
+        assert "1 created, 0 updated, 0 unchanged, 4 invalid" in out
+        assert "Row 1: nationality_code: Ensure this value has at most 3" in err
+        assert "Row 2: name: Ensure this value has at most 255" in err
+        assert "Row 3: current_price: Ensure that there are no more than 10" in err
+        assert "Row 4: height_cm: Ensure this value is less than or equal" in err
+
+    def test_unreadable_ndjson_lines(self, tmp_path, capsys):
+        path = tmp_path / "roster.ndjson"
+        row = {"external_id": "ufc-1", "name": "Fighter", "gender": "MALE"}
+        row["weight_class"] = "LIGHTWEIGHT"
+        path.write_text(f'{{"external_id": "ufc-0",\n[1, 2]\n{json.dumps(row)}\n')
+        call_command("ingest_fighters", str(path))
+        assert Fighter.objects.get().external_id == "ufc-1"
+        out, err = capsys.readouterr()
+        assert "1 created, 0 updated, 0 unchanged, 2 invalid" in out
+        assert "Row 1: Invalid JSON" in err
+        assert "Row 2: Not an object: list" in err
+
+    def test_duplicate_ids_in_a_batch(self, tmp_path):
+        path = tmp_path / "roster.csv"
+        path.write_text(
+            roster(
+                "ufc-1,First,,MALE,LIGHTWEIGHT,,,,,,,,",
+                "ufc-1,Second,,MALE,LIGHTWEIGHT,,,,,,,,",
+            )
+        )
+        call_command("ingest_fighters", str(path))
+        assert Fighter.objects.get().name == "Second"
+
+    def test_deactivate_missing(self, roster_file, tmp_path, capsys):
+        call_command("ingest_fighters", str(roster_file))
+        path = tmp_path / "update.csv"
+        path.write_text(roster("ufc-2,Zhang Weili,,FEMALE,STRAWWEIGHT,,,,,,,,"))
+        call_command("ingest_fighters", str(path), "--deactivate-missing")
+        assert not Fighter.objects.get(external_id="ufc-1").is_active
+        assert Fighter.objects.get(external_id="ufc-2").is_active
+        assert "1 deactivated" in capsys.readouterr().out
+
+    def test_invalid_rows_are_not_missing(self, roster_file, tmp_path, capsys):
+        call_command("ingest_fighters", str(roster_file))
+        path = tmp_path / "update.csv"
+        path.write_text(
+            roster(
+                "ufc-1,Jon Jones,,MALE,HEAVYWEIGHT,,1987-13-45,,,,,,",
+                "ufc-2,Zhang Weili,,FEMALE,STRAWWEIGHT,,,,,,,,",
+            )
+        )
+        call_command("ingest_fighters", str(path), "--deactivate-missing")
+        assert Fighter.objects.get(external_id="ufc-1").is_active
+        assert "1 invalid, 0 deactivated" in capsys.readouterr().out
+
+    def test_queue(self, roster_file, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        with patch.object(ingest_fighter_roster, "delay") as delay:
+            call_command("ingest_fighters", str(roster_file), "--queue")
+        ((name,), kwargs) = delay.call_args
+        assert name.startswith("rosters/roster")
+        assert kwargs == {
+            "format": None,
+            "batch_size": 5000,
+            "deactivate_missing": False,
+        }
+
+
+@pytest.mark.django_db
+def test_divisions_created_in_a_rolled_back_batch_are_forgotten(
+    django_capture_on_commit_callbacks,
+):
+    divisions = DivisionMap()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            divisions.get("MALE", "LIGHTWEIGHT")
+            raise RuntimeError
+    divisions.rollback()
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            pk = divisions.get("MALE", "LIGHTWEIGHT")
+    assert Division.objects.filter(pk=pk).exists()
+    assert divisions._ids[("MALE", "LIGHTWEIGHT")] == pk
+
+
+@pytest.mark.django_db
+def test_ingest_fighter_roster_task(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    from django.core.files.storage import default_storage
+
+    name = default_storage.save("rosters/roster.csv", ContentFile(ROSTER.encode()))
+    result = ingest_fighter_roster.apply(args=[name], kwargs={"batch_size": 1}).get()
+    assert result["created"] == 2
+    assert result["invalid"] == 2
+    assert result["rows_per_second"] > 0
@@ -0,0 +1,120 @@
+import pytest
+from django.core.management import call_command
+
+from project.ufc.models import Division, Fighter
+from project.ufc.resolver import (
+    FighterIndex,
+    FighterQuery,
+    clear_fighter_index,
+    get_fighter_index,
+    normalize,
+)
+
+FIGHTERS = [
+    (1, "ufc-1", "Jon Jones", "Bones", "MALE", "heavyweight"),
+    (2, "ufc-2", "Jose Aldo", "Junior", "MALE", "bantamweight"),
+    (3, "ufc-3", "Zhang Weili", "Magnum", "FEMALE", "strawweight"),
+    (4, "ufc-4", "Jon Smith", "", "MALE", "lightweight"),
+    (5, "ufc-5", "Joan Smith", "", "FEMALE", "strawweight"),
+]
+
+
+@pytest.fixture
+def index():
+    return FighterIndex(FIGHTERS)
+
+
+def test_normalize():
+    assert normalize("  José  ALDO-Júnior ") == "jose aldo junior"
+    assert normalize("O'Malley, Sean") == "o malley sean"
+
+
+class TestFighterIndex:
+    @pytest.mark.parametrize(
+        "name, external_id",
+        [
+            ("Jon Jones", "ufc-1"),
+            ("JONES, Jon", "ufc-1"),
+            ("Jon Jonnes", "ufc-1"),
+            ("Bones", "ufc-1"),
+            ("José Aldo", "ufc-2"),
+            ("Weili Zhang", "ufc-3"),
+        ],
+    )
+    def test_match(self, index, name, external_id):
+        assert index.match(name).external_id == external_id
+
+    def test_no_match(self, index):
+        assert index.match("Conor McGregor") is None
+        assert index.match("") is None
+
+    def test_gender_and_division_narrow_candidates(self, index):
+        assert index.match("Jo Smith").name == "Jon Smith"
+        assert index.match("Jo Smith", gender="FEMALE").name == "Joan Smith"
+        assert index.match("Jon Smith", division_id="strawweight").name == (
+            "Joan Smith"
+        )
+        assert index.match("Jon Jones", gender="FEMALE") is None
+
+    def test_names_without_shared_tokens_fall_back_to_their_division(self, index):
+        match = index.match("Xeili Xhang", division_id="strawweight", min_score=80)
+        assert match.external_id == "ufc-3"
+
+    def test_match_many(self, index, monkeypatch):
+        monkeypatch.setattr("project.ufc.resolver.CHUNK_SIZE", 2)
+        queries = [
+            "Zhang Weili",
+            FighterQuery("Jon Smith", "FEMALE"),
+            ("Jon Jones", "MALE", "heavyweight"),
+            "Nobody",
+            "Jon Smith",
+        ]
+        matches = index.match_many(queries)
+        assert [match and match.external_id for match in matches] == [
+            "ufc-3",
+            "ufc-5",
+            "ufc-1",
+            None,
+            "ufc-4",
+        ]
+        assert matches[0].fighter_id == 3
+        assert matches[0].score == 100
+
+
+@pytest.mark.django_db
+def test_fighter_index_is_rebuilt_after_changes():
+    division = Division.objects.create(
+        name="Lightweight", gender="MALE", weight_class="LIGHTWEIGHT"
+    )
+    clear_fighter_index()
+    assert len(get_fighter_index()) == 0
+    assert get_fighter_index() is get_fighter_index()
+
+    fighter = Fighter.objects.create(
+        external_id="ufc-1", name="Islam Makhachev", gender="MALE", division=division
+    )
+    assert get_fighter_index().match("Islam Makachev").fighter_id == fighter.pk
+
+
+@pytest.mark.django_db
+def test_match_fighters_command(tmp_path, capsys):
+    division = Division.objects.create(
+        name="Lightweight", gender="MALE", weight_class="LIGHTWEIGHT"
+    )
+    Fighter.objects.create(
+        external_id="ufc-1", name="Islam Makhachev", gender="MALE", division=division
+    )
+    path = tmp_path / "feed.csv"
+    path.write_text(
+        "name,gender,weight_class\n"
+        "MAKHACHEV Islam,male,Lightweight\n"
+        "Islam Makhachev,female,\n"
+    )
+    call_command("match_fighters", str(path))
+    out, err = capsys.readouterr()
+    assert out.splitlines() == [
+        "name,gender,weight_class,external_id,fighter,score",
+        "MAKHACHEV Islam,male,Lightweight,ufc-1,Islam Makhachev,100",
+        "Islam Makhachev,female,,,,",
+    ]
+    assert "Matched 1 of 2 names against 1 fighters" in err
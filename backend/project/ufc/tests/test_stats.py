@@ -0,0 +1,123 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from django.db import IntegrityError
+
+from project.ufc.models import Bout, Division, Event, Fighter, Round, RoundStat
+from project.ufc.stats import BoutStats
+
+
+def test_round_stat_pack():
+    stats = RoundStat.pack({"knockdowns": 1, "CONTROL_SECONDS": 95})
+    assert len(stats) == len(RoundStat)
+    assert stats[RoundStat.KNOCKDOWNS] == 1
+    assert stats[RoundStat.CONTROL_SECONDS] == 95
+    assert RoundStat.unpack(stats)["control_seconds"] == 95
+    with pytest.raises(ValueError, match="Unknown round stat: 'elbows'"):
+        RoundStat.pack({"elbows": 3})
+
+
+@pytest.fixture
+def event():
+    division = Division.objects.create(
+        name="Lightweight", gender="MALE", weight_class="LIGHTWEIGHT"
+    )
+    fighters = [
+        Fighter.objects.create(
+            external_id=f"ufc-{i}",
+            name=f"Fighter {i}",
+            gender="MALE",
+            division=division,
+        )
+        for i in range(4)
+    ]
+    event = Event.objects.create(
+        external_id="ufc-300", name="UFC 300", date=date(2024, 4, 13)
+    )
+    main = Bout.objects.create(
+        event=event,
+        position=1,
+        division=division,
+        red_fighter=fighters[0],
+        blue_fighter=fighters[1],
+        scheduled_rounds=5,
+        winner="BLUE",
+        method="KO_TKO",
+        end_round=2,
+        end_seconds=61,
+    )
+    Round.objects.create(
+        bout=main,
+        number=2,
+        red_stats=RoundStat.pack({"significant_strikes_landed": 4}),
+        blue_stats=RoundStat.pack({"knockdowns": 1, "significant_strikes_landed": 9}),
+    )
+    Round.objects.create(
+        bout=main,
+        number=1,
+        red_stats=RoundStat.pack({"significant_strikes_landed": 10}),
+        blue_stats=RoundStat.pack({"significant_strikes_landed": 12}),
+    )
+    # Not fought yet.
+    Bout.objects.create(
+        event=event,
+        position=2,
+        division=division,
+        red_fighter=fighters[2],
+        blue_fighter=fighters[3],
+    )
+    return event
+
+
+@pytest.mark.django_db
+class TestBoutStats:
+    def test_for_event(self, event, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            stats = BoutStats.for_event(event)
+
+        main, prelim = event.bouts.all()
+        assert stats.bout_ids == [main.pk, prelim.pk]
+        assert stats.fighter_ids.tolist() == [
+            [main.red_fighter_id, main.blue_fighter_id],
+            [prelim.red_fighter_id, prelim.blue_fighter_id],
+        ]
+        assert stats.winners.tolist() == [1, -1]
+        assert stats.methods == ["KO_TKO", ""]
+        assert stats.rounds.tolist() == [2, 0]
+        assert stats.stats.shape == (2, 2, 5, len(RoundStat))
+        assert stats[RoundStat.SIGNIFICANT_STRIKES_LANDED][0].tolist() == [
+            [10, 4, 0, 0, 0],
+            [12, 9, 0, 0, 0],
+        ]
+        assert not stats.stats[1].any()
+
+    def test_scoring(self, event):
+        stats = BoutStats.for_event(event.pk)
+        weights = np.zeros(len(RoundStat))
+        weights[RoundStat.KNOCKDOWNS] = 10
+        weights[RoundStat.SIGNIFICANT_STRIKES_LANDED] = 0.5
+
+        points = stats.by_fighter(stats.totals() @ weights)
+        main = event.bouts.get(position=1)
+        assert points[main.red_fighter_id] == 7
+        assert points[main.blue_fighter_id] == 20.5
+        assert len(points) == 4
+
+    def test_empty(self):
+        stats = BoutStats.load(Bout.objects.none())
+        assert len(stats) == 0
+        assert stats.totals().shape == (0, 2, len(RoundStat))
+        assert stats.by_fighter(stats.totals()) == {}
+
+    @pytest.mark.parametrize("number", [0, 6])
+    def test_round_numbers_are_checked(self, event, number):
+        Round.objects.create(bout=event.bouts.get(position=1), number=number)
+        with pytest.raises(ValueError, match=f"has a round {number}, outside 1..5"):
+            BoutStats.for_event(event)
+
+    def test_stat_layout_is_enforced(self, event):
+        with pytest.raises(IntegrityError):
+            Round.objects.create(
+                bout=event.bouts.get(position=2), number=1, red_stats=[1, 2, 3]
+            )
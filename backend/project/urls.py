@@ -1,7 +1,13 @@
 from django.urls import include, path, re_path
 
 from project.accounts.admin import admin_site  # Import custom admin site
-from project.core.views import AuthCheck, FlowerProxyView, HealthCheck
+from project.core.views import (
+    AuthCheck,
+    FlowerProxyView,
+    HealthCheck,
+    Metrics,
+    SiteCacheStats,
+)
 
 urlpatterns = [
     path("api/__debug__/", include("debug_toolbar.urls")),
@@ -14,4 +20,6 @@ urlpatterns = [
     path("api/accounts/", include("project.accounts.urls")),
     path("api/healthcheck/", HealthCheck.as_view(), name="healthcheck"),
     path("api/authcheck/", AuthCheck.as_view(), name="authcheck"),
+    path("api/metrics/", Metrics.as_view(), name="metrics"),
+    path("api/site-cache/", SiteCacheStats.as_view(), name="site-cache-stats"),
 ]
@@ -0,0 +1,20 @@
+"""
+gunicorn worker classes.
+"""
+
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Uvicorn worker used by gunicorn_asgi.conf.py to serve project.asgi.
+
+    nest_asyncio (applied in settings) can only patch the pure Python event loop,
+    so uvloop is disabled. Django doesn't implement the ASGI lifespan protocol.
+    """
+
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        "loop": "asyncio",
+        "lifespan": "off",
+    }